@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""CLI 启动耗时基准测试
+
+测量 import videoprocessor.cli 和 video-processor --help 的耗时，
+并列出导入耗时最多的模块，用于发现重新引入的顶层重量级依赖。
+
+用法:
+    python benchmarks/bench_startup.py [--runs 10] [--max-import-ms 500]
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 启动阶段不应加载的重量级依赖
+HEAVY_MODULES = ['whisper', 'torch', 'pydub', 'edge_tts', 'googletrans', 'translate', 'numpy']
+
+def time_command(command: list, runs: int) -> list:
+    """多次执行命令，返回每次的耗时（毫秒）"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT_DIR, capture_output=True, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def loaded_heavy_modules() -> list:
+    """导入 CLI 后已加载的重量级依赖"""
+    code = (
+        "import sys, json, videoprocessor.cli; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+def slowest_imports(limit: int = 10) -> list:
+    """使用 -X importtime 统计导入耗时最多的模块"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import videoprocessor.cli'],
+                            cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # 格式: "import time:  self [us] | cumulative | imported package"
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        entries.append((int(cumulative_us), name.strip()))
+    entries.sort(reverse=True)
+    return entries[:limit]
+
+def summarize(name: str, timings: list) -> dict:
+    """汇总耗时"""
+    return {
+        'name': name,
+        'runs': len(timings),
+        'min_ms': round(min(timings), 1),
+        'median_ms': round(statistics.median(timings), 1),
+        'max_ms': round(max(timings), 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='CLI 启动耗时基准测试')
+    parser.add_argument('--runs', type=int, default=10, help='每项测试的执行次数 (默认10)')
+    parser.add_argument('--max-import-ms', type=float,
+                       help='import videoprocessor.cli 中位耗时上限，超过时返回非零退出码')
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出结果')
+    args = parser.parse_args()
+
+    results = [
+        summarize('python 解释器启动', time_command([sys.executable, '-c', 'pass'], args.runs)),
+        summarize('import videoprocessor.cli',
+                  time_command([sys.executable, '-c', 'import videoprocessor.cli'], args.runs)),
+        summarize('video-processor --help',
+                  time_command([sys.executable, '-m', 'videoprocessor.cli', '--help'], args.runs)),
+    ]
+    heavy = loaded_heavy_modules()
+    slowest = slowest_imports()
+
+    if args.json:
+        print(json.dumps({
+            'results': results,
+            'heavy_modules_loaded': heavy,
+            'slowest_imports': [{'module': name, 'cumulative_us': us} for us, name in slowest]
+        }, ensure_ascii=False, indent=2))
+    else:
+        print(f"{'测试项':<28}{'最小(ms)':>10}{'中位(ms)':>10}{'最大(ms)':>10}")
+        for item in results:
+            print(f"{item['name']:<28}{item['min_ms']:>10}{item['median_ms']:>10}{item['max_ms']:>10}")
+        print(f"\n启动时已加载的重量级依赖: {', '.join(heavy) if heavy else '无'}")
+        print("\n导入耗时最多的模块 (累计, 微秒):")
+        for us, name in slowest:
+            print(f"  {us:>10}  {name}")
+
+    if heavy:
+        return 1
+    if args.max_import_ms is not None and results[1]['median_ms'] > args.max_import_ms:
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""基准测试使用的离线替身后端
+
+替换翻译和语音合成的网络后端，保留 TranslationService / TextToSpeechService 自身的
+分批、重试、语速计算与合并逻辑，结果确定且可注入固定延迟以模拟网络往返。
+"""
+import time
+import wave
+import asyncio
+from videoprocessor.translation_service import TranslationService
+from videoprocessor.tts_service import TextToSpeechService
+
+class OfflineTranslationService(TranslationService):
+    """离线翻译：在每行前加上目标语言标记"""
+    
+    def __init__(self, latency: float = 0.0, rate_limit: float = 0):
+        """
+        Args:
+            latency: 每次翻译请求的注入延迟（秒）
+            rate_limit: 每秒请求数（令牌桶限速），0 表示不限速
+        """
+        super().__init__()
+        self.latency = latency
+        # 不使用翻译记忆，否则第二次运行会直接命中上次的译文，各次结果不可比
+        self.use_memory = False
+        self.rate_limits = {'offline': rate_limit}
+        self.translators = [('offline', self._translate_offline)]
+    
+    def _translate_offline(self, text: str, target_language: str) -> str:
+        """确定性翻译，保持行数不变"""
+        time.sleep(self.latency)
+        return '\n'.join(f"[{target_language}] {line}" for line in text.split('\n'))
+
+class OfflineTTSService(TextToSpeechService):
+    """离线配音：按文本长度生成固定音高的正弦音"""
+    
+    def __init__(self, latency: float = 0.0, chars_per_second: float = 4.0):
+        """
+        Args:
+            latency: 每个片段的注入延迟（秒）
+            chars_per_second: 模拟语速，决定生成片段的时长
+        """
+        super().__init__()
+        self.latency = latency
+        self.chars_per_second = chars_per_second
+    
+    async def _generate_audio(self, text: str, rate: str, output_path: str,
+                              target_language: str, voice_name: str = None):
+        """生成单个音频片段"""
+        import numpy as np
+        
+        self._count('tts.requests')
+        await asyncio.sleep(self.latency)
+        
+        duration = max(0.3, len(text) / self.chars_per_second)
+        t = np.arange(int(duration * self.sample_rate)) / self.sample_rate
+        tone = (0.1 * np.sin(2 * np.pi * 440 * t) * 32767).astype(np.int16)
+        frames = np.repeat(tone[:, None], self.channels, axis=1)
+        
+        with wave.open(output_path, 'wb') as f:
+            f.setnchannels(self.channels)
+            f.setsampwidth(2)
+            f.setframerate(self.sample_rate)
+            f.writeframes(frames.tobytes())
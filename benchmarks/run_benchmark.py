@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""端到端性能基准测试
+
+使用 utils/create_test_video.py 生成指定时长、分辨率和语音密度的合成视频，
+以离线替身替换翻译和配音后端（可注入固定延迟），运行完整的 VideoProcessor 流程，
+统计每个阶段的实时率（阶段耗时 / 视频时长）和吞吐量（倍实时），并与保存的基线比较。
+
+用法（在项目根目录执行）:
+    python -m benchmarks.run_benchmark --durations 30 120 --resolution 1280x720 \\
+        --speech-density 0.6 --translation-latency 0.2 --tts-latency 0.3
+    python -m benchmarks.run_benchmark --save-baseline     # 保存为新的基线
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+from utils.create_test_video import create_test_video
+from videoprocessor.video_processor import VideoProcessor
+from .fakes import OfflineTranslationService, OfflineTTSService
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# 低于该耗时的阶段不参与回归判断，避免计时噪声
+MIN_COMPARE_SECONDS = 0.05
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='端到端性能基准测试')
+    parser.add_argument('--durations', type=float, nargs='+', default=[30],
+                       help='合成视频时长（秒），可指定多个 (默认30)')
+    parser.add_argument('--resolution', default='1280x720', help='合成视频分辨率 (默认1280x720)')
+    parser.add_argument('--speech-density', type=float, default=0.6,
+                       help='语音所占比例 0-1 (默认0.6)')
+    parser.add_argument('--seed', type=int, default=0, help='音频随机种子 (默认0)')
+    parser.add_argument('--model', default='tiny', help='Whisper 模型 (默认tiny)')
+    parser.add_argument('--speed', type=float, default=1.0, help='视频速度因子 (默认1.0)')
+    parser.add_argument('--stream', action='store_true', help='使用流式处理')
+    parser.add_argument('--translation-latency', type=float, default=0.0,
+                       help='每次翻译请求的注入延迟（秒）')
+    parser.add_argument('--translation-rate', type=float, default=0,
+                       help='离线翻译每秒请求数（令牌桶限速），0 表示不限速 (默认0)')
+    parser.add_argument('--tts-latency', type=float, default=0.0,
+                       help='每个配音片段的注入延迟（秒）')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='基线文件路径')
+    parser.add_argument('--save-baseline', action='store_true', help='将本次结果保存为基线')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                       help='相对基线允许的实时率增幅 (默认0.2，即 20%%)')
+    parser.add_argument('--output', help='结果 JSON 输出路径')
+    return parser.parse_args()
+
+def create_processor(args) -> VideoProcessor:
+    """创建使用离线后端的处理器，并预先加载模型"""
+    processor = VideoProcessor()
+    processor.translation_service = OfflineTranslationService(
+        latency=args.translation_latency,
+        rate_limit=args.translation_rate
+    )
+    processor.tts_service = OfflineTTSService(latency=args.tts_latency)
+    processor.subtitle_generator.model_name = args.model
+    processor.speed_factor = args.speed
+    processor.streaming = args.stream
+    processor.use_cache = False
+    processor.save_intermediate = False
+    processor.write_perf_report = False
+    
+    # 模型加载不计入识别阶段
+    processor.subtitle_generator.model
+    return processor
+
+def run_scenario(processor: VideoProcessor, duration: float, args, work_dir: str) -> dict:
+    """运行单个场景，返回每个阶段的指标"""
+    name = f"{int(duration)}s-{args.resolution}-d{args.speech_density}"
+    video_path = os.path.join(work_dir, f"{name}.mp4")
+    output_path = os.path.join(work_dir, f"{name}_output.mp4")
+    
+    create_test_video(video_path, duration, args.resolution, args.speech_density, args.seed)
+    processor.temp_base_dir = os.path.join(work_dir, '.temp')
+    processor.process(video_path, output_path)
+    
+    media_seconds = duration / args.speed
+    report = processor.perf.to_dict()
+    stages = {}
+    for item in report['stages']:
+        wall = item['wall_seconds']
+        stages[item['stage']] = {
+            'wall_seconds': wall,
+            'cpu_seconds': item['cpu_seconds'],
+            'peak_rss_mb': item['peak_rss_mb'],
+            'rtf': round(wall / media_seconds, 4),
+            'throughput': round(media_seconds / wall, 2) if wall > 0 else None,
+            'counters': item['counters']
+        }
+    total = report['total_wall_seconds']
+    stages['total'] = {
+        'wall_seconds': total,
+        'cpu_seconds': report['total_cpu_seconds'],
+        'peak_rss_mb': report['peak_rss_mb'],
+        'rtf': round(total / media_seconds, 4),
+        'throughput': round(media_seconds / total, 2) if total > 0 else None,
+        'counters': report['counters']
+    }
+    return {'name': name, 'duration': duration, 'stages': stages}
+
+def compare(results: list, baseline: dict, tolerance: float) -> list:
+    """与基线比较，返回回归列表"""
+    regressions = []
+    for scenario in results:
+        base_stages = baseline.get(scenario['name'], {}).get('stages', {})
+        for stage, metrics in scenario['stages'].items():
+            base = base_stages.get(stage)
+            if not base or max(metrics['wall_seconds'], base['wall_seconds']) < MIN_COMPARE_SECONDS:
+                continue
+            change = metrics['rtf'] / base['rtf'] - 1 if base['rtf'] > 0 else 0.0
+            metrics['baseline_rtf'] = base['rtf']
+            metrics['change'] = round(change, 3)
+            if change > tolerance:
+                regressions.append((scenario['name'], stage, base['rtf'], metrics['rtf'], change))
+    return regressions
+
+def print_results(results: list):
+    """输出结果表格"""
+    for scenario in results:
+        print(f"\n场景: {scenario['name']}")
+        print(f"{'阶段':<12}{'耗时(s)':>10}{'CPU(s)':>10}{'实时率':>10}{'倍实时':>10}{'基线变化':>10}")
+        for stage, metrics in scenario['stages'].items():
+            change = f"{metrics['change']:+.1%}" if 'change' in metrics else '-'
+            throughput = metrics['throughput'] if metrics['throughput'] is not None else '-'
+            print(f"{stage:<12}{metrics['wall_seconds']:>10.2f}{metrics['cpu_seconds']:>10.2f}"
+                  f"{metrics['rtf']:>10.4f}{throughput:>10}{change:>10}")
+
+def main():
+    args = parse_args()
+    processor = create_processor(args)
+    
+    results = []
+    with tempfile.TemporaryDirectory(prefix='vp-bench-') as work_dir:
+        for duration in args.durations:
+            results.append(run_scenario(processor, duration, args, work_dir))
+    
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    print_results(results)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    
+    if args.save_baseline:
+        baseline.update({scenario['name']: scenario for scenario in results})
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+        print(f"\n基线已保存: {args.baseline}")
+        return 0
+    
+    if regressions:
+        print("\n性能回归:")
+        for name, stage, base_rtf, rtf, change in regressions:
+            print(f"  {name} / {stage}: 实时率 {base_rtf:.4f} -> {rtf:.4f} ({change:+.1%})")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import sys
+import types
+from videoprocessor import model_registry
+from videoprocessor.asr_engines import ENGINES, ASREngine, create_engine
+from videoprocessor.subtitle_generator import SubtitleGenerator
+
+class FakeWhisperModel:
+    """模拟 faster-whisper 模型，返回生成器形式的片段"""
+    def __init__(self, name, device=None, compute_type=None, cpu_threads=0):
+        self.config = (name, device, compute_type, cpu_threads)
+        self.options = None
+    
+    def transcribe(self, audio, initial_prompt=None, **options):
+        self.options = dict(options, initial_prompt=initial_prompt)
+        segments = (
+            types.SimpleNamespace(start=i * 2.0, end=i * 2.0 + 1.0, text=f" line {i}",
+                                  avg_logprob=-0.1 * i, compression_ratio=1.5)
+            for i in range(3)
+        )
+        return segments, None
+
+def test_faster_whisper_engine():
+    """测试 faster-whisper 引擎默认 int8 并返回统一格式的片段"""
+    saved = sys.modules.get('faster_whisper')
+    module = types.ModuleType('faster_whisper')
+    module.WhisperModel = FakeWhisperModel
+    sys.modules['faster_whisper'] = module
+    model_registry.clear()
+    try:
+        engine = create_engine('faster-whisper', 'small', threads=4)
+        assert engine.model.config == ('small', 'cpu', 'int8', 4)
+        assert engine.model is create_engine('faster-whisper', 'small', threads=4).model
+        
+        segments = engine.transcribe([0.0] * 16000, beam_size=5)
+        assert [s['start'] for s in segments] == [0.0, 2.0, 4.0]
+        assert segments[0]['confidence'] == 1.0
+        assert 0 < segments[2]['confidence'] < segments[1]['confidence'] < 1
+        assert engine.model.options == {'beam_size': 5, 'initial_prompt': None}
+        
+        # 字幕生成器的流式窗口只依赖引擎返回的片段
+        generator = SubtitleGenerator()
+        generator.engine, generator.model_name, generator.threads = 'faster-whisper', 'small', 4
+        texts = [segment['text'] for segment in generator.iter_segments([0.0] * 16000 * 10)]
+        assert texts == ['line 0', 'line 1', 'line 2']
+    finally:
+        model_registry.clear()
+        if saved is None:
+            sys.modules.pop('faster_whisper', None)
+        else:
+            sys.modules['faster_whisper'] = saved
+
+class CascadeEngine(ASREngine):
+    """小模型识别 4 个片段（第 2、3 个置信度低），大模型记录被重新识别的音频长度"""
+    name = 'cascade-test'
+    calls = []
+    
+    def transcribe(self, audio, initial_prompt=None, **options):
+        if self.model_name == 'base':
+            return [
+                {'start': 0.0, 'end': 2.0, 'text': 'a', 'avg_logprob': -0.2, 'compression_ratio': 1.2},
+                {'start': 3.0, 'end': 4.0, 'text': 'b', 'avg_logprob': -1.5, 'compression_ratio': 1.2},
+                {'start': 4.5, 'end': 6.0, 'text': 'c c c', 'avg_logprob': -0.3, 'compression_ratio': 3.0},
+                {'start': 8.0, 'end': 9.0, 'text': 'd', 'avg_logprob': -0.1, 'compression_ratio': 1.1},
+            ]
+        CascadeEngine.calls.append(len(audio) / 16000)
+        return [{'start': 0.1, 'end': 1.5, 'text': 'B'}, {'start': 1.6, 'end': 9.0, 'text': 'C'}]
+
+def test_cascade_refines_low_confidence_segments():
+    """测试两级识别只重新识别低置信度片段，并按截取位置合并"""
+    ENGINES[CascadeEngine.name] = CascadeEngine
+    try:
+        generator = SubtitleGenerator()
+        generator.engine = CascadeEngine.name
+        generator.cascade_model = 'medium'
+        audio = [0.0] * 16000 * 10
+        
+        segments = generator._refine_segments(audio, generator.asr_engine.transcribe(audio))
+        
+        # 片段 b、c 合并为 2.8-6.2 秒的一段音频重新识别
+        assert len(CascadeEngine.calls) == 1
+        assert abs(CascadeEngine.calls[0] - 3.4) < 1e-6
+        assert [s['text'] for s in segments] == ['a', 'B', 'C', 'd']
+        assert abs(segments[1]['start'] - 2.9) < 1e-6
+        # 重新识别的结果不越过截取范围
+        assert abs(segments[2]['end'] - 6.2) < 1e-6
+        
+        # 未启用时保持原样
+        generator.cascade_model = None
+        assert generator.cascade_options() is None
+        assert len(generator._refine_segments(audio, generator.asr_engine.transcribe(audio))) == 4
+    finally:
+        ENGINES.pop(CascadeEngine.name, None)
+
+def test_unknown_engine():
+    """测试不支持的引擎名称"""
+    try:
+        create_engine('vosk')
+        assert False, "应当抛出 ValueError"
+    except ValueError:
+        pass
+
+if __name__ == "__main__":
+    test_faster_whisper_engine()
+    test_cascade_refines_low_confidence_segments()
+    test_unknown_engine()
+    print("识别引擎测试通过!")
+    sys.exit(0)
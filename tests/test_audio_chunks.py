@@ -0,0 +1,30 @@
+import sys
+import numpy as np
+from videoprocessor.audio_chunks import split_on_silence
+
+def test_split_on_silence():
+    """测试在静音处切分音频，片段首尾相接且长度接近目标"""
+    sample_rate = 16000
+    rng = np.random.default_rng(0)
+    # 10 秒语音 + 1 秒静音，重复 6 次，共 66 秒
+    speech = 0.3 * rng.standard_normal(10 * sample_rate).astype(np.float32)
+    silence = np.zeros(sample_rate, dtype=np.float32)
+    audio = np.concatenate([np.concatenate([speech, silence]) for _ in range(6)])
+    
+    bounds = split_on_silence(audio, sample_rate, chunk_seconds=20)
+    
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(audio)
+    for (_, end), (start, _) in zip(bounds, bounds[1:]):
+        assert end == start
+        # 切分点落在静音段内（每 11 秒中的第 10-11 秒）
+        assert 10.0 <= (end / sample_rate) % 11 <= 11.0
+    for start, end in bounds[:-1]:
+        assert 10 <= (end - start) / sample_rate <= 30
+    
+    # 短音频不切分
+    assert split_on_silence(audio[:sample_rate * 5], sample_rate, chunk_seconds=20) == [(0, sample_rate * 5)]
+
+if __name__ == "__main__":
+    test_split_on_silence()
+    print("静音切分测试通过!")
+    sys.exit(0)
@@ -0,0 +1,95 @@
+import sys
+import time
+from videoprocessor.backend_health import BackendHealth, CLOSED, OPEN
+import videoprocessor.translation_service as translation_service
+from videoprocessor.translation_service import TranslationService
+
+def test_circuit_breaker():
+    """测试熔断器：连续失败后熔断，冷却结束后只放行一个试探请求"""
+    health = BackendHealth('google', failure_threshold=2, cooldown=0.05)
+    assert health.allow_request()
+    assert not health.record_failure()
+    assert health.record_failure()
+    assert health.state == OPEN and health.is_open
+    assert not health.allow_request()
+
+    time.sleep(0.06)
+    assert health.allow_request()
+    assert not health.allow_request()  # 试探请求进行中
+    assert health.record_failure()  # 试探失败，重新熔断
+    assert not health.allow_request()
+
+    time.sleep(0.06)
+    assert health.allow_request()
+    health.record_success(0.2)
+    assert health.state == CLOSED and health.allow_request()
+    assert health.to_dict()['failures'] == 3
+
+def test_translation_skips_open_backend():
+    """测试翻译服务故障时熔断并切换到健康的服务，后续字幕不再等待重试"""
+    translation_service._health.clear()
+    service = TranslationService()
+    service.use_memory = False
+    service.max_concurrency = 1
+    service.retry_delay = 0.05
+    service.circuit_cooldown = 60
+    service.rate_limits = {}
+    calls = {'google': 0, 'youdao': 0}
+
+    def google(text, target_language):
+        calls['google'] += 1
+        raise Exception("服务不可用")
+
+    def youdao(text, target_language):
+        calls['youdao'] += 1
+        return f"译文:{text}"
+
+    service.translators = [('google', google), ('youdao', youdao)]
+    texts = [f"line {i}" for i in range(20)]
+    started = time.monotonic()
+    assert service.translate_text(texts).split('\n') == [f"译文:{text}" for text in texts]
+
+    # google 只请求到熔断为止，之后的字幕直接使用 youdao
+    assert calls == {'google': 3, 'youdao': 20}
+    assert time.monotonic() - started < 0.5
+    assert service._preferred == 'youdao'
+    health = service.backend_health()
+    assert health['google']['state'] == OPEN
+    assert health['youdao']['success_rate'] == 1.0
+
+def test_preferred_backend_reused_until_degraded():
+    """测试首选服务一直复用，延迟明显变差时改用其他服务"""
+    translation_service._health.clear()
+    service = TranslationService()
+    service.translators = [('google', None), ('youdao', None)]
+    assert [name for name, _ in service._backend_order()] == ['google', 'youdao']
+
+    service._backend_health('google').record_success(0.1)
+    service._backend_health('youdao').record_success(0.05)
+    assert service._backend_order()[0][0] == 'google'
+
+    for _ in range(10):
+        service._backend_health('google').record_success(1.0)
+    assert service._backend_order()[0][0] == 'youdao'
+    assert service._backend_order()[0][0] == 'youdao'
+
+def test_health_shared_between_services():
+    """测试同一进程中的多个翻译服务实例（服务模式的槽位）共用熔断状态"""
+    translation_service._health.clear()
+    first, second = TranslationService(), TranslationService()
+    for service in (first, second):
+        service.translators = [('google', None), ('youdao', None)]
+    for _ in range(first.failure_threshold):
+        first._backend_health('google').record_failure()
+
+    # 另一个实例不再重新探测已熔断的服务
+    assert second.backend_health()['google']['state'] == OPEN
+    assert [name for name, _ in second._backend_order()] == ['youdao']
+
+if __name__ == "__main__":
+    test_circuit_breaker()
+    test_translation_skips_open_backend()
+    test_preferred_backend_reused_until_degraded()
+    test_health_shared_between_services()
+    print("熔断与服务选择测试通过!")
+    sys.exit(0)
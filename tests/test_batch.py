@@ -0,0 +1,145 @@
+import os
+import sys
+import json
+import tempfile
+import videoprocessor.batch as batch
+import videoprocessor.video_processor as video_processor
+from videoprocessor.batch import collect_jobs, is_batch_source
+from videoprocessor.video_processor import VideoProcessor
+
+def test_collect_jobs_sources():
+    """测试目录、通配符和清单文件三种批处理输入"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name in ('ep2.mp4', 'ep1.mkv', 'notes.txt'):
+            open(os.path.join(work_dir, name), 'w').close()
+        
+        # 目录：只收集视频文件，按名称排序
+        jobs = collect_jobs(work_dir, output_dir='out')
+        assert [os.path.basename(i) for i, _ in jobs] == ['ep1.mkv', 'ep2.mp4']
+        assert jobs[0][1] == os.path.join('out', 'ep1_output.mp4')
+        
+        # 通配符
+        pattern = os.path.join(work_dir, '*.mp4')
+        assert is_batch_source(pattern)
+        assert [os.path.basename(i) for i, _ in collect_jobs(pattern)] == ['ep2.mp4']
+        
+        # 文本清单：相对路径以清单所在目录为基准
+        list_path = os.path.join(work_dir, 'jobs.lst')
+        with open(list_path, 'w') as f:
+            f.write('# season 1\nep1.mkv\n\nep2.mp4\n')
+        jobs = collect_jobs(list_path)
+        assert jobs[1] == (os.path.join(work_dir, 'ep2.mp4'), os.path.join(work_dir, 'ep2_output.mp4'))
+        
+        # JSON 清单：可以指定输出路径
+        json_path = os.path.join(work_dir, 'jobs.json')
+        with open(json_path, 'w') as f:
+            json.dump([{'input': 'ep1.mkv', 'output': '/tmp/ep1_zh.mp4'}, 'ep2.mp4'], f)
+        jobs = collect_jobs(json_path)
+        assert jobs[0] == (os.path.join(work_dir, 'ep1.mkv'), '/tmp/ep1_zh.mp4')
+        assert len(jobs) == 2
+
+class FakeMediaInfo:
+    video_stream = {'index': 0}
+
+class FakeSubtitleGenerator:
+    """模拟语音识别：字幕内容为输入文件的内容"""
+    language = None
+    engine = 'whisper'
+    compute_type = None
+    model_name = 'base'
+    model = None
+    window_seconds = 30
+    chunk_seconds = 30
+    workers = 1
+
+    def decode_options(self):
+        return {}
+
+    def cascade_options(self):
+        return {}
+
+    def close(self):
+        pass
+
+    def generate(self, audio, output_path):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(f"1\n00:00:00,000 --> 00:00:01,000\n{audio}\n")
+        return output_path
+
+class FakeAudioExtractor:
+    def extract_samples(self, input_path, speed=1.0):
+        with open(input_path, encoding='utf-8') as f:
+            return f.read()
+
+class FakeTranslationService:
+    def close(self):
+        pass
+
+    def translate_text(self, texts, target_language='zh-cn', use_batch=True):
+        return '\n'.join(texts) if isinstance(texts, list) else texts
+
+class FakeTTSService:
+    min_speed = max_speed = speed_adjust_factor = max_speed_diff = 1.0
+    sample_rate = 16000
+    channels = 1
+
+    def synthesize(self, subtitle_path, output_path=None, **kwargs):
+        open(output_path, 'w').close()
+        return output_path
+
+class FakeComposer:
+    profile = 'balanced'
+    encoder_profile = {}
+
+    def compose(self, video_path, audio_path, subtitle_path, output_path, **kwargs):
+        open(output_path, 'w').close()
+        return output_path
+
+def _fake_processor(work_dir: str) -> VideoProcessor:
+    """各组件都替换为模拟实现的处理器"""
+    processor = VideoProcessor()
+    processor.temp_base_dir = os.path.join(work_dir, '.temp')
+    processor.use_cache = False
+    processor.use_embedded_subs = False
+    processor.write_perf_report = False
+    processor.subtitle_generator = FakeSubtitleGenerator()
+    processor.audio_extractor = FakeAudioExtractor()
+    processor.translation_service = FakeTranslationService()
+    processor.tts_service = FakeTTSService()
+    processor.video_composer = FakeComposer()
+    return processor
+
+def test_batch_jobs_keep_own_output_dir():
+    """测试同一个工作进程处理的任务把中间字幕保存到各自的输出目录"""
+    original_probe = video_processor.probe
+    video_processor.probe = lambda path, perf=None: FakeMediaInfo()
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            # 两个输入文件名相同，输出目录不同
+            jobs = []
+            for season in ('s1', 's2'):
+                input_path = os.path.join(work_dir, season, 'ep1.mp4')
+                os.makedirs(os.path.dirname(input_path))
+                with open(input_path, 'w', encoding='utf-8') as f:
+                    f.write(f"{season} line")
+                jobs.append((input_path, os.path.join(work_dir, f"out_{season}", 'ep1_output.mp4')))
+
+            batch._worker_processor = _fake_processor(work_dir)
+            results = [batch._process_job(input_path, output_path) for input_path, output_path in jobs]
+            assert [result['status'] for result in results] == ['success', 'success']
+
+            for season in ('s1', 's2'):
+                out_dir = os.path.join(work_dir, f"out_{season}")
+                assert os.path.exists(os.path.join(out_dir, 'ep1_output.mp4'))
+                with open(os.path.join(out_dir, 'ep1_original.srt'), encoding='utf-8') as f:
+                    assert f"{season} line" in f.read()
+                assert os.path.exists(os.path.join(out_dir, 'ep1_translated.srt'))
+    finally:
+        video_processor.probe = original_probe
+        batch._worker_processor = None
+
+if __name__ == "__main__":
+    test_collect_jobs_sources()
+    test_batch_jobs_keep_own_output_dir()
+    print("批处理输入测试通过!")
+    sys.exit(0)
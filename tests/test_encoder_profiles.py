@@ -0,0 +1,36 @@
+import sys
+from videoprocessor.video_composer import VideoComposer
+
+def test_encoder_profiles():
+    """测试编码配置：编码参数、分辨率上限和滤镜链"""
+    composer = VideoComposer()
+    composer._get_video_dimensions = lambda video_path: (1920, 1080)
+
+    # 默认配置与原有编码参数一致，不缩放
+    assert composer._video_encoder_args() == ['-c:v', 'libx264', '-preset', 'medium', '-crf', '23']
+    assert composer._output_size(1920, 1080) == (1920, 1080)
+    assert 'scale=' not in composer._build_video_filter('in.mp4', 'sub.srt')
+
+    # 预览配置降到 480p，缩放在烧录字幕之前，delogo 区域按缩放后的尺寸计算
+    composer.profile = 'preview'
+    composer.threads = 4
+    assert composer._video_encoder_args() == ['-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '30',
+                                              '-threads', '4']
+    assert composer._output_size(1920, 1080) == (854, 480)
+    assert composer._output_size(1080, 1920) == (270, 480)
+    video_filter = composer._build_video_filter('in.mp4', 'sub.srt', speed=1.5, remove_original_subs=True)
+    assert video_filter.startswith('[0:v]setpts=')
+    assert 'scale=854:480,delogo=x=0:y=360:w=854:h=120' in video_filter
+    assert video_filter.index('scale=') < video_filter.index('subtitles=')
+
+    composer.profile = 'unknown'
+    try:
+        composer.encoder_profile
+        assert False, "未知编码配置应抛出异常"
+    except ValueError:
+        pass
+
+if __name__ == "__main__":
+    test_encoder_profiles()
+    print("编码配置测试通过!")
+    sys.exit(0)
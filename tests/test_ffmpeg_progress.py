@@ -0,0 +1,76 @@
+import io
+import sys
+from collections import deque
+from videoprocessor.utils.ffmpeg import parse_progress, follow_progress
+from videoprocessor.utils.progress import ProgressDisplay
+
+PROGRESS_OUTPUT = b"""Input #0, matroska,webm, from 'in.mkv':
+frame=120
+fps=60.00
+bitrate=1000.0kbits/s
+total_size=524288
+out_time_us=5000000
+out_time=00:00:05.000000
+speed=2.5x
+progress=continue
+[libx264 @ 0x1] frame I:1 Avg QP:20.00
+frame=240
+fps=60.00
+total_size=1048576
+out_time_us=10000000
+speed=2.5x
+progress=end
+"""
+
+def test_parse_progress():
+    """测试进度信息换算：百分比和按速度倍数估算的剩余时间"""
+    info = parse_progress({'frame': '120', 'fps': '60.00', 'out_time_us': '5000000',
+                           'speed': '2.5x', 'total_size': '524288', 'progress': 'continue'},
+                          name='compose', duration=20.0, elapsed=2.0)
+    assert info['frame'] == 120 and info['fps'] == 60.0
+    assert info['out_time'] == 5.0 and info['speed'] == 2.5
+    assert info['percent'] == 25.0
+    assert info['eta'] == 6.0  # 剩余 15 秒输出 / 2.5 倍速
+    assert not info['done']
+
+    # 速度未知时按已用时间估算
+    info = parse_progress({'out_time_us': '5000000', 'speed': 'N/A', 'progress': 'continue'},
+                          duration=20.0, elapsed=2.0)
+    assert info['speed'] is None and info['eta'] == 6.0
+
+def test_follow_progress():
+    """测试逐行解析 -progress 输出，日志行保留在 tail 中"""
+    updates = []
+    tail = deque(maxlen=10)
+    last = follow_progress(io.BytesIO(PROGRESS_OUTPUT), 'compose', updates.append, 10.0, tail)
+
+    assert [update['frame'] for update in updates] == [120, 240]
+    assert updates[0]['percent'] == 50.0
+    assert last['done'] and last['percent'] == 100.0 and last['eta'] == 0.0
+    assert len(tail) == 2 and tail[1].startswith('[libx264')
+
+    # 回调出错时继续读完
+    def failing(info):
+        raise ValueError('boom')
+    tail.clear()
+    last = follow_progress(io.BytesIO(PROGRESS_OUTPUT), 'compose', failing, 10.0, tail)
+    assert last['done']
+    assert any('boom' in line for line in tail)
+
+def test_progress_display():
+    """测试进度显示（非终端输出时按间隔输出，结束时总会输出）"""
+    stream = io.StringIO()
+    display = ProgressDisplay(stream, interval=3600)
+    follow_progress(io.BytesIO(PROGRESS_OUTPUT), 'compose', display, 10.0)
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    assert lines[0].startswith('[compose]') and '50.0%' in lines[0] and '2.50x' in lines[0]
+    assert '100.0%' in lines[1] and '剩余' not in lines[1]
+
+if __name__ == "__main__":
+    test_parse_progress()
+    test_follow_progress()
+    test_progress_display()
+    print("FFmpeg 进度测试通过!")
+    sys.exit(0)
@@ -0,0 +1,37 @@
+import os
+import sys
+import tempfile
+from videoprocessor.job_manifest import JobManifest
+
+def test_job_manifest_resume():
+    """测试任务清单记录并恢复阶段和配音片段"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        manifest_path = os.path.join(work_dir, 'manifest.json')
+        srt_path = os.path.join(work_dir, 'original.srt')
+        segment_path = os.path.join(work_dir, 'temp_1.wav')
+        for path in (srt_path, segment_path):
+            with open(path, 'w') as f:
+                f.write('data')
+        
+        manifest = JobManifest(manifest_path)
+        manifest.reset('input.mp4', 'output.mp4')
+        manifest.mark_stage('transcribe', 'key-a', {'srt': srt_path})
+        manifest.mark_segment('tts-key', 1, segment_path)
+        
+        # 重新加载，模拟失败后再次运行
+        resumed = JobManifest(manifest_path)
+        assert resumed.matches('input.mp4', 'output.mp4')
+        assert not resumed.matches('other.mp4', 'output.mp4')
+        assert resumed.get_stage('transcribe', 'key-a') == {'srt': srt_path}
+        assert resumed.get_stage('transcribe', 'key-b') is None
+        assert resumed.get_segments('tts-key') == {1: segment_path}
+        assert resumed.get_segments('other-key') == {}
+        
+        # 产物丢失时不再视为已完成
+        os.remove(srt_path)
+        assert resumed.get_stage('transcribe', 'key-a') is None
+
+if __name__ == "__main__":
+    test_job_manifest_resume()
+    print("任务清单测试通过!")
+    sys.exit(0)
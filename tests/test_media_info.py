@@ -0,0 +1,80 @@
+import os
+import sys
+import json
+import tempfile
+import subprocess
+from videoprocessor import media_info
+from videoprocessor.media_info import MediaInfo
+
+PROBE_OUTPUT = {
+    'format': {'format_name': 'matroska,webm', 'duration': '120.5', 'bit_rate': '2000000', 'size': '30125000'},
+    'streams': [
+        {'index': 0, 'codec_type': 'video', 'codec_name': 'h264', 'width': 1920, 'height': 1080,
+         'avg_frame_rate': '30000/1001', 'r_frame_rate': '30000/1001', 'disposition': {'default': 1}},
+        {'index': 1, 'codec_type': 'audio', 'codec_name': 'aac', 'sample_rate': '48000', 'channels': 2,
+         'tags': {'language': 'eng'}},
+        {'index': 2, 'codec_type': 'subtitle', 'codec_name': 'subrip', 'tags': {'language': 'eng', 'title': 'English'},
+         'disposition': {'default': 1, 'forced': 0}},
+        {'index': 3, 'codec_type': 'video', 'codec_name': 'mjpeg', 'avg_frame_rate': '0/0',
+         'disposition': {'attached_pic': 1}}
+    ],
+    'packets': [
+        {'stream_index': 0, 'pts_time': '0.000000', 'flags': 'K__'},
+        {'stream_index': 0, 'pts_time': '0.033367', 'flags': '___'},
+        {'stream_index': 1, 'pts_time': '0.000000', 'flags': 'K__'},
+        {'stream_index': 0, 'pts_time': '2.002000', 'flags': 'K__'},
+        {'stream_index': 0, 'pts_time': '4.004000', 'flags': 'K__'}
+    ]
+}
+
+def test_media_info_parse():
+    """测试从 FFprobe 输出解析流、帧率和关键帧间隔"""
+    info = MediaInfo('movie.mkv', PROBE_OUTPUT)
+
+    assert info.duration == 120.5
+    assert (info.width, info.height) == (1920, 1080)
+    assert info.fps == 29.97
+    assert info.video_codec == 'h264' and info.audio_codec == 'aac'
+    assert info.keyframe_interval == 2.002
+    assert [stream['index'] for stream in info.subtitle_streams] == [2]
+    assert info.subtitle_streams[0]['language'] == 'eng'
+    assert info.audio_streams[0]['sample_rate'] == 48000
+    # 封面图不作为视频流
+    assert info.video_stream['index'] == 0
+    assert len(info.streams_of('video')) == 2
+
+def test_probe_cached():
+    """测试同一文件只探测一次，文件改变后重新探测"""
+    calls = []
+
+    def fake_run_ffmpeg(command, name='ffmpeg', perf=None):
+        calls.append(command)
+        return subprocess.CompletedProcess(command, 0, stdout=json.dumps(PROBE_OUTPUT), stderr='')
+
+    original = media_info.run_ffmpeg
+    media_info.run_ffmpeg = fake_run_ffmpeg
+    media_info.clear()
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            path = os.path.join(work_dir, 'movie.mkv')
+            with open(path, 'wb') as f:
+                f.write(b'x')
+
+            first = media_info.probe(path)
+            assert media_info.probe(path) is first
+            assert len(calls) == 1
+            assert calls[0][0] == 'ffprobe' and calls[0][-1] == path
+
+            with open(path, 'ab') as f:
+                f.write(b'y')
+            assert media_info.probe(path) is not first
+            assert len(calls) == 2
+    finally:
+        media_info.run_ffmpeg = original
+        media_info.clear()
+
+if __name__ == "__main__":
+    test_media_info_parse()
+    test_probe_cached()
+    print("媒体信息测试通过!")
+    sys.exit(0)
@@ -0,0 +1,51 @@
+import sys
+import types
+from videoprocessor import model_registry
+from videoprocessor.subtitle_generator import SubtitleGenerator
+
+def _fake_modules(loads):
+    """替换 whisper 和 torch，记录模型加载"""
+    whisper = types.ModuleType('whisper')
+    whisper.load_model = lambda name, device=None: loads.append((name, device)) or object()
+    torch = types.ModuleType('torch')
+    torch.set_num_threads = lambda threads: None
+    torch.cuda = types.SimpleNamespace(is_available=lambda: False)
+    return {'whisper': whisper, 'torch': torch}
+
+def test_model_shared_across_generators():
+    """测试同一进程中相同配置的模型只加载一次"""
+    loads = []
+    saved = {name: sys.modules.get(name) for name in ('whisper', 'torch')}
+    sys.modules.update(_fake_modules(loads))
+    model_registry.clear()
+    try:
+        first, second = SubtitleGenerator(), SubtitleGenerator()
+        assert first.model is second.model
+        
+        preview = SubtitleGenerator()
+        preview.model_name = 'tiny'
+        assert preview.model is not first.model
+        assert preview.model is model_registry.get_model('tiny', 'cpu')
+        
+        assert loads == [('base', 'cpu'), ('tiny', 'cpu')]
+        assert set(model_registry.loaded_models()) == {
+            ('whisper', 'base', 'cpu', None, None),
+            ('whisper', 'tiny', 'cpu', None, None)
+        }
+        
+        # 解码参数只包含已设置的项
+        assert first.decode_options() == {}
+        first.beam_size, first.temperature, first.language = 5, (0.0, 0.4), 'en'
+        assert first.decode_options() == {'beam_size': 5, 'temperature': (0.0, 0.4), 'language': 'en'}
+    finally:
+        model_registry.clear()
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+if __name__ == "__main__":
+    test_model_shared_across_generators()
+    print("模型注册表测试通过!")
+    sys.exit(0)
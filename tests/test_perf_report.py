@@ -0,0 +1,58 @@
+import os
+import sys
+import json
+import tempfile
+from videoprocessor.perf_report import PerfReport
+from videoprocessor.utils.ffmpeg import run_ffmpeg
+
+def test_perf_report_stage_and_command():
+    """测试阶段计数器和子进程记录"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        report = PerfReport()
+        output_path = os.path.join(work_dir, 'out.bin')
+        
+        with report.stage('translate'):
+            report.increment('translation.requests', 3)
+            report.increment('translation.retries')
+        
+        with report.stage('compose'):
+            # 用 Python 子进程代替 FFmpeg：输出文件为命令的最后一个参数
+            command = [sys.executable, '-c',
+                       'import sys; open(sys.argv[1], "wb").write(b"x" * 4096)', output_path]
+            result = run_ffmpeg(command, 'compose', report)
+            assert result.returncode == 0
+        
+        translate, compose = report.stages
+        assert translate['counters'] == {'translation.requests': 3, 'translation.retries': 1}
+        assert compose['counters'] == {}
+        assert compose['bytes_written'] >= 4096
+        assert report.commands[0]['name'] == 'compose'
+        assert report.commands[0]['bytes_written'] == 4096
+        
+        report_path = report.save(os.path.join(work_dir, 'perf.json'))
+        with open(report_path, encoding='utf-8') as f:
+            data = json.load(f)
+        assert [item['stage'] for item in data['stages']] == ['translate', 'compose']
+        assert 'translate' in report.format_table()
+
+def test_perf_report_nested_stages():
+    """测试嵌套阶段只在最外层计入总计"""
+    report = PerfReport()
+    with report.stage('transcribe'):
+        with report.stage('audio'):
+            pass
+    with report.stage('compose'):
+        pass
+    
+    stages = {item['stage']: item for item in report.stages}
+    assert stages['audio']['depth'] == 1 and stages['transcribe']['depth'] == 0
+    data = report.to_dict()
+    expected = stages['transcribe']['wall_seconds'] + stages['compose']['wall_seconds']
+    assert abs(data['total_wall_seconds'] - expected) < 0.002
+    assert '  audio' in report.format_table()
+
+if __name__ == "__main__":
+    test_perf_report_stage_and_command()
+    test_perf_report_nested_stages()
+    print("性能报告测试通过!")
+    sys.exit(0)
@@ -0,0 +1,249 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import types
+import threading
+import urllib.request
+import videoprocessor.video_processor as video_processor
+from videoprocessor import model_registry
+from videoprocessor.server import JobService, create_server
+from videoprocessor.subtitle_generator import SubtitleGenerator
+from test_batch import FakeMediaInfo, _fake_processor
+
+class FakeModelHolder:
+    """模拟字幕生成器，记录模型加载次数"""
+    loads = 0
+    model_name = 'base'
+    
+    @property
+    def model(self):
+        FakeModelHolder.loads += 1
+        return object()
+
+class FakeComposer:
+    profile = 'balanced'
+
+class FakeProcessor:
+    """模拟处理器：复制输入文件作为输出"""
+    def __init__(self):
+        self.subtitle_generator = FakeModelHolder()
+        self.video_composer = FakeComposer()
+        self.speed_factor = 1.0
+        self.voice_name = None
+        self.remove_original_subs = False
+        self.streaming = False
+        self.save_intermediate = True
+        self.perf = None
+        self.speeds = []
+        self.closed = False
+    
+    def close(self):
+        self.closed = True
+    
+    def process(self, input_path, output_path):
+        self.speeds.append(self.speed_factor)
+        if 'bad' in input_path:
+            raise Exception("处理失败")
+        with open(input_path, 'rb') as src, open(output_path, 'wb') as dst:
+            dst.write(src.read())
+        return output_path
+
+def _request(url, data=None):
+    body = json.dumps(data).encode('utf-8') if data is not None else None
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=body)) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def test_job_service_http():
+    """测试提交任务、查询状态，以及模型只在启动时加载"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        good = os.path.join(work_dir, 'good.mp4')
+        bad = os.path.join(work_dir, 'bad.mp4')
+        for path in (good, bad):
+            with open(path, 'w') as f:
+                f.write('video')
+        
+        FakeModelHolder.loads = 0
+        service = JobService({'keep_temp_files': True}, concurrency=2, processor_factory=FakeProcessor)
+        service.start()
+        server = create_server(service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        
+        try:
+            status, job = _request(f"{base}/jobs", {'input': good, 'options': {'speed': '1.5'}})
+            assert status == 202 and job['status'] in ('queued', 'running', 'success')
+            _, failed = _request(f"{base}/jobs", {'input': bad})
+            
+            # 参数校验
+            assert _request(f"{base}/jobs", {'input': os.path.join(work_dir, 'missing.mp4')})[0] == 400
+            assert _request(f"{base}/jobs", {'input': good, 'options': {'crf': 1}})[0] == 400
+            assert _request(f"{base}/jobs", {'input': good, 'options': {'speed': 'fast'}})[0] == 400
+            assert _request(f"{base}/jobs", {'input': good, 'options': ['speed']})[0] == 400
+            assert _request(f"{base}/jobs", [])[0] == 400
+            assert _request(f"{base}/jobs", "x")[0] == 400
+            assert _request(f"{base}/jobs/unknown")[0] == 404
+            
+            deadline = time.time() + 5
+            while time.time() < deadline:
+                jobs = _request(f"{base}/jobs")[1]
+                if all(item['status'] in ('success', 'failed') for item in jobs):
+                    break
+                time.sleep(0.05)
+            
+            assert _request(f"{base}/jobs/{job['id']}")[1]['status'] == 'success'
+            assert os.path.exists(os.path.join(work_dir, 'good_output.mp4'))
+            result = _request(f"{base}/jobs/{failed['id']}")[1]
+            assert result['status'] == 'failed' and result['error'] == '处理失败'
+            assert _request(f"{base}/health")[1]['concurrency'] == 2
+            
+            # 每个槽位只加载一次模型，任务参数不影响之后的任务
+            assert FakeModelHolder.loads == 2
+            assert all(p.keep_temp_files for p in service.processors)
+            # 速度因子按转换后的数值保存和应用
+            assert _request(f"{base}/jobs/{job['id']}")[1]['options'] == {'speed': 1.5}
+            speeds = sorted(s for p in service.processors for s in p.speeds)
+            assert speeds == [1.0, 1.5]
+        finally:
+            server.shutdown()
+            server.server_close()
+            service.stop()
+
+def test_finished_jobs_pruned():
+    """测试已结束的任务记录超过上限时丢弃最早的记录"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_path = os.path.join(work_dir, 'good.mp4')
+        with open(input_path, 'w') as f:
+            f.write('video')
+        
+        service = JobService(concurrency=1, processor_factory=FakeProcessor, max_jobs=2)
+        service.start()
+        try:
+            job_ids = [service.submit(input_path)['id'] for _ in range(4)]
+            deadline = time.time() + 5
+            while time.time() < deadline and any(
+                job['status'] in ('queued', 'running') for job in service.list()
+            ):
+                time.sleep(0.02)
+            assert list(service.jobs) == job_ids[2:]
+            assert service.get(job_ids[0]) is None
+        finally:
+            processors = list(service.processors)
+            service.stop()
+        # 停止服务时关闭各处理器的连接
+        assert processors and all(p.closed for p in processors)
+
+def test_slot_jobs_keep_own_output_dir():
+    """测试同一个槽位先后处理的任务把中间字幕保存到各自的输出目录"""
+    original_probe = video_processor.probe
+    video_processor.probe = lambda path, perf=None: FakeMediaInfo()
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            service = JobService(concurrency=1, processor_factory=lambda: _fake_processor(work_dir))
+            service.start()
+            try:
+                jobs = []
+                for name in ('a', 'b'):
+                    input_path = os.path.join(work_dir, f"{name}.mp4")
+                    with open(input_path, 'w', encoding='utf-8') as f:
+                        f.write(f"{name} line")
+                    output_path = os.path.join(work_dir, f"out_{name}", f"{name}_output.mp4")
+                    jobs.append(service.submit(input_path, output_path))
+                
+                deadline = time.time() + 5
+                while time.time() < deadline and any(
+                    service.get(job['id'])['status'] in ('queued', 'running') for job in jobs
+                ):
+                    time.sleep(0.02)
+                assert [service.get(job['id'])['status'] for job in jobs] == ['success', 'success']
+                
+                for name in ('a', 'b'):
+                    out_dir = os.path.join(work_dir, f"out_{name}")
+                    assert os.path.exists(os.path.join(out_dir, f"{name}_original.srt"))
+                    assert os.path.exists(os.path.join(out_dir, f"{name}_translated.srt"))
+                assert not os.path.exists(os.path.join(work_dir, 'out_a', 'b_original.srt'))
+            finally:
+                service.stop()
+    finally:
+        video_processor.probe = original_probe
+
+class FakeWhisperModel:
+    """模拟 whisper 模型：记录同时进行的解码数"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+    
+    def transcribe(self, audio, initial_prompt=None, **options):
+        with self.lock:
+            self.active += 1
+            self.calls += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        return {'segments': [{'start': 0.0, 'end': 1.0, 'text': audio}]}
+
+def test_slots_share_model_without_concurrent_decoding():
+    """测试两个槽位同时处理任务：共用一份 whisper 模型，解码不重叠"""
+    model = FakeWhisperModel()
+    loads = []
+    whisper = types.ModuleType('whisper')
+    whisper.load_model = lambda name, device=None: loads.append(name) or model
+    torch = types.ModuleType('torch')
+    torch.set_num_threads = lambda threads: None
+    torch.cuda = types.SimpleNamespace(is_available=lambda: False)
+    saved = {name: sys.modules.get(name) for name in ('whisper', 'torch')}
+    sys.modules.update({'whisper': whisper, 'torch': torch})
+    original_probe = video_processor.probe
+    video_processor.probe = lambda path, perf=None: FakeMediaInfo()
+    model_registry.clear()
+    
+    def make_processor():
+        processor = _fake_processor(work_dir)
+        processor.subtitle_generator = SubtitleGenerator()
+        return processor
+    
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            service = JobService(concurrency=2, processor_factory=make_processor)
+            service.start()
+            try:
+                jobs = []
+                for i in range(4):
+                    input_path = os.path.join(work_dir, f"ep{i}.mp4")
+                    with open(input_path, 'w', encoding='utf-8') as f:
+                        f.write(f"line {i}")
+                    jobs.append(service.submit(input_path))
+                
+                deadline = time.time() + 5
+                while time.time() < deadline and any(
+                    service.get(job['id'])['status'] in ('queued', 'running') for job in jobs
+                ):
+                    time.sleep(0.02)
+                assert [service.get(job['id'])['status'] for job in jobs] == ['success'] * 4
+            finally:
+                service.stop()
+        
+        assert loads == ['base']
+        assert model.calls == 4 and model.max_active == 1
+    finally:
+        model_registry.clear()
+        video_processor.probe = original_probe
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+if __name__ == "__main__":
+    test_job_service_http()
+    test_finished_jobs_pruned()
+    test_slot_jobs_keep_own_output_dir()
+    test_slots_share_model_without_concurrent_decoding()
+    print("任务服务测试通过!")
@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import tempfile
+from videoprocessor.stage_cache import StageCache
+
+def _write(path: str, size: int) -> str:
+    with open(path, 'wb') as f:
+        f.write(os.urandom(size))
+    return path
+
+def test_stage_cache_hit_and_key():
+    """测试缓存命中与键的参数敏感性"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        cache = StageCache(os.path.join(work_dir, 'cache'), max_size_mb=10)
+        source = _write(os.path.join(work_dir, 'input.bin'), 1024)
+        source_hash = cache.hash_file(source)
+        
+        key = cache.make_key('tts', upstream=source_hash, voice='yunxi')
+        assert cache.get(key) is None
+        assert key != cache.make_key('tts', upstream=source_hash, voice='xiaoxiao')
+        assert key == cache.make_key('tts', voice='yunxi', upstream=source_hash)
+        
+        artifact = _write(os.path.join(work_dir, 'dubbed.wav'), 2048)
+        stored = cache.put(key, {'audio': artifact}, stage='tts')
+        os.remove(artifact)
+        
+        cached = cache.get(key)
+        assert cached == stored
+        assert os.path.getsize(cached['audio']) == 2048
+
+def test_stage_cache_lru_eviction():
+    """测试超过大小上限时淘汰最久未使用的条目"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        cache = StageCache(os.path.join(work_dir, 'cache'), max_size_mb=1)
+        artifact = os.path.join(work_dir, 'artifact.bin')
+        
+        keys = [cache.make_key('audio', index=i) for i in range(3)]
+        for key in keys[:2]:
+            cache.put(key, {'audio': _write(artifact, 400 * 1024)})
+            time.sleep(0.01)
+        
+        # 访问第一个条目，使第二个条目成为最久未使用
+        assert cache.get(keys[0]) is not None
+        time.sleep(0.01)
+        cache.put(keys[2], {'audio': _write(artifact, 400 * 1024)})
+        
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[2]) is not None
+
+if __name__ == "__main__":
+    test_stage_cache_hit_and_key()
+    test_stage_cache_lru_eviction()
+    print("阶段缓存测试通过!")
+    sys.exit(0)
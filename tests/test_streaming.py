@@ -0,0 +1,85 @@
+import os
+import sys
+import tempfile
+import threading
+from videoprocessor.streaming import StreamingPipeline
+
+class FakeGenerator:
+    """按固定间隔产出片段的识别器"""
+    def iter_segments(self, audio_path):
+        for i in range(25):
+            yield {'start': i * 2.0, 'end': i * 2.0 + 1.5, 'text': f"line {i + 1}"}
+
+class FakeTranslator:
+    def __init__(self):
+        self.calls = 0
+    
+    def translate_text(self, texts, target_language='zh-cn', use_batch=False):
+        self.calls += 1
+        return '\n'.join(f"译 {line}" for text in texts for line in text.split('\n'))
+
+class FakeTTS:
+    def __init__(self):
+        self.threads = set()
+        self.merged = None
+    
+    def synthesize_segments(self, subs, temp_dir, target_language='zh-cn', voice_name=None,
+                            completed_segments=None, on_segment_done=None):
+        self.threads.add(threading.current_thread().name)
+        return [
+            {'path': os.path.join(temp_dir, f"temp_{sub.index}.wav"),
+             'start_time': sub.start, 'end_time': sub.end}
+            for sub in subs
+        ]
+    
+    def merge_segments(self, audio_segments, output_path):
+        self.merged = audio_segments
+        return output_path
+
+def test_streaming_pipeline_order():
+    """测试流式管线按批次处理且保持字幕顺序"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        translator = FakeTranslator()
+        tts = FakeTTS()
+        pipeline = StreamingPipeline(FakeGenerator(), translator, tts, batch_size=10)
+        
+        result = pipeline.run(
+            'audio.wav',
+            os.path.join(work_dir, 'original.srt'),
+            os.path.join(work_dir, 'translated.srt'),
+            os.path.join(work_dir, 'dubbed.wav'),
+            work_dir
+        )
+        
+        # 25 条字幕按 10 条一批，共 3 次批量翻译
+        assert translator.calls == 3
+        assert tts.threads == {'stream-tts'}
+        assert len(tts.merged) == 25
+        
+        with open(result['translated_srt'], encoding='utf-8') as f:
+            content = f.read()
+        assert content.index('译 line 1\n') < content.index('译 line 25\n')
+
+def test_streaming_timestamp_scale():
+    """测试识别原始音频时按速度因子缩放字幕时间轴"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        tts = FakeTTS()
+        pipeline = StreamingPipeline(FakeGenerator(), FakeTranslator(), tts, timestamp_scale=1 / 0.8)
+        pipeline.run(
+            'audio.wav',
+            os.path.join(work_dir, 'original.srt'),
+            os.path.join(work_dir, 'translated.srt'),
+            os.path.join(work_dir, 'dubbed.wav'),
+            work_dir
+        )
+        
+        # 第 2 条字幕原始为 2.0-3.5 秒，0.8 倍速时为 2.5-4.375 秒
+        second = tts.merged[1]
+        assert second['start_time'].total_seconds() == 2.5
+        assert second['end_time'].total_seconds() == 4.375
+
+if __name__ == "__main__":
+    test_streaming_pipeline_order()
+    test_streaming_timestamp_scale()
+    print("流式管线测试通过!")
+    sys.exit(0)
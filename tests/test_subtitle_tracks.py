@@ -0,0 +1,82 @@
+import sys
+import videoprocessor.subtitle_tracks as subtitle_tracks
+from videoprocessor.media_info import MediaInfo
+from videoprocessor.subtitle_tracks import EmbeddedSubtitleExtractor, normalize_language
+
+def _track(index, codec='subrip', language=None, default=False, forced=False, hearing_impaired=False):
+    return {
+        'index': index, 'codec': codec, 'language': language, 'title': '',
+        'default': default, 'forced': forced, 'hearing_impaired': hearing_impaired
+    }
+
+def test_normalize_language():
+    """测试语言代码统一"""
+    assert normalize_language('eng') == 'en'
+    assert normalize_language('en-US') == 'en'
+    assert normalize_language('zh-cn') == 'zh'
+    assert normalize_language('und') is None
+    assert normalize_language(None) is None
+
+def test_select_track():
+    """测试字幕流选择：排除图形、强制和目标语言字幕，优先语言一致、默认和非听障字幕"""
+    extractor = EmbeddedSubtitleExtractor()
+    tracks = [
+        _track(2, codec='hdmv_pgs_subtitle', language='en', default=True),
+        _track(3, language='en', forced=True),
+        _track(4, language='zh', default=True),
+        _track(5, codec='ass', language=None),
+        _track(6, language='en', hearing_impaired=True),
+        _track(7, codec='mov_text', language='en'),
+        _track(8, language='ja')
+    ]
+
+    # 指定源语言时优先语言一致的字幕，非听障优先
+    assert extractor.select_track(tracks, 'eng', 'zh-cn')['index'] == 7
+    # 没有该语言字幕时使用未标注语言的字幕
+    assert extractor.select_track(tracks, 'fr', 'zh-cn')['index'] == 5
+    # 源语言未知时不使用任何字幕（无法判断是否为原文）
+    assert extractor.select_track(tracks, None, 'zh-cn') is None
+    # 只有图形字幕或目标语言字幕时不使用
+    assert extractor.select_track(tracks[:1] + tracks[2:3], 'en', 'zh-cn') is None
+
+def _media_info(audio_language, subtitle_languages):
+    streams = [{'index': 0, 'codec_type': 'video', 'codec_name': 'h264'}]
+    if audio_language is not None:
+        streams.append({'index': 1, 'codec_type': 'audio', 'codec_name': 'aac',
+                        'tags': {'language': audio_language}, 'disposition': {'default': 1}})
+    for language in subtitle_languages:
+        streams.append({'index': len(streams), 'codec_type': 'subtitle', 'codec_name': 'subrip',
+                        'tags': {'language': language}})
+    return MediaInfo('video.mkv', {'streams': streams})
+
+def test_source_language_from_audio():
+    """测试未指定语言时按主音轨语言选择字幕，音轨语言未知时不使用内嵌字幕"""
+    extractor = EmbeddedSubtitleExtractor()
+    calls = []
+    original_probe, original_run = subtitle_tracks.probe, subtitle_tracks.run_ffmpeg
+    subtitle_tracks.run_ffmpeg = lambda command, *args: calls.append(command)
+    try:
+        # 英语音轨只有法语、日语字幕：不能把外语字幕当作原文
+        subtitle_tracks.probe = lambda path, perf=None: _media_info('eng', ['fre', 'jpn'])
+        assert extractor.audio_language('video.mkv') == 'en'
+        assert extractor.extract('video.mkv', 'out.srt', None, 'zh-cn') is None
+
+        # 音轨未标注语言
+        subtitle_tracks.probe = lambda path, perf=None: _media_info('und', ['eng'])
+        assert extractor.audio_language('video.mkv') is None
+        assert extractor.extract('video.mkv', 'out.srt', None, 'zh-cn') is None
+        assert calls == []
+
+        # 英语音轨有英语字幕
+        subtitle_tracks.probe = lambda path, perf=None: _media_info('eng', ['jpn', 'eng'])
+        tracks = extractor.find_tracks('video.mkv')
+        assert extractor.select_track(tracks, extractor.audio_language('video.mkv'), 'zh-cn')['index'] == 3
+    finally:
+        subtitle_tracks.probe, subtitle_tracks.run_ffmpeg = original_probe, original_run
+
+if __name__ == "__main__":
+    test_normalize_language()
+    test_select_track()
+    test_source_language_from_audio()
+    print("内嵌字幕选择测试通过!")
+    sys.exit(0)
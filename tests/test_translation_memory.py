@@ -0,0 +1,77 @@
+import os
+import sys
+import tempfile
+from videoprocessor.translation_memory import TranslationMemory, normalize_text
+from videoprocessor.translation_service import TranslationService
+
+def test_translation_memory():
+    """测试翻译记忆：规范化查询、按服务优先级命中和 LRU 淘汰"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, 'tm.db')
+        memory = TranslationMemory(path, max_entries=10)
+
+        assert normalize_text('  Hello   world \n Bye ') == 'Hello world\nBye'
+        memory.put('Hello world', 'auto', 'zh-cn', 'youdao', '你好世界（有道）')
+        memory.put('Hello world', 'auto', 'zh-cn', 'google', '你好世界')
+        assert memory.get(' Hello  world', 'auto', 'zh-CN', ['google', 'youdao']) == '你好世界'
+        assert memory.get('Hello world', 'auto', 'zh-cn', ['youdao']) == '你好世界（有道）'
+        assert memory.get('Hello world', 'auto', 'ja', ['google']) is None
+        assert memory.get('Hello world', 'en', 'zh-cn', ['google']) is None
+
+        # 超过上限时淘汰最久未使用的条目
+        for i in range(10):
+            memory.put(f'line {i}', 'auto', 'zh-cn', 'google', f'第 {i} 行')
+            memory.get('Hello world', 'auto', 'zh-cn', ['google'])
+        assert len(memory) <= 10
+        assert memory.get('Hello world', 'auto', 'zh-cn', ['google']) == '你好世界'
+        assert memory.get('line 0', 'auto', 'zh-cn', ['google']) is None
+
+        stats = memory.stats()
+        assert stats['hits'] == 13 and stats['misses'] == 3
+
+        # 更新已有条目不增加条目数
+        entries = len(memory)
+        memory.put('line 9', 'auto', 'zh-cn', 'google', '第九行')
+        assert len(memory) == entries == memory._entries
+        assert memory.get('line 9', 'auto', 'zh-cn', ['google']) == '第九行'
+        memory.put('line 9', 'auto', 'zh-cn', 'google', '第 9 行')
+        memory.close()
+
+        # 持久化：重新打开后仍然命中
+        memory = TranslationMemory(path)
+        assert memory.get('line 9', 'auto', 'zh-cn', ['google']) == '第 9 行'
+        memory.close()
+
+def test_translation_service_uses_memory():
+    """测试翻译服务先查询翻译记忆，重复文本和重新运行不再请求网络"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        calls = []
+
+        def fake_translate(text, target_language):
+            calls.append(text)
+            return f"译文:{text}"
+
+        def make_service():
+            service = TranslationService()
+            service.memory_path = os.path.join(work_dir, 'tm.db')
+            service.rate_limits = {'fake': 0}
+            service.translators = [('fake', fake_translate)]
+            return service
+
+        texts = ['intro', 'line a', 'intro', 'outro']
+        service = make_service()
+        assert service.translate_text(texts).split('\n') == [f"译文:{text}" for text in texts]
+        assert sorted(calls) == ['intro', 'line a', 'outro']
+
+        # 重新运行全部命中
+        calls.clear()
+        service = make_service()
+        assert service.translate_text(texts).split('\n') == [f"译文:{text}" for text in texts]
+        assert calls == []
+        assert service.memory.stats()['hits'] == 3
+
+if __name__ == "__main__":
+    test_translation_memory()
+    test_translation_service_uses_memory()
+    print("翻译记忆测试通过!")
+    sys.exit(0)
@@ -0,0 +1,141 @@
+import sys
+import time
+import threading
+import videoprocessor.translation_service as translation_service
+from videoprocessor.rate_limiter import TokenBucket
+from videoprocessor.translation_service import TranslationService
+
+def test_token_bucket():
+    """测试令牌桶：突发容量用完后按速率发放"""
+    bucket = TokenBucket(rate=10, capacity=2)
+    delays = [bucket.reserve() for _ in range(4)]
+    assert delays[:2] == [0.0, 0.0]
+    assert 0.05 < delays[2] <= 0.1
+    assert 0.15 < delays[3] <= 0.2
+    assert TokenBucket(rate=0).reserve() == 0.0
+
+def test_concurrent_translate_order():
+    """测试并发翻译：请求重叠执行，结果按原顺序返回"""
+    service = TranslationService()
+    service.use_memory = False
+    service.max_concurrency = 4
+    service.rate_limits = {'fake': 0}
+    lock = threading.Lock()
+    active = [0, 0]  # 当前并发数, 最大并发数
+
+    def fake_translate(text, target_language):
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        # 越靠前的文本越慢返回
+        time.sleep(0.02 * (10 - int(text.split()[1])) / 10)
+        with lock:
+            active[0] -= 1
+        return text.upper()
+
+    service.translators = [('fake', fake_translate)]
+    texts = [f"line {i}" for i in range(10)]
+    started = time.monotonic()
+    result = service.translate_text(texts, use_batch=False)
+    elapsed = time.monotonic() - started
+
+    assert result.split('\n') == [text.upper() for text in texts]
+    assert active[1] == 4
+    assert elapsed < 0.15  # 串行需要约 0.11 秒以上，且原实现每条还要等待 1.5 秒
+
+def test_translate_rate_limit_and_fallback():
+    """测试每个翻译服务独立限速，失败时切换到下一个服务"""
+    service = TranslationService()
+    service.use_memory = False
+    service.max_concurrency = 5
+    service.retry_delay = 0
+    service.max_retries = 1
+    service.rate_limits = {'broken': 0, 'slow': 20}
+    calls = []
+
+    def broken(text, target_language):
+        raise Exception("服务不可用")
+
+    def slow(text, target_language):
+        calls.append(time.monotonic())
+        return text
+
+    service.translators = [('broken', broken), ('slow', slow)]
+    assert service.translate_text(['a', 'b', 'c', 'd', 'e'], use_batch=True) == 'a\nb\nc\nd\ne'
+    assert len(calls) == 5
+
+    # 突发容量为 1 时，5 个请求至少间隔 4 个 1/20 秒
+    translation_service._limiters['slow'] = TokenBucket(rate=20, capacity=1)
+    started = time.monotonic()
+    service.translate_text(['a', 'b', 'c', 'd', 'e'], use_batch=True)
+    assert time.monotonic() - started >= 0.19
+
+def test_rate_limit_shared_between_services():
+    """测试同一进程中的多个翻译服务实例（服务模式的槽位）共用同一个令牌桶"""
+    first, second = TranslationService(), TranslationService()
+    for service in (first, second):
+        service.rate_limits = {'shared': 5}
+    assert first._limiter('shared') is second._limiter('shared')
+    
+    # 修改速率时原地更新同一个令牌桶，已消耗的令牌不会被重置
+    limiter = first._limiter('shared')
+    for _ in range(5):
+        limiter.reserve()
+    second.rate_limits = {'shared': 10}
+    assert second._limiter('shared') is limiter
+    assert limiter.rate == 10
+    assert first._limiter('shared').reserve() > 0
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+    def json(self):
+        return {'translateResult': [[{'tgt': f"译文:{self.text}"}]]}
+
+class FakeSession:
+    """模拟 requests 会话，记录请求"""
+    def __init__(self):
+        self.requests = []
+
+    def post(self, url, data=None, timeout=None):
+        self.requests.append((url, data['i'], timeout))
+        return FakeResponse(data['i'])
+
+def test_backend_clients_reused():
+    """测试翻译服务复用同一个客户端（连接池），并使用配置的超时"""
+    service = TranslationService()
+    service.use_memory = False
+    service.max_concurrency = 8
+    service.pool_size = 4
+    service.request_timeout = 3
+    service.rate_limits = {'youdao': 0}
+    service.translators = [('youdao', service._translate_with_youdao)]
+
+    created = []
+    def create_session():
+        created.append(FakeSession())
+        return created[-1]
+    service._create_session = create_session
+
+    texts = [f"line {i}" for i in range(20)]
+    assert service.translate_text(texts).split('\n') == [f"译文:{text}" for text in texts]
+    assert len(created) == 1
+    assert len(created[0].requests) == 20
+    assert all(timeout == 3 for _, _, timeout in created[0].requests)
+    assert list(service._clients) == ['youdao']
+
+    # 连接池大小不小于并发数
+    session = TranslationService._create_session(service)
+    assert session.get_adapter('https://example.com')._pool_maxsize == 8
+    service.close()
+    assert service._clients == {}
+
+if __name__ == "__main__":
+    test_token_bucket()
+    test_concurrent_translate_order()
+    test_translate_rate_limit_and_fallback()
+    test_rate_limit_shared_between_services()
+    test_backend_clients_reused()
+    print("并发翻译测试通过!")
+    sys.exit(0)
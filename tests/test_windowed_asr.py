@@ -0,0 +1,70 @@
+import os
+import sys
+import srt
+import tempfile
+import numpy as np
+from videoprocessor.asr_engines import ENGINES, ASREngine
+from videoprocessor.subtitle_generator import SubtitleGenerator
+
+SAMPLE_RATE = 16000
+
+class WindowEngine(ASREngine):
+    """每 3 秒音频产出一个片段，文本为该片段起点处的采样值（即绝对秒数）"""
+    name = 'window-test'
+    prompts = []
+    
+    def transcribe(self, audio, initial_prompt=None, **options):
+        WindowEngine.prompts.append(initial_prompt)
+        return [
+            {'start': t, 'end': min(t + 2.5, len(audio) / SAMPLE_RATE),
+             'text': f" {int(audio[int(t * SAMPLE_RATE)])}", 'confidence': 0.9}
+            for t in np.arange(0, len(audio) / SAMPLE_RATE, 3.0)
+        ]
+
+class CountingStream:
+    """模拟 FFmpeg 采样流，采样值为所在的秒数，记录单次读取的最大采样数"""
+    def __init__(self, seconds):
+        self.total = seconds * SAMPLE_RATE
+        self.position = 0
+        self.max_read = 0
+    
+    def read(self, count):
+        self.max_read = max(self.max_read, count)
+        end = min(self.position + count, self.total)
+        chunk = (np.arange(self.position, end) // SAMPLE_RATE).astype(np.float32)
+        self.position = end
+        return chunk
+
+def test_windowed_asr_from_stream():
+    """测试分窗识别按窗口读取采样流、跨窗口传递上文，并逐条写入字幕"""
+    ENGINES[WindowEngine.name] = WindowEngine
+    WindowEngine.prompts = []
+    try:
+        generator = SubtitleGenerator()
+        generator.engine = WindowEngine.name
+        generator.window_seconds = 20
+        stream = CountingStream(100)
+        
+        with tempfile.TemporaryDirectory() as work_dir:
+            output_path = generator.generate_windowed(stream, os.path.join(work_dir, 'out.srt'))
+            with open(output_path, encoding='utf-8') as f:
+                subs = list(srt.parse(f.read()))
+        
+        # 每次最多读取一个窗口的音频
+        assert stream.max_read == 20 * SAMPLE_RATE
+        assert stream.position == stream.total
+        # 时间戳为绝对时间，且与片段所在位置一致；窗口边界不产生重复或遗漏
+        starts = [sub.start.total_seconds() for sub in subs]
+        assert starts == sorted(starts)
+        assert all(int(sub.content) == int(sub.start.total_seconds()) for sub in subs)
+        assert len(set(starts)) == len(starts)
+        assert starts[-1] >= 95
+        # 第一个窗口没有上文，之后的窗口带上一窗口的文本
+        assert WindowEngine.prompts[0] is None and WindowEngine.prompts[1]
+    finally:
+        ENGINES.pop(WindowEngine.name, None)
+
+if __name__ == "__main__":
+    test_windowed_asr_from_stream()
+    print("分窗识别测试通过!")
+    sys.exit(0)
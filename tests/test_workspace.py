@@ -0,0 +1,35 @@
+import os
+import sys
+import tempfile
+from videoprocessor.workspace import Workspace
+
+def test_workspace_per_job():
+    """测试不同任务使用独立工作区，同一任务复用工作区"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        base_dir = os.path.join(work_dir, '.temp')
+        first = Workspace.for_job('a/input.mp4', 'out/a.mp4', base_dir)
+        second = Workspace.for_job('b/input.mp4', 'out/b.mp4', base_dir)
+        again = Workspace.for_job('a/input.mp4', 'out/a.mp4', base_dir)
+        
+        assert first.root != second.root
+        assert first.root == again.root
+        
+        first.create()
+        second.create()
+        with open(first.path('speed_adjusted.mp4'), 'w') as f:
+            f.write('a')
+        with open(os.path.join(second.subdir('tts_segments'), 'temp_1.wav'), 'w') as f:
+            f.write('b')
+        
+        # 清理一个任务不影响另一个任务
+        first.cleanup()
+        assert not first.exists()
+        assert os.path.exists(os.path.join(second.root, 'tts_segments', 'temp_1.wav'))
+        
+        second.cleanup()
+        assert not os.path.exists(base_dir)
+
+if __name__ == "__main__":
+    test_workspace_per_job()
+    print("工作区测试通过!")
+    sys.exit(0)
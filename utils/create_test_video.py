@@ -1,25 +1,90 @@
 import subprocess
 import os
+import wave
 
-def create_test_video(output_path: str, duration: int = 5):
-    """创建测试视频文件"""
+def create_speech_like_audio(output_path: str, duration: float, speech_density: float = 0.5,
+                             seed: int = 0, sample_rate: int = 16000) -> list:
+    """生成类语音音频（WAV）
+
+    语音段为带音高起伏和音节节奏（约 4Hz）的谐波信号，与静音段交替出现，
+    语音段占总时长的比例约为 speech_density。相同的 seed 生成相同的音频。
+
+    Returns:
+        list: 语音段 [(开始秒, 结束秒), ...]
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    samples = np.zeros(int(duration * sample_rate), dtype=np.float32)
+    speech_spans = []
+
+    position = 0.0
+    while speech_density > 0 and position < duration:
+        speech_length = rng.uniform(1.0, 4.0)
+        silence_length = speech_length * (1 - speech_density) / speech_density
+
+        start = int(position * sample_rate)
+        end = int(min(position + speech_length, duration) * sample_rate)
+        t = np.arange(end - start) / sample_rate
+
+        pitch = rng.uniform(100, 220) * (1 + 0.1 * np.sin(2 * np.pi * 0.5 * t))
+        phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+        envelope = 0.5 * (1 + np.sin(2 * np.pi * 4 * t))
+        samples[start:end] = 0.2 * voiced * envelope
+
+        speech_spans.append((start / sample_rate, end / sample_rate))
+        position += speech_length + silence_length
+
+    pcm = (np.clip(samples, -1, 1) * 32767).astype(np.int16)
+    with wave.open(output_path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.tobytes())
+
+    return speech_spans
+
+def create_test_video(output_path: str, duration: int = 5, resolution: str = '1280x720',
+                      speech_density: float = None, seed: int = 0):
+    """创建测试视频文件
+
+    Args:
+        output_path: 输出视频路径
+        duration: 时长（秒）
+        resolution: 分辨率，例如 1280x720
+        speech_density: 类语音音轨中语音所占比例 (0-1)，为 None 时不生成音轨
+        seed: 音频随机种子
+    """
     command = [
         'ffmpeg',
         '-f', 'lavfi',
-        '-i', f'color=c=blue:s=1280x720:d={duration}',
+        '-i', f'color=c=blue:s={resolution}:d={duration}',
+    ]
+
+    audio_path = None
+    if speech_density is not None:
+        audio_path = f"{os.path.splitext(output_path)[0]}_speech.wav"
+        create_speech_like_audio(audio_path, duration, speech_density, seed)
+        command += ['-i', audio_path, '-c:a', 'aac', '-shortest']
+
+    command += [
         '-vf', f'drawtext=text=\'Test Video\':fontsize=60:fontcolor=white:x=(w-text_w)/2:y=(h-text_h)/2',
         '-c:v', 'libx264',
         '-t', str(duration),
         '-y',
         output_path
     ]
-    
+
     try:
         subprocess.run(command, check=True, capture_output=True, text=True)
         print(f"测试视频已创建: {output_path}")
     except subprocess.CalledProcessError as e:
         print(f"创建测试视频失败: {e.stderr}")
         raise
+    finally:
+        if audio_path and os.path.exists(audio_path):
+            os.remove(audio_path)
 
 if __name__ == "__main__":
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -1,7 +1,14 @@
 """智能视频处理系统"""
 
-from .video_processor import VideoProcessor
-from .cli import main
-
 __version__ = "0.1.0"
-__all__ = ["VideoProcessor", "main"] 
\ No newline at end of file
+__all__ = ["VideoProcessor", "main"]
+
+def __getattr__(name):
+    """延迟导入，避免 import videoprocessor 时加载处理流程的全部依赖"""
+    if name == "VideoProcessor":
+        from .video_processor import VideoProcessor
+        return VideoProcessor
+    if name == "main":
+        from .cli import main
+        return main
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}") 
\ No newline at end of file
@@ -0,0 +1,129 @@
+import math
+from .model_registry import get_model, model_lock
+from .utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 识别引擎统一使用 16kHz 单声道 float32 采样
+SAMPLE_RATE = 16000
+
+def _confidence(avg_logprob) -> float:
+    """由片段平均对数概率换算的置信度 (0-1)"""
+    if avg_logprob is None:
+        return None
+    return round(min(1.0, math.exp(avg_logprob)), 4)
+
+class ASREngine:
+    """语音识别引擎接口
+
+    子类实现 model、load_audio 和 transcribe，其余流程（字幕生成、分段并行、流式窗口）
+    只依赖 transcribe 返回的片段。
+    """
+
+    name = None
+
+    def __init__(self, model_name: str = 'base', device: str = None, threads: int = None,
+                 compute_type: str = None):
+        """
+        Args:
+            model_name: 模型名称
+            device: 设备，默认由引擎决定
+            threads: CPU 线程数
+            compute_type: 计算类型（仅部分引擎使用）
+        """
+        self.model_name = model_name
+        self.device = device
+        self.threads = threads
+        self.compute_type = compute_type
+
+    @property
+    def model(self):
+        """引擎模型（从进程内模型注册表获取，只加载一次）"""
+        return get_model(self.model_name, self.device, self.threads, self.name, self.compute_type)
+
+    def load_audio(self, audio_path: str):
+        """读取音频文件为 16kHz 单声道 float32 采样"""
+        raise NotImplementedError
+
+    def transcribe(self, audio, initial_prompt: str = None, **options) -> list:
+        """识别音频
+
+        Args:
+            audio: 16kHz 单声道 float32 采样（numpy 数组）或音频文件路径
+            initial_prompt: 提示词（上文）
+            **options: 解码参数（beam_size、temperature、language）
+
+        Returns:
+            list: [{'start': 秒, 'end': 秒, 'text': 文本, 'confidence': 0-1,
+                    'avg_logprob': 平均对数概率, 'compression_ratio': 文本压缩比}, ...]
+        """
+        raise NotImplementedError
+
+class WhisperEngine(ASREngine):
+    """openai-whisper 引擎（PyTorch）"""
+
+    name = 'whisper'
+
+    def load_audio(self, audio_path: str):
+        import whisper
+
+        return whisper.load_audio(audio_path)
+
+    def transcribe(self, audio, initial_prompt: str = None, **options) -> list:
+        # 模型在进程内共享（服务模式的各槽位），同一模型同一时刻只进行一次解码
+        model = self.model
+        with model_lock(model):
+            result = model.transcribe(audio, initial_prompt=initial_prompt, **options)
+        return [
+            {
+                'start': segment["start"],
+                'end': segment["end"],
+                'text': segment["text"],
+                'confidence': _confidence(segment.get("avg_logprob")),
+                'avg_logprob': segment.get("avg_logprob"),
+                'compression_ratio': segment.get("compression_ratio")
+            }
+            for segment in result["segments"]
+        ]
+
+class FasterWhisperEngine(ASREngine):
+    """faster-whisper 引擎（CTranslate2），CPU 上默认使用 int8 量化"""
+
+    name = 'faster-whisper'
+
+    def __init__(self, model_name: str = 'base', device: str = None, threads: int = None,
+                 compute_type: str = None):
+        super().__init__(model_name, device, threads, compute_type or 'int8')
+
+    def load_audio(self, audio_path: str):
+        from faster_whisper import decode_audio
+
+        return decode_audio(audio_path, sampling_rate=SAMPLE_RATE)
+
+    def transcribe(self, audio, initial_prompt: str = None, **options) -> list:
+        # faster-whisper 返回生成器，遍历时才实际解码；CTranslate2 模型支持多线程并发调用，不需要加锁
+        segments, _ = self.model.transcribe(audio, initial_prompt=initial_prompt, **options)
+        return [
+            {
+                'start': segment.start,
+                'end': segment.end,
+                'text': segment.text,
+                'confidence': _confidence(segment.avg_logprob),
+                'avg_logprob': segment.avg_logprob,
+                'compression_ratio': segment.compression_ratio
+            }
+            for segment in segments
+        ]
+
+# 可选的识别引擎
+ENGINES = {
+    WhisperEngine.name: WhisperEngine,
+    FasterWhisperEngine.name: FasterWhisperEngine
+}
+
+def create_engine(name: str, model_name: str = 'base', device: str = None, threads: int = None,
+                  compute_type: str = None) -> ASREngine:
+    """按名称创建识别引擎"""
+    if name not in ENGINES:
+        raise ValueError(f"不支持的识别引擎: {name} (可选: {', '.join(ENGINES)})")
+    return ENGINES[name](model_name, device, threads, compute_type)
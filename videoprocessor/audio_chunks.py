@@ -0,0 +1,65 @@
+from .utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def frame_energy(samples, sample_rate: int, frame_seconds: float = 0.03):
+    """逐帧计算音频能量（RMS）
+
+    Args:
+        samples: 单声道采样（numpy 数组）
+        sample_rate: 采样率
+        frame_seconds: 帧长（秒）
+
+    Returns:
+        numpy.ndarray: 每帧的 RMS，末尾不足一帧的部分丢弃
+    """
+    import numpy as np
+
+    frame_length = max(1, int(sample_rate * frame_seconds))
+    frame_count = len(samples) // frame_length
+    frames = np.asarray(samples[:frame_count * frame_length], dtype=np.float32)
+    frames = frames.reshape(frame_count, frame_length)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+def split_on_silence(samples, sample_rate: int, chunk_seconds: float = 120.0,
+                     min_silence_seconds: float = 0.5, frame_seconds: float = 0.03) -> list:
+    """在静音处把音频切分为长度接近 chunk_seconds 的片段
+
+    先用一次向量化的能量计算得到每帧 RMS，再按 min_silence_seconds 做滑动平均；
+    每个切分点取目标长度 0.5 到 1.5 倍区间内平均能量最低的位置，
+    因此即使没有明显静音（例如背景音乐），也会切在最安静的地方。
+
+    Args:
+        samples: 单声道采样（numpy 数组）
+        sample_rate: 采样率
+        chunk_seconds: 目标片段长度（秒）
+        min_silence_seconds: 静音窗口长度（秒）
+        frame_seconds: 能量计算的帧长（秒）
+
+    Returns:
+        list: [(开始采样点, 结束采样点), ...]，首尾相接覆盖整段音频
+    """
+    import numpy as np
+
+    total = len(samples)
+    if total <= chunk_seconds * 1.5 * sample_rate:
+        return [(0, total)] if total else []
+
+    frame_length = max(1, int(sample_rate * frame_seconds))
+    energy = frame_energy(samples, sample_rate, frame_seconds)
+    window = max(1, int(round(min_silence_seconds / frame_seconds)))
+    smoothed = np.convolve(energy, np.ones(window) / window, mode='same')
+
+    chunk_frames = int(chunk_seconds / frame_seconds)
+    bounds = []
+    start = 0
+    while (len(energy) - start) > chunk_frames * 1.5:
+        low = start + chunk_frames // 2
+        high = min(start + chunk_frames * 3 // 2, len(energy))
+        cut = low + int(np.argmin(smoothed[low:high]))
+        bounds.append((start * frame_length, cut * frame_length))
+        start = cut
+    bounds.append((start * frame_length, total))
+
+    logger.info(f"音频按静音切分为 {len(bounds)} 段")
+    return bounds
@@ -1,19 +1,56 @@
 import os
-import subprocess
+from contextlib import contextmanager
+from .media_info import expected_duration
 from .utils.logger import setup_logger
+from .utils.ffmpeg import atempo_filter, run_ffmpeg, read_ffmpeg_output, stream_ffmpeg_output
 
 logger = setup_logger(__name__)
 
+class AudioStream:
+    """FFmpeg 输出的 float32 采样流，按需读取，内存占用与音频总时长无关"""
+    
+    def __init__(self, stdout, sample_rate: int):
+        self.stdout = stdout
+        self.sample_rate = sample_rate
+        self.samples_read = 0
+    
+    def read(self, count: int):
+        """读取最多 count 个采样，返回数量少于 count 时表示已到结尾
+        
+        Returns:
+            numpy.ndarray: float32 采样
+        """
+        import numpy as np
+        
+        buffer = bytearray(count * 4)
+        view = memoryview(buffer)
+        filled = 0
+        while filled < len(buffer):
+            size = self.stdout.readinto(view[filled:])
+            if not size:
+                break
+            filled += size
+        
+        filled -= filled % 4
+        self.samples_read += filled // 4
+        return np.frombuffer(buffer, dtype=np.float32, count=filled // 4)
+
 class AudioExtractor:
     """音频提取器"""
     
-    def extract(self, video_path: str, output_path: str = None) -> str:
+    def __init__(self):
+        self.perf = None  # 性能报告（PerfReport），由 VideoProcessor 设置
+        self.progress = None  # FFmpeg 进度回调，由 VideoProcessor 设置
+        self.sample_rate = 16000  # 读入内存时的采样率（Whisper 使用 16kHz）
+    
+    def extract(self, video_path: str, output_path: str = None, speed: float = 1.0) -> str:
         """
         从视频中提取音频
         
         Args:
             video_path: 输入视频路径
             output_path: 输出音频路径（可选，如果不提供则自动生成）
+            speed: 速度因子，不为 1.0 时只对音频做变速，不需要重新编码视频
         
         Returns:
             str: 提取的音频文件路径
@@ -37,6 +74,10 @@ class AudioExtractor:
                 'ffmpeg',
                 '-i', video_path,
                 '-vn',  # 不处理视频
+            ]
+            if speed != 1.0:
+                command += ['-af', atempo_filter(speed)]  # 音频变速
+            command += [
                 '-acodec', 'pcm_s16le',  # 音频编码为 WAV
                 '-ar', '44100',  # 采样率
                 '-ac', '2',  # 双声道
@@ -45,7 +86,8 @@ class AudioExtractor:
             ]
             
             # 执行命令
-            result = subprocess.run(command, capture_output=True, text=True)
+            result = run_ffmpeg(command, 'audio', self.perf, self.progress,
+                                self._duration(video_path, speed))
             
             # 检查执行结果
             if result.returncode != 0:
@@ -64,4 +106,87 @@ class AudioExtractor:
             
         except Exception as e:
             logger.error(f"音频提取失败: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
+    
+    def extract_samples(self, video_path: str, speed: float = 1.0):
+        """
+        从视频中提取识别用音频采样，直接读入内存
+        
+        FFmpeg 通过标准输出输出 16kHz 单声道 float32 PCM，不写中间 WAV 文件，
+        得到的数组可以直接交给 Whisper，省去识别前的再次解码和重采样。
+        
+        Args:
+            video_path: 输入视频路径
+            speed: 速度因子，不为 1.0 时对音频做变速
+        
+        Returns:
+            numpy.ndarray: float32 单声道采样，采样率为 self.sample_rate
+        """
+        try:
+            import numpy as np
+            
+            command = self._samples_command(video_path, speed)
+            output, returncode, stderr = read_ffmpeg_output(
+                command, 'audio', self.perf,
+                progress=self.progress, duration=self._duration(video_path, speed)
+            )
+            if returncode != 0:
+                raise Exception(f"音频提取失败: {stderr}")
+            if not output:
+                raise Exception("提取的音频为空")
+            
+            # bytearray 可写，生成的数组不需要再复制
+            samples = np.frombuffer(output, dtype=np.float32)
+            logger.info(f"音频提取完成: {len(samples) / self.sample_rate:.1f} 秒 (内存)")
+            return samples
+            
+        except Exception as e:
+            logger.error(f"音频提取失败: {str(e)}")
+            raise
+    
+    @contextmanager
+    def stream_samples(self, video_path: str, speed: float = 1.0):
+        """
+        以流的方式提取识别用音频采样，不把整段音频读入内存
+        
+        Args:
+            video_path: 输入视频路径
+            speed: 速度因子，不为 1.0 时对音频做变速
+        
+        Yields:
+            AudioStream: 采样流，需要读到结尾
+        """
+        command = self._samples_command(video_path, speed)
+        with stream_ffmpeg_output(command, 'audio', self.perf, self.progress,
+                                  self._duration(video_path, speed)) as stdout:
+            stream = AudioStream(stdout, self.sample_rate)
+            yield stream
+        logger.info(f"音频流读取完成: {stream.samples_read / self.sample_rate:.1f} 秒")
+    
+    def _duration(self, video_path: str, speed: float) -> float:
+        """输出音频的预计时长，只在需要显示进度时探测"""
+        if self.progress is None:
+            return None
+        return expected_duration(video_path, speed, self.perf)
+    
+    def _samples_command(self, video_path: str, speed: float) -> list:
+        """输出 16kHz 单声道 float32 采样到标准输出的 FFmpeg 命令"""
+        if not video_path or not os.path.exists(video_path):
+            raise FileNotFoundError(f"输入视频文件不存在: {video_path}")
+        
+        command = [
+            'ffmpeg',
+            '-nostdin',
+            '-i', video_path,
+            '-vn',  # 不处理视频
+        ]
+        if speed != 1.0:
+            command += ['-af', atempo_filter(speed)]  # 音频变速
+        command += [
+            '-f', 'f32le',  # 原始 float32 采样
+            '-acodec', 'pcm_f32le',
+            '-ar', str(self.sample_rate),  # 采样率
+            '-ac', '1',  # 单声道
+            'pipe:1'
+        ]
+        return command
@@ -0,0 +1,114 @@
+import time
+import threading
+from .utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 熔断器状态
+CLOSED = 'closed'        # 正常
+OPEN = 'open'            # 熔断中，跳过该服务
+HALF_OPEN = 'half_open'  # 冷却结束，只放行一个试探请求
+
+class BackendHealth:
+    """单个服务的健康状态与熔断器
+
+    记录最近的延迟和成功率（指数滑动平均）。连续失败 failure_threshold 次后熔断，
+    cooldown 秒内跳过该服务；冷却结束后放行一个试探请求，成功则恢复，失败则继续熔断。
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, cooldown: float = 60.0, alpha: float = 0.3):
+        """
+        Args:
+            name: 服务名称
+            failure_threshold: 连续失败多少次后熔断
+            cooldown: 熔断持续时间（秒）
+            alpha: 滑动平均的权重，越大越偏向最近的请求
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.alpha = alpha
+
+        self.state = CLOSED
+        self.latency = None  # 成功请求的平均延迟（秒）
+        self.success_rate = 1.0
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """是否可以向该服务发送请求（半开状态下只放行一个试探请求）"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                logger.info(f"翻译服务 {self.name} 冷却结束，发送试探请求")
+                return True
+            return False
+
+    def record_success(self, latency: float):
+        """记录一次成功请求"""
+        with self._lock:
+            self.requests += 1
+            self.consecutive_failures = 0
+            self.success_rate += self.alpha * (1.0 - self.success_rate)
+            self.latency = latency if self.latency is None else self.latency + self.alpha * (latency - self.latency)
+            if self.state != CLOSED:
+                logger.info(f"翻译服务 {self.name} 已恢复")
+            self.state = CLOSED
+            self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """记录一次失败请求
+
+        Returns:
+            bool: 本次失败是否导致熔断
+        """
+        with self._lock:
+            self.requests += 1
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.success_rate -= self.alpha * self.success_rate
+            self._trial_in_flight = False
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED and self.consecutive_failures >= self.failure_threshold
+            ):
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                logger.warning(
+                    f"翻译服务 {self.name} 连续失败 {self.consecutive_failures} 次，"
+                    f"熔断 {self.cooldown:g} 秒"
+                )
+                return True
+            return False
+
+    def abandon(self):
+        """请求被取消（既未成功也未失败），释放试探请求名额"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        """是否处于熔断中（冷却尚未结束）"""
+        with self._lock:
+            return self.state == OPEN and time.monotonic() - self._opened_at < self.cooldown
+
+    def score(self) -> float:
+        """综合评分（越小越好）：平均延迟除以成功率，没有延迟数据时视为 1 秒"""
+        latency = self.latency if self.latency is not None else 1.0
+        return latency / max(self.success_rate, 0.05)
+
+    def to_dict(self) -> dict:
+        return {
+            'state': self.state,
+            'latency': round(self.latency, 3) if self.latency is not None else None,
+            'success_rate': round(self.success_rate, 3),
+            'requests': self.requests,
+            'failures': self.failures
+        }
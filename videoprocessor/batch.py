@@ -0,0 +1,221 @@
+import os
+import glob
+import json
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 批处理时识别的视频文件扩展名
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.mov', '.avi', '.mpeg', '.mpg', '.webm', '.flv', '.m4v')
+
+# 每个工作进程中常驻的处理器实例（模型只加载一次）
+_worker_processor = None
+
+def is_batch_source(source: str) -> bool:
+    """判断输入是否为目录或通配符"""
+    return os.path.isdir(source) or glob.has_magic(source)
+
+def collect_jobs(source: str, output_dir: str = None) -> list:
+    """收集批处理任务
+
+    Args:
+        source: 目录、通配符，或清单文件（.txt 每行一个路径；.json 为路径列表或
+                [{"input": ..., "output": ...}] 列表）
+        output_dir: 输出目录（默认与输入文件相同目录）
+
+    Returns:
+        list: [(输入路径, 输出路径), ...]
+    """
+    if os.path.isdir(source):
+        inputs = sorted(
+            os.path.join(source, name)
+            for name in os.listdir(source)
+            if name.lower().endswith(VIDEO_EXTENSIONS)
+        )
+        entries = [(path, None) for path in inputs]
+    elif glob.has_magic(source):
+        entries = [(path, None) for path in sorted(glob.glob(source))]
+    elif os.path.isfile(source):
+        entries = _read_job_manifest(source)
+    else:
+        raise FileNotFoundError(f"批处理输入不存在: {source}")
+
+    jobs = []
+    for input_path, output_path in entries:
+        if not output_path:
+            basename = os.path.splitext(os.path.basename(input_path))[0]
+            target_dir = output_dir or os.path.dirname(input_path) or '.'
+            output_path = os.path.join(target_dir, f"{basename}_output.mp4")
+        jobs.append((input_path, output_path))
+
+    logger.info(f"共收集到 {len(jobs)} 个待处理视频")
+    return jobs
+
+def _read_job_manifest(manifest_path: str) -> list:
+    """读取清单文件，相对路径以清单文件所在目录为基准"""
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+
+    def resolve(path):
+        return path if not path or os.path.isabs(path) else os.path.join(base_dir, path)
+
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        if manifest_path.lower().endswith('.json'):
+            entries = []
+            for item in json.load(f):
+                if isinstance(item, str):
+                    entries.append((resolve(item), None))
+                else:
+                    entries.append((resolve(item['input']), resolve(item.get('output'))))
+            return entries
+
+        return [
+            (resolve(line.strip()), None)
+            for line in f
+            if line.strip() and not line.strip().startswith('#')
+        ]
+
+def apply_settings(processor, settings: dict):
+    """将命令行设置应用到处理器
+
+    设置名可以带组件前缀，例如 'subtitle_generator.workers' 设置到对应组件上。
+    """
+    from .stage_cache import StageCache
+
+    settings = dict(settings)
+    cache_dir = settings.pop('cache_dir', None)
+    cache_size = settings.pop('cache_size', None)
+    if cache_dir or cache_size is not None:
+        processor.stage_cache = StageCache(cache_dir, cache_size)
+
+    for name, value in settings.items():
+        set_setting(processor, name, value)
+    return processor
+
+def _resolve_setting(processor, name: str) -> tuple:
+    """解析设置名，返回 (目标对象, 属性名)"""
+    target = processor
+    *components, attr = name.split('.')
+    for component in components:
+        target = getattr(target, component)
+    return target, attr
+
+def get_setting(processor, name: str):
+    """读取处理器设置，支持组件前缀"""
+    target, attr = _resolve_setting(processor, name)
+    return getattr(target, attr)
+
+def set_setting(processor, name: str, value):
+    """修改处理器设置，支持组件前缀"""
+    target, attr = _resolve_setting(processor, name)
+    setattr(target, attr, value)
+
+def _init_worker(settings: dict):
+    """工作进程初始化：创建处理器并加载模型"""
+    global _worker_processor
+    from .video_processor import VideoProcessor
+
+    from multiprocessing.util import Finalize
+
+    _worker_processor = apply_settings(VideoProcessor(), settings)
+    # 工作进程退出时关闭翻译服务连接和翻译记忆
+    Finalize(_worker_processor, _worker_processor.close, exitpriority=10)
+    # 预先加载模型，之后该进程处理的所有视频都复用它
+    _worker_processor.subtitle_generator.model
+    logger.info(f"工作进程 {os.getpid()} 已就绪")
+
+def _process_job(input_path: str, output_path: str) -> dict:
+    """在工作进程中处理单个视频"""
+    start = time.time()
+    result = {
+        'input': input_path,
+        'output': output_path,
+        'worker': os.getpid()
+    }
+    try:
+        _worker_processor.process(input_path, output_path)
+        result['status'] = 'success'
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = str(e)
+    result['elapsed'] = round(time.time() - start, 2)
+    return result
+
+def run_batch(jobs: list, settings: dict, workers: int = 1, summary_path: str = None) -> list:
+    """使用进程池批量处理视频
+
+    Args:
+        jobs: [(输入路径, 输出路径), ...]
+        settings: 处理器设置（属性名: 值）
+        workers: 工作进程数，每个进程只加载一次模型并处理多个视频
+        summary_path: 处理结果汇总文件路径（JSON）
+
+    Returns:
+        list: 每个视频的处理结果
+    """
+    workers = max(1, min(workers, len(jobs) or 1))
+    logger.info(f"开始批处理: {len(jobs)} 个视频, {workers} 个工作进程")
+
+    # 翻译限速按工作进程数平分，所有进程合计不超过设定的速率
+    if workers > 1:
+        from .translation_service import DEFAULT_RATE_LIMITS
+
+        settings = dict(settings)
+        rate_limits = settings.get('translation_service.rate_limits') or DEFAULT_RATE_LIMITS
+        settings['translation_service.rate_limits'] = {
+            name: rate / workers if rate else rate for name, rate in rate_limits.items()
+        }
+
+    start = time.time()
+    results = []
+    # 使用 spawn 启动工作进程，避免 fork 继承 torch 线程状态
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(settings,)
+    ) as executor:
+        futures = {
+            executor.submit(_process_job, input_path, output_path): input_path
+            for input_path, output_path in jobs
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                # 工作进程异常退出
+                result = {
+                    'input': futures[future],
+                    'status': 'failed',
+                    'error': f"工作进程异常: {str(e)}"
+                }
+            results.append(result)
+            logger.info(
+                f"[{len(results)}/{len(jobs)}] {result['status']}: {result['input']}"
+                + (f" - {result['error']}" if result.get('error') else '')
+            )
+
+    # 按输入顺序输出汇总
+    order = {input_path: i for i, (input_path, _) in enumerate(jobs)}
+    results.sort(key=lambda item: order.get(item['input'], len(order)))
+
+    succeeded = sum(1 for item in results if item['status'] == 'success')
+    summary = {
+        'total': len(results),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'elapsed': round(time.time() - start, 2),
+        'results': results
+    }
+
+    if summary_path:
+        os.makedirs(os.path.dirname(os.path.abspath(summary_path)), exist_ok=True)
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        logger.info(f"批处理汇总已保存: {summary_path}")
+
+    logger.info(f"批处理完成: 成功 {succeeded}, 失败 {summary['failed']}, 耗时 {summary['elapsed']} 秒")
+    return results
@@ -2,7 +2,11 @@ import os
 import sys
 import argparse
 from .video_processor import VideoProcessor
+from .batch import is_batch_source, collect_jobs, apply_settings, run_batch
+from .server import serve
+from .translation_service import DEFAULT_RATE_LIMITS
 from .utils.logger import setup_logger
+from .utils.progress import ProgressDisplay
 
 logger = setup_logger(__name__)
 
@@ -22,13 +26,8 @@ def get_output_path(input_path: str, step: str) -> str:
     
     return os.path.join(dirname, basename + step_suffix.get(step, '.mp4'))
 
-def main():
-    parser = argparse.ArgumentParser(description='视频处理工具')
-    
-    # 输入输出参数
-    parser.add_argument('input', help='输入视频文件路径')
-    parser.add_argument('-o', '--output', help='输出视频文件路径')
-    
+def add_processor_arguments(parser):
+    """添加处理器设置参数（单文件、批处理和服务模式共用）"""
     # 添加速度参数
     parser.add_argument('--speed', type=float, default=1.0,
                        help='视频速度因子 (0.5-2.0, 默认1.0)')
@@ -36,6 +35,222 @@ def main():
     # 添加语音选项
     parser.add_argument('--voice', help='指定语音 (例如: xiaoxiao, yunxi, jenny 等)')
     
+    # 其他选项
+    parser.add_argument('--remove-subs', action='store_true', help='移除原始字幕（默认保留）')
+    parser.add_argument('--keep-temp', action='store_true', help='保留中间文件（默认删除）')
+    parser.add_argument('--resume', action='store_true',
+                       help='从上次失败的检查点继续处理')
+    parser.add_argument('--temp-dir', help='任务工作区根目录 (默认 ./.temp)')
+    parser.add_argument('--stream', action='store_true',
+                       help='流式处理：识别、翻译和配音按片段重叠执行')
+    parser.add_argument('--stream-batch-size', type=int, default=10,
+                       help='流式处理时每批字幕条数 (默认10)')
+    
+    # 编码选项
+    parser.add_argument('--profile', choices=['preview', 'balanced', 'archive'], default='balanced',
+                        help='编码配置：preview 为 480p ultrafast 快速审片，archive 为高质量存档 (默认 balanced)')
+    parser.add_argument('--encode-threads', type=int, help='视频编码线程数 (默认由 FFmpeg 决定)')
+    
+    # 翻译选项
+    parser.add_argument('--translation-concurrency', type=int,
+                        help='同时进行的翻译请求数 (默认4)')
+    parser.add_argument('--translation-rate', nargs='+', metavar='[服务=]每秒请求数',
+                        help='翻译服务限速（进程内所有任务合计，批处理时按工作进程数平分），'
+                             '例如 2 或 google=3 youdao=1 '
+                             f"(默认 {' '.join(f'{k}={v:g}' for k, v in DEFAULT_RATE_LIMITS.items())})")
+    parser.add_argument('--translation-pool-size', type=int,
+                        help='每个翻译服务的 keep-alive 连接池大小 (默认10)')
+    parser.add_argument('--translation-timeout', type=float, help='翻译请求超时，单位秒 (默认10)')
+    parser.add_argument('--translation-cooldown', type=float,
+                        help='翻译服务连续失败后的熔断时间，单位秒 (默认60)')
+    parser.add_argument('--no-translation-memory', action='store_true',
+                        help='不使用翻译记忆（默认复用之前翻译过的相同文本）')
+    parser.add_argument('--translation-memory', help='翻译记忆数据库路径 (默认 <缓存目录>/translation_memory.db)')
+    parser.add_argument('--translation-memory-size', type=int,
+                        help='翻译记忆条目数上限，超出时淘汰最久未使用的条目 (默认100000)')
+    
+    # 语音识别选项（未指定时使用环境变量或默认值）
+    parser.add_argument('--no-embedded-subs', action='store_true',
+                        help='忽略视频内嵌字幕，始终进行语音识别（默认优先使用源语言文本字幕）')
+    parser.add_argument('--asr-engine', choices=['whisper', 'faster-whisper'],
+                       help='语音识别引擎，faster-whisper 在 CPU 上使用 int8 量化 (默认 whisper)')
+    parser.add_argument('--compute-type', help='faster-whisper 计算类型，例如 int8、int8_float16、float16 (默认 int8)')
+    parser.add_argument('--model', help='Whisper 模型，例如预览用 tiny、正式处理用 small (默认 base)')
+    parser.add_argument('--device', help='Whisper 运行设备 cpu / cuda (默认自动选择)')
+    parser.add_argument('--asr-threads', type=int, help='语音识别的 CPU 线程数')
+    parser.add_argument('--beam-size', type=int, help='束搜索宽度 (默认贪心解码)')
+    parser.add_argument('--temperature', type=float, nargs='+',
+                       help='解码温度回退序列，例如 0 0.2 0.4 (默认 0 0.2 0.4 0.6 0.8 1.0)')
+    parser.add_argument('--language', help='固定识别语言，例如 en、ja (默认自动检测)')
+    parser.add_argument('--cascade-model',
+                       help='两级识别：用该模型（例如 medium）重新识别低置信度片段')
+    parser.add_argument('--cascade-logprob', type=float,
+                       help='平均对数概率低于该值的片段重新识别 (默认-1.0)')
+    parser.add_argument('--cascade-compression', type=float,
+                       help='文本压缩比高于该值的片段重新识别 (默认2.4)')
+    parser.add_argument('--windowed-asr', action='store_true',
+                       help='分窗识别：按窗口读取音频流并逐条写入字幕，内存占用与视频时长无关')
+    parser.add_argument('--asr-window-seconds', type=float,
+                       help='分窗识别和流式处理的窗口时长，单位秒 (默认300)')
+    parser.add_argument('--asr-workers', type=int, default=1,
+                       help='语音识别进程数，大于 1 时在静音处切分音频并行识别 (默认1)')
+    parser.add_argument('--asr-chunk-seconds', type=float, default=120,
+                       help='并行识别时每段的目标时长，单位秒 (默认120)')
+    parser.add_argument('--stretch-audio', action='store_true',
+                       help='识别变速后的音频（默认识别原始音频并按速度因子缩放时间轴）')
+    parser.add_argument('--audio-file', action='store_true',
+                       help='识别前先提取为 WAV 文件（默认通过管道直接读入内存）')
+    
+    # 添加中间文件保存选项
+    parser.add_argument('--save-srt', action='store_true', 
+                       help='保存原始和翻译后的字幕文件')
+    
+    # 阶段缓存选项
+    parser.add_argument('--no-cache', action='store_true',
+                       help='禁用阶段缓存，所有步骤重新执行')
+    parser.add_argument('--cache-dir', help='阶段缓存目录 (默认 ~/.cache/videoprocessor)')
+    parser.add_argument('--cache-size', type=int,
+                       help='阶段缓存大小上限，单位 MB (默认 10240)')
+    
+    # 性能报告选项
+    parser.add_argument('--no-perf-report', action='store_true',
+                       help='不在输出文件旁保存性能报告 (<输出文件名>_perf.json)')
+
+def parse_rate_limits(values: list) -> dict:
+    """解析翻译限速参数：单个数字作用于所有翻译服务，服务=数字只修改该服务"""
+    rate_limits = dict(DEFAULT_RATE_LIMITS)
+    for value in values:
+        name, sep, rate = value.rpartition('=')
+        if not sep:
+            rate_limits = {key: float(rate) for key in rate_limits}
+        elif name in rate_limits:
+            rate_limits[name] = float(rate)
+        else:
+            raise ValueError(f"未知的翻译服务: {name} (可选: {', '.join(rate_limits)})")
+    return rate_limits
+
+def get_processor_settings(args) -> dict:
+    """从命令行参数生成处理器设置"""
+    settings = {
+        'remove_original_subs': args.remove_subs,
+        'keep_temp_files': args.keep_temp,
+        'resume': args.resume,
+        'temp_base_dir': args.temp_dir,
+        'voice_name': args.voice,  # 保存语音选择
+        'speed_factor': args.speed,  # 设置速度因子
+        'save_intermediate': args.save_srt,  # 设置是否保存中间文件
+        'streaming': args.stream,
+        'stream_batch_size': args.stream_batch_size,
+        'audio_in_memory': not args.audio_file,
+        'scale_timestamps': not args.stretch_audio,
+        'windowed_asr': args.windowed_asr,
+        'use_embedded_subs': not args.no_embedded_subs,
+        'video_composer.profile': args.profile,
+        'video_composer.threads': args.encode_threads,
+        'subtitle_generator.workers': args.asr_workers,
+        'subtitle_generator.chunk_seconds': args.asr_chunk_seconds,
+        'use_cache': not args.no_cache,
+        'write_perf_report': not args.no_perf_report,
+        'cache_dir': args.cache_dir,
+        'cache_size': args.cache_size
+    }
+    
+    if args.translation_concurrency:
+        settings['translation_service.max_concurrency'] = args.translation_concurrency
+    if args.translation_rate:
+        settings['translation_service.rate_limits'] = parse_rate_limits(args.translation_rate)
+    
+    if args.translation_pool_size:
+        settings['translation_service.pool_size'] = args.translation_pool_size
+    if args.translation_timeout:
+        settings['translation_service.request_timeout'] = args.translation_timeout
+    if args.translation_cooldown is not None:
+        settings['translation_service.circuit_cooldown'] = args.translation_cooldown
+    
+    # 翻译记忆默认与阶段缓存放在同一目录
+    settings['translation_service.use_memory'] = not args.no_translation_memory
+    memory_path = args.translation_memory
+    if not memory_path and args.cache_dir:
+        memory_path = os.path.join(args.cache_dir, 'translation_memory.db')
+    if memory_path:
+        settings['translation_service.memory_path'] = memory_path
+    if args.translation_memory_size:
+        settings['translation_service.memory_size'] = args.translation_memory_size
+    
+    # 语音识别模型与解码参数，只覆盖命令行指定的项
+    asr_options = {
+        'engine': args.asr_engine,
+        'compute_type': args.compute_type,
+        'model_name': args.model,
+        'device': args.device,
+        'threads': args.asr_threads,
+        'beam_size': args.beam_size,
+        'temperature': tuple(args.temperature) if args.temperature else None,
+        'language': args.language,
+        'cascade_model': args.cascade_model,
+        'cascade_logprob_threshold': args.cascade_logprob,
+        'cascade_compression_threshold': args.cascade_compression,
+        'window_seconds': args.asr_window_seconds
+    }
+    for name, value in asr_options.items():
+        if value is not None:
+            settings[f'subtitle_generator.{name}'] = value
+    return settings
+
+def run_batch_mode(args) -> int:
+    """批处理模式：进程池中每个工作进程只加载一次模型"""
+    if 'all' not in args.steps:
+        raise ValueError("批处理模式仅支持完整流程 (--steps all)")
+    if args.output:
+        raise ValueError("批处理模式请使用 --output-dir 指定输出目录")
+    
+    jobs = collect_jobs(args.input, args.output_dir)
+    if not jobs:
+        raise FileNotFoundError(f"没有找到待处理的视频: {args.input}")
+    
+    summary_path = args.summary or os.path.join(args.output_dir or '.', 'batch_summary.json')
+    results = run_batch(
+        jobs,
+        get_processor_settings(args),
+        workers=args.workers,
+        summary_path=summary_path
+    )
+    return 0 if all(item['status'] == 'success' for item in results) else 1
+
+def serve_main(argv: list) -> int:
+    """服务模式：常驻进程保持模型加载，通过 HTTP 接收任务"""
+    parser = argparse.ArgumentParser(prog='video-processor serve', description='视频处理任务服务')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址 (默认127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='监听端口 (默认8765)')
+    parser.add_argument('--concurrency', type=int, default=1,
+                       help='同时处理的任务数，各槽位共用同一份识别模型，whisper 识别按模型串行 (默认1)')
+    parser.add_argument('--max-jobs', type=int, default=1000,
+                       help='保留的已结束任务记录数，超过时丢弃最早的记录 (默认1000)')
+    add_processor_arguments(parser)
+    args = parser.parse_args(argv)
+    
+    try:
+        if not 0.5 <= args.speed <= 2.0:
+            raise ValueError("速度因子必须在 0.5 到 2.0 之间")
+        serve(get_processor_settings(args), args.host, args.port, args.concurrency, args.max_jobs)
+        return 0
+    except Exception as e:
+        logger.error(f"服务启动失败: {str(e)}")
+        return 1
+
+def main():
+    # 服务模式
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        return serve_main(sys.argv[2:])
+    
+    parser = argparse.ArgumentParser(description='视频处理工具')
+    
+    # 输入输出参数
+    parser.add_argument('input', help='输入视频文件路径（批处理模式下可以是目录、通配符或清单文件）')
+    parser.add_argument('-o', '--output', help='输出视频文件路径')
+    
+    add_processor_arguments(parser)
+    
     # 处理步骤选项
     parser.add_argument('--steps', nargs='+', choices=[
         'extract_audio',    # 提取音频
@@ -47,22 +262,29 @@ def main():
         'all'              # 执行所有步骤
     ], default=['all'], help='指定要执行的步骤')
     
-    # 其他选项
-    parser.add_argument('--remove-subs', action='store_true', help='移除原始字幕（默认保留）')
-    parser.add_argument('--keep-temp', action='store_true', help='保留中间文件（默认删除）')
-    
-    # 添加中间文件保存选项
-    parser.add_argument('--save-srt', action='store_true', 
-                       help='保存原始和翻译后的字幕文件')
+    # 批处理选项
+    parser.add_argument('--batch', action='store_true',
+                       help='批处理模式（输入为目录或通配符时自动启用，也可以是清单文件）')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='批处理工作进程数 (默认1)')
+    parser.add_argument('--output-dir', help='批处理输出目录 (默认与输入文件相同)')
+    parser.add_argument('--summary', help='批处理结果汇总文件 (默认 <输出目录>/batch_summary.json)')
+    parser.add_argument('--no-progress', action='store_true',
+                       help='不显示 FFmpeg 编码进度（帧数、fps、速度倍数、输出大小和剩余时间）')
     
     # 解析命令行参数
     args = parser.parse_args()
     
+    processor = None
     try:
         # 验证速度参数
         if not 0.5 <= args.speed <= 2.0:
             raise ValueError("速度因子必须在 0.5 到 2.0 之间")
         
+        # 批处理模式
+        if args.batch or is_batch_source(args.input):
+            return run_batch_mode(args)
+        
         # 验证输入文件存在
         if not os.path.exists(args.input):
             raise FileNotFoundError(f"输入文件不存在: {args.input}")
@@ -72,13 +294,12 @@ def main():
             basename = os.path.splitext(args.input)[0]
             args.output = f"{basename}_output.mp4"
         
-        # 创建处理器实例
-        processor = VideoProcessor()
-        processor.remove_original_subs = args.remove_subs
-        processor.keep_temp_files = args.keep_temp
-        processor.voice_name = args.voice  # 保存语音选择
-        processor.speed_factor = args.speed  # 设置速度因子
-        processor.save_intermediate = args.save_srt  # 设置是否保存中间文件
+        # 创建处理器实例（结束时关闭翻译服务连接和翻译记忆）
+        processor = apply_settings(VideoProcessor(), get_processor_settings(args))
+        if not args.no_progress:
+            processor.progress_callback = ProgressDisplay()
+            processor.audio_extractor.progress = processor.progress_callback
+            processor.video_composer.progress = processor.progress_callback
         
         # 设置输出路径
         final_output = args.output
@@ -191,6 +412,9 @@ def main():
     except Exception as e:
         logger.error(f"处理失败: {str(e)}")
         return 1
+    finally:
+        if processor is not None:
+            processor.close()
 
 if __name__ == "__main__":
     sys.exit(main()) 
\ No newline at end of file
@@ -0,0 +1,114 @@
+import os
+import json
+import time
+from .utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class JobManifest:
+    """任务清单
+
+    记录一次处理任务中已完成的阶段及其产物，以及已生成的配音片段，
+    任务中途失败后可以据此从最后一个完成的检查点继续。
+    """
+
+    def __init__(self, path: str):
+        """初始化任务清单
+
+        Args:
+            path: 清单文件路径（JSON）
+        """
+        self.path = path
+        self.data = self._empty()
+        self.load()
+
+    def _empty(self, input_path: str = None, output_path: str = None) -> dict:
+        """空清单"""
+        return {
+            'input': input_path,
+            'output': output_path,
+            'created': time.time(),
+            'stages': {},
+            'segments': {'key': None, 'files': {}}
+        }
+
+    def load(self):
+        """从磁盘加载清单"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"任务清单读取失败，将重新开始: {str(e)}")
+            self.data = self._empty()
+
+    def save(self):
+        """写入磁盘（先写临时文件再替换，避免中断时损坏）"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+    def reset(self, input_path: str, output_path: str):
+        """开始一个新任务，丢弃之前的检查点"""
+        self.data = self._empty(os.path.abspath(input_path), os.path.abspath(output_path))
+        self.save()
+
+    def matches(self, input_path: str, output_path: str) -> bool:
+        """清单是否属于同一个任务"""
+        return (
+            self.data.get('input') == os.path.abspath(input_path)
+            and self.data.get('output') == os.path.abspath(output_path)
+        )
+
+    def get_stage(self, stage: str, key: str) -> dict:
+        """查询已完成的阶段
+
+        Returns:
+            dict: 阶段已完成且产物仍存在时返回 {产物名称: 文件路径}，否则返回 None
+        """
+        record = self.data['stages'].get(stage)
+        if not record or record.get('key') != key:
+            return None
+        files = record.get('files', {})
+        if not all(os.path.exists(path) for path in files.values()):
+            return None
+        return files
+
+    def mark_stage(self, stage: str, key: str, files: dict):
+        """记录阶段完成"""
+        self.data['stages'][stage] = {
+            'key': key,
+            'files': files,
+            'finished': time.time()
+        }
+        self.save()
+
+    def get_segments(self, key: str) -> dict:
+        """获取已完成的配音片段
+
+        Args:
+            key: 配音阶段的键，翻译结果或语音参数变化后旧片段失效
+
+        Returns:
+            dict: {字幕序号: 音频文件路径}
+        """
+        segments = self.data.get('segments', {})
+        if segments.get('key') != key:
+            return {}
+        return {
+            int(index): path
+            for index, path in segments.get('files', {}).items()
+            if os.path.exists(path)
+        }
+
+    def mark_segment(self, key: str, index: int, path: str):
+        """记录单个配音片段完成"""
+        segments = self.data.setdefault('segments', {'key': key, 'files': {}})
+        if segments.get('key') != key:
+            segments['key'] = key
+            segments['files'] = {}
+        segments['files'][str(index)] = path
+        self.save()
@@ -0,0 +1,203 @@
+import os
+import json
+import threading
+from fractions import Fraction
+from .utils.logger import setup_logger
+from .utils.ffmpeg import run_ffmpeg
+
+logger = setup_logger(__name__)
+
+# 已探测的媒体信息 {(绝对路径, 文件大小, 修改时间): MediaInfo}
+_cache = {}
+_lock = threading.Lock()
+
+def _parse_rate(value) -> float:
+    """解析 FFprobe 的帧率（例如 30000/1001），无效时返回 None"""
+    try:
+        rate = Fraction(value)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    return round(float(rate), 3) if rate > 0 else None
+
+def _parse_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _parse_int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+class MediaInfo:
+    """一次 FFprobe 得到的媒体信息
+
+    包含容器时长、码率以及所有流的编码、尺寸、帧率、采样率、语言和标记，
+    视频流还包含从开头若干秒的关键帧估计的关键帧间隔。
+    """
+
+    def __init__(self, path: str, data: dict):
+        """由 FFprobe 的 JSON 输出构建
+
+        Args:
+            path: 媒体文件路径
+            data: ffprobe -of json 输出（format、streams，可选 packets）
+        """
+        fmt = data.get('format', {})
+        self.path = path
+        self.format_name = fmt.get('format_name')
+        self.duration = _parse_float(fmt.get('duration'))
+        self.bit_rate = _parse_int(fmt.get('bit_rate'))
+        self.size = _parse_int(fmt.get('size'))
+        self.streams = [self._parse_stream(stream) for stream in data.get('streams', [])]
+
+        if self.duration is None:
+            durations = [stream['duration'] for stream in self.streams if stream['duration']]
+            self.duration = max(durations) if durations else None
+
+        # 关键帧间隔：相邻关键帧时间差的平均值
+        video = self.video_stream
+        self.keyframe_interval = None
+        if video is not None:
+            keyframes = sorted(
+                float(packet['pts_time']) for packet in data.get('packets', [])
+                if packet.get('stream_index') == video['index']
+                and 'K' in packet.get('flags', '') and _parse_float(packet.get('pts_time')) is not None
+            )
+            if len(keyframes) > 1:
+                self.keyframe_interval = round((keyframes[-1] - keyframes[0]) / (len(keyframes) - 1), 3)
+
+    @staticmethod
+    def _parse_stream(stream: dict) -> dict:
+        tags = stream.get('tags', {})
+        return {
+            'index': stream.get('index'),
+            'type': stream.get('codec_type'),
+            'codec': stream.get('codec_name'),
+            'profile': stream.get('profile'),
+            'pix_fmt': stream.get('pix_fmt'),
+            'width': _parse_int(stream.get('width')),
+            'height': _parse_int(stream.get('height')),
+            'fps': _parse_rate(stream.get('avg_frame_rate')) or _parse_rate(stream.get('r_frame_rate')),
+            'sample_rate': _parse_int(stream.get('sample_rate')),
+            'channels': _parse_int(stream.get('channels')),
+            'duration': _parse_float(stream.get('duration')),
+            'bit_rate': _parse_int(stream.get('bit_rate')),
+            'language': tags.get('language'),
+            'title': tags.get('title', ''),
+            'disposition': stream.get('disposition', {})
+        }
+
+    def streams_of(self, stream_type: str) -> list:
+        """指定类型的流（video、audio、subtitle、data、attachment）"""
+        return [stream for stream in self.streams if stream['type'] == stream_type]
+
+    @property
+    def video_stream(self) -> dict:
+        """第一条视频流（不含封面图），没有时返回 None"""
+        for stream in self.streams_of('video'):
+            if not stream['disposition'].get('attached_pic'):
+                return stream
+        return None
+
+    @property
+    def audio_streams(self) -> list:
+        return self.streams_of('audio')
+
+    @property
+    def subtitle_streams(self) -> list:
+        return self.streams_of('subtitle')
+
+    @property
+    def width(self) -> int:
+        return self.video_stream['width'] if self.video_stream else None
+
+    @property
+    def height(self) -> int:
+        return self.video_stream['height'] if self.video_stream else None
+
+    @property
+    def fps(self) -> float:
+        return self.video_stream['fps'] if self.video_stream else None
+
+    @property
+    def video_codec(self) -> str:
+        return self.video_stream['codec'] if self.video_stream else None
+
+    @property
+    def audio_codec(self) -> str:
+        return self.audio_streams[0]['codec'] if self.audio_streams else None
+
+    def to_dict(self) -> dict:
+        return {
+            'path': self.path,
+            'format_name': self.format_name,
+            'duration': self.duration,
+            'bit_rate': self.bit_rate,
+            'size': self.size,
+            'keyframe_interval': self.keyframe_interval,
+            'streams': self.streams
+        }
+
+    def __repr__(self):
+        return (
+            f"MediaInfo({os.path.basename(self.path)}: {self.duration}s, "
+            f"{self.video_codec} {self.width}x{self.height}@{self.fps}, "
+            f"{len(self.audio_streams)} 音频流, {len(self.subtitle_streams)} 字幕流)"
+        )
+
+def probe(path: str, perf=None, keyframe_seconds: float = 30) -> MediaInfo:
+    """探测媒体文件，同一文件只执行一次 FFprobe
+
+    结果按（路径、大小、修改时间）缓存在进程内，文件改变后重新探测。
+    各组件通过这里获取尺寸、时长、编码和流信息，不再各自调用 FFprobe。
+
+    Args:
+        path: 媒体文件路径
+        perf: 性能报告（PerfReport）
+        keyframe_seconds: 读取开头多少秒的数据包来估计关键帧间隔，0 表示不估计
+
+    Returns:
+        MediaInfo: 媒体信息
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _lock:
+        info = _cache.get(key)
+    if info is not None:
+        if perf is not None:
+            perf.increment('probe.cache_hits')
+        return info
+
+    entries = 'format:stream'
+    command = ['ffprobe', '-v', 'error']
+    if keyframe_seconds:
+        entries += ':packet=stream_index,pts_time,flags'
+        command += ['-read_intervals', f'%+{keyframe_seconds}']
+    command += ['-show_entries', entries, '-of', 'json', path]
+
+    try:
+        result = run_ffmpeg(command, 'probe', perf)
+        if result.returncode != 0:
+            raise Exception(f"FFprobe 执行失败: {result.stderr}")
+        info = MediaInfo(path, json.loads(result.stdout or '{}'))
+    except Exception as e:
+        logger.error(f"探测媒体信息失败 {path}: {str(e)}")
+        raise
+
+    logger.info(f"媒体信息: {info}")
+    with _lock:
+        _cache[key] = info
+    return info
+
+def expected_duration(path: str, speed: float = 1.0, perf=None) -> float:
+    """按速度因子换算的输出时长（秒），用于计算编码进度，时长未知时返回 None"""
+    duration = probe(path, perf).duration
+    return duration / speed if duration else None
+
+def clear():
+    """清空媒体信息缓存"""
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,91 @@
+import threading
+from .utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 进程内已加载的识别模型 {(引擎, 模型名, 设备, 线程数, 计算类型): 模型}
+_models = {}
+# 各模型的推理锁 {id(模型): 锁}
+_model_locks = {}
+_lock = threading.Lock()
+
+def default_device() -> str:
+    """有可用 GPU 时使用 cuda，否则使用 cpu"""
+    import torch
+
+    return 'cuda' if torch.cuda.is_available() else 'cpu'
+
+def _load_whisper(name: str, device: str, threads: int, compute_type: str):
+    import torch
+    import whisper
+
+    # torch 线程数是进程级设置，对进程中所有 whisper 模型生效
+    if threads:
+        torch.set_num_threads(threads)
+    return whisper.load_model(name, device=device)
+
+def _load_faster_whisper(name: str, device: str, threads: int, compute_type: str):
+    from faster_whisper import WhisperModel
+
+    return WhisperModel(name, device=device, compute_type=compute_type, cpu_threads=threads or 0)
+
+# 各识别引擎的模型加载函数
+_LOADERS = {
+    'whisper': _load_whisper,
+    'faster-whisper': _load_faster_whisper
+}
+
+def get_model(name: str = 'base', device: str = None, threads: int = None,
+              engine: str = 'whisper', compute_type: str = None):
+    """获取识别模型，每个进程中同一组配置只加载一次
+
+    多个 SubtitleGenerator 实例、同一进程中的多个任务（包括服务模式的各槽位）共享同一份模型权重，
+    并发调用模型时需要持有 model_lock 返回的锁。
+    whisper 的线程数是进程级设置（torch.set_num_threads），不作为区分模型的键。
+
+    Args:
+        name: 模型名称（tiny、base、small、medium、large 等）
+        device: 设备（cpu、cuda），默认自动选择（faster-whisper 默认 cpu）
+        threads: CPU 线程数，默认不修改
+        engine: 识别引擎（whisper、faster-whisper）
+        compute_type: 计算类型（faster-whisper 使用，例如 int8）
+
+    Returns:
+        模型对象
+    """
+    if engine not in _LOADERS:
+        raise ValueError(f"不支持的识别引擎: {engine}")
+    if device is None:
+        device = default_device() if engine == 'whisper' else 'cpu'
+    key = (engine, name, device, None if engine == 'whisper' else threads, compute_type)
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            logger.info(
+                f"加载 {engine} 模型: {name} (设备 {device}, 线程 {threads or '默认'}"
+                + (f", 计算类型 {compute_type})" if compute_type else ")")
+            )
+            model = _LOADERS[engine](name, device, threads, compute_type)
+            _models[key] = model
+            _model_locks[id(model)] = threading.Lock()
+        return model
+
+def model_lock(model) -> threading.Lock:
+    """模型的推理锁
+
+    whisper 在模型模块上挂载 kv-cache 钩子，同一模型的并发解码会互相破坏，
+    共享模型的调用方识别时需要持有该锁。
+    """
+    with _lock:
+        return _model_locks.setdefault(id(model), threading.Lock())
+
+def loaded_models() -> list:
+    """已加载的模型键 [(引擎, 模型名, 设备, 线程数, 计算类型), ...]"""
+    with _lock:
+        return list(_models)
+
+def clear():
+    """释放所有已加载的模型"""
+    with _lock:
+        _models.clear()
+        _model_locks.clear()
@@ -0,0 +1,217 @@
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from .utils.logger import setup_logger
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块
+    resource = None
+
+logger = setup_logger(__name__)
+
+def _peak_rss_mb(who) -> float:
+    """进程（或已结束子进程中）的峰值常驻内存，单位 MB"""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux 单位为 KB，macOS 单位为字节
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
+
+def _cpu_seconds() -> float:
+    """本进程及已结束子进程的 CPU 时间（用户态 + 内核态）"""
+    if resource is None:
+        return time.process_time()
+    usage_self = resource.getrusage(resource.RUSAGE_SELF)
+    usage_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (usage_self.ru_utime + usage_self.ru_stime
+            + usage_children.ru_utime + usage_children.ru_stime)
+
+def _children_cpu_seconds() -> float:
+    """已结束子进程的 CPU 时间"""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+def _process_io() -> tuple:
+    """本进程读写的字节数 (rchar, wchar)，不支持的平台返回 (0, 0)"""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            values = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(values['rchar']), int(values['wchar'])
+    except (OSError, KeyError, ValueError):
+        return 0, 0
+
+class PerfReport:
+    """性能报告
+
+    记录每个处理阶段以及每个 FFmpeg 子进程的墙钟时间、CPU 时间、峰值内存和读写字节数，
+    以及翻译、配音的网络请求和重试次数。结果可保存为 JSON，也可以输出为日志表格。
+
+    - CPU 时间包含本进程和已结束的子进程（FFmpeg 等）
+    - 峰值内存为本进程与子进程中的最大值（进程启动以来的高水位）
+    - 读写字节数为本进程的 rchar/wchar 加上 FFmpeg 命令输入、输出文件的大小
+    - CPU 时间、峰值内存和 rchar/wchar 来自进程级统计（getrusage、/proc/self/io），无法按任务区分：
+      同一进程并发处理多个任务时（服务模式 --concurrency 大于 1），各任务的报告会包含其他任务的用量，
+      峰值内存是进程启动以来的最大值，不会随任务结束而下降
+    - 阶段可以嵌套（例如识别阶段内的音频提取），嵌套阶段记录 depth，总计只累加最外层阶段
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.stages = []
+        self.commands = []
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._command_io = [0, 0]  # FFmpeg 命令累计读写字节数
+        self._local = threading.local()  # 各线程当前的阶段嵌套深度
+
+    def increment(self, name: str, amount: int = 1):
+        """累加计数器（线程安全），例如 translation.requests、tts.retries"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def _snapshot(self) -> dict:
+        """当前资源使用快照"""
+        read_bytes, write_bytes = _process_io()
+        with self._lock:
+            counters = dict(self.counters)
+            read_bytes += self._command_io[0]
+            write_bytes += self._command_io[1]
+        return {
+            'wall': time.perf_counter(),
+            'cpu': _cpu_seconds(),
+            'read': read_bytes,
+            'write': write_bytes,
+            'counters': counters
+        }
+
+    @contextmanager
+    def stage(self, name: str):
+        """记录一个处理阶段
+
+        Yields:
+            dict: 阶段记录，可以在阶段内补充字段（例如 cached）
+        """
+        depth = getattr(self._local, 'depth', 0)
+        record = {'stage': name, 'depth': depth}
+        before = self._snapshot()
+        status = 'success'
+        self._local.depth = depth + 1
+        try:
+            yield record
+        except Exception:
+            status = 'failed'
+            raise
+        finally:
+            self._local.depth = depth
+            after = self._snapshot()
+            record.update({
+                'status': status,
+                'wall_seconds': round(after['wall'] - before['wall'], 3),
+                'cpu_seconds': round(after['cpu'] - before['cpu'], 3),
+                'peak_rss_mb': max(_peak_rss_mb(resource.RUSAGE_SELF),
+                                   _peak_rss_mb(resource.RUSAGE_CHILDREN)) if resource else 0.0,
+                'bytes_read': after['read'] - before['read'],
+                'bytes_written': after['write'] - before['write'],
+                'counters': {
+                    key: value - before['counters'].get(key, 0)
+                    for key, value in after['counters'].items()
+                    if value != before['counters'].get(key, 0)
+                }
+            })
+            with self._lock:
+                self.stages.append(record)
+
+    @contextmanager
+    def command(self, name: str, command: list):
+        """记录一次 FFmpeg 子进程
+
+        CPU 时间取子进程结束前后 RUSAGE_CHILDREN 的差值。
+
+        Yields:
+            dict: 命令记录，调用方填入 returncode；输出到管道时填入 output_bytes
+        """
+        record = {'name': name, 'returncode': None}
+        start = time.perf_counter()
+        cpu_before = _children_cpu_seconds()
+        try:
+            yield record
+        finally:
+            inputs = [
+                command[i + 1] for i, arg in enumerate(command[:-1])
+                if arg == '-i' and os.path.isfile(command[i + 1])
+            ]
+            output = command[-1]
+            bytes_read = sum(os.path.getsize(path) for path in inputs)
+            if os.path.isfile(output):
+                bytes_written = os.path.getsize(output)
+            else:
+                bytes_written = record.pop('output_bytes', 0)
+            record.update({
+                'wall_seconds': round(time.perf_counter() - start, 3),
+                'cpu_seconds': round(_children_cpu_seconds() - cpu_before, 3),
+                'peak_rss_mb': _peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else 0.0,
+                'bytes_read': bytes_read,
+                'bytes_written': bytes_written
+            })
+            with self._lock:
+                self._command_io[0] += bytes_read
+                self._command_io[1] += bytes_written
+                self.commands.append(record)
+
+    def to_dict(self) -> dict:
+        """报告内容"""
+        with self._lock:
+            # 嵌套阶段的时间已包含在外层阶段中
+            top_level = [item for item in self.stages if not item.get('depth')]
+            return {
+                'started': self.started,
+                'total_wall_seconds': round(sum(item['wall_seconds'] for item in top_level), 3),
+                'total_cpu_seconds': round(sum(item['cpu_seconds'] for item in top_level), 3),
+                'peak_rss_mb': max([item['peak_rss_mb'] for item in self.stages] or [0.0]),
+                'stages': list(self.stages),
+                'commands': list(self.commands),
+                'counters': dict(self.counters)
+            }
+
+    def save(self, path: str) -> str:
+        """保存为 JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def format_table(self) -> str:
+        """格式化为文本表格"""
+        lines = [
+            f"{'阶段':<14}{'墙钟(s)':>10}{'CPU(s)':>10}{'峰值内存(MB)':>14}"
+            f"{'读(MB)':>10}{'写(MB)':>10}  其他"
+        ]
+        for item in self.stages:
+            extra = ' '.join(f"{key}={value}" for key, value in item['counters'].items())
+            if item.get('cached'):
+                extra = f"cached {extra}".strip()
+            if item['status'] != 'success':
+                extra = f"{item['status']} {extra}".strip()
+            stage = '  ' * item.get('depth', 0) + item['stage']
+            lines.append(
+                f"{stage:<14}{item['wall_seconds']:>10.2f}{item['cpu_seconds']:>10.2f}"
+                f"{item['peak_rss_mb']:>14.1f}{item['bytes_read'] / 1e6:>10.1f}"
+                f"{item['bytes_written'] / 1e6:>10.1f}  {extra}"
+            )
+        for item in self.commands:
+            lines.append(
+                f"  {'ffmpeg:' + item['name']:<12}{item['wall_seconds']:>10.2f}{item['cpu_seconds']:>10.2f}"
+                f"{item['peak_rss_mb']:>14.1f}{item['bytes_read'] / 1e6:>10.1f}"
+                f"{item['bytes_written'] / 1e6:>10.1f}"
+            )
+        return '\n'.join(lines)
+
+    def log_summary(self):
+        """在日志中输出汇总表格"""
+        logger.info(f"性能报告:\n{self.format_table()}")
@@ -0,0 +1,64 @@
+import time
+import asyncio
+import threading
+
+class TokenBucket:
+    """令牌桶限速器
+
+    以 rate 个/秒的速度补充令牌，最多积累 capacity 个。每次请求预约一个令牌并返回需要等待的时间，
+    状态由线程锁保护，不绑定事件循环，多个线程和多次 asyncio.run 可以共用同一个限速器。
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        Args:
+            rate: 每秒请求数，为 0 或 None 时不限速
+            capacity: 突发容量（令牌数上限），默认等于 rate（至少 1）
+        """
+        self.rate = rate
+        self._fixed_capacity = capacity is not None
+        self.capacity = capacity if capacity is not None else max(1.0, rate or 0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate: float):
+        """修改速率，保留已积累的令牌和已预约的等待（默认突发容量随速率调整）"""
+        with self._lock:
+            now = time.monotonic()
+            if self.rate:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.rate = rate
+            if not self._fixed_capacity:
+                self.capacity = max(1.0, rate or 0)
+            self._tokens = min(self.capacity, self._tokens)
+
+    def reserve(self) -> float:
+        """预约一个令牌
+
+        Returns:
+            float: 需要等待的秒数，0 表示可以立即发送
+        """
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    async def acquire(self):
+        """等待直到可以发送请求"""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def wait(self):
+        """同步等待直到可以发送请求"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,287 @@
+import os
+import json
+import time
+import uuid
+import queue
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from .batch import apply_settings, get_setting, set_setting
+from .utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 提交任务时允许按任务覆盖的处理器设置（请求字段: 处理器属性）
+JOB_OPTIONS = {
+    'speed': 'speed_factor',
+    'voice': 'voice_name',
+    'remove_subs': 'remove_original_subs',
+    'stream': 'streaming',
+    'save_srt': 'save_intermediate',
+    'model': 'subtitle_generator.model_name',
+    'profile': 'video_composer.profile'
+}
+
+class JobService:
+    """常驻任务服务
+
+    启动时为每个并发槽位创建一个 VideoProcessor 并加载模型（各槽位共用进程内的同一份模型，
+    whisper 识别时按模型加锁，同一时刻只有一个槽位在识别），之后所有任务复用这些实例，
+    不再为每个任务支付解释器启动、torch 导入和模型加载的开销。
+    任务进入队列，由固定数量的工作线程按提交顺序处理。
+    已结束的任务最多保留 max_jobs 个，超过时丢弃最早结束的任务记录。
+    """
+
+    def __init__(self, settings: dict = None, concurrency: int = 1, processor_factory=None,
+                 max_jobs: int = 1000):
+        """初始化任务服务
+
+        Args:
+            settings: 处理器设置（属性名: 值），同命令行
+            concurrency: 同时处理的任务数（每个槽位一个处理器，模型在槽位间共用）
+            processor_factory: 创建处理器的函数，默认为 VideoProcessor
+            max_jobs: 保留的已结束任务数上限
+        """
+        self.settings = dict(settings or {})
+        self.concurrency = max(1, concurrency)
+        self.processor_factory = processor_factory
+        self.max_jobs = max_jobs
+        self.jobs = {}
+        self.processors = []
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def _create_processor(self):
+        """创建处理器，应用设置并加载模型"""
+        if self.processor_factory is None:
+            from .video_processor import VideoProcessor
+            self.processor_factory = VideoProcessor
+        processor = apply_settings(self.processor_factory(), self.settings)
+        processor.subtitle_generator.model
+        return processor
+
+    def start(self):
+        """创建处理器并启动工作线程"""
+        logger.info(f"正在启动 {self.concurrency} 个处理槽位并加载模型...")
+        for slot in range(self.concurrency):
+            processor = self._create_processor()
+            self.processors.append(processor)
+            thread = threading.Thread(
+                target=self._worker,
+                args=(processor,),
+                name=f"job-worker-{slot}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info("任务服务已就绪")
+
+    def stop(self):
+        """停止工作线程（等待正在处理的任务完成）并释放各处理器的连接和翻译记忆"""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        for processor in self.processors:
+            processor.close()
+        self.processors = []
+
+    def submit(self, input_path: str, output_path: str = None, options: dict = None) -> dict:
+        """提交任务
+
+        Args:
+            input_path: 输入视频路径
+            output_path: 输出视频路径（默认 <输入文件名>_output.mp4）
+            options: 按任务覆盖的设置，见 JOB_OPTIONS
+
+        Returns:
+            dict: 任务状态
+        """
+        if not os.path.exists(input_path):
+            raise FileNotFoundError(f"输入文件不存在: {input_path}")
+        if options is not None and not isinstance(options, dict):
+            raise ValueError("options 必须是 JSON 对象")
+        options = dict(options or {})
+        unknown = set(options) - set(JOB_OPTIONS)
+        if unknown:
+            raise ValueError(f"不支持的任务参数: {', '.join(sorted(unknown))}")
+        if 'speed' in options:
+            try:
+                options['speed'] = float(options['speed'])
+            except (TypeError, ValueError):
+                raise ValueError("速度因子必须是数字")
+            if not 0.5 <= options['speed'] <= 2.0:
+                raise ValueError("速度因子必须在 0.5 到 2.0 之间")
+
+        if not output_path:
+            output_path = f"{os.path.splitext(input_path)[0]}_output.mp4"
+
+        job = {
+            'id': uuid.uuid4().hex[:12],
+            'input': input_path,
+            'output': output_path,
+            'options': options,
+            'status': 'queued',
+            'stages': [],
+            'error': None,
+            'submitted': time.time(),
+            'started': None,
+            'finished': None
+        }
+        with self._lock:
+            self.jobs[job['id']] = job
+        self._queue.put(job['id'])
+        logger.info(f"任务已提交: {job['id']} ({input_path})")
+        return self.get(job['id'])
+
+    def get(self, job_id: str) -> dict:
+        """任务状态，不存在时返回 None"""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            result = dict(job)
+            processor = job.get('_processor')
+        result.pop('_processor', None)
+        # 运行中的任务从性能报告读取已完成的阶段
+        if processor is not None and processor.perf is not None:
+            result['stages'] = [item['stage'] for item in processor.perf.to_dict()['stages']]
+        return result
+
+    def list(self) -> list:
+        """所有任务状态（按提交顺序）"""
+        with self._lock:
+            job_ids = list(self.jobs)
+        return [self.get(job_id) for job_id in job_ids]
+
+    def _prune_jobs(self):
+        """丢弃超出上限的已结束任务（按结束时间从早到晚，调用方持有锁）"""
+        finished = [job for job in self.jobs.values() if job['status'] in ('success', 'failed')]
+        if len(finished) <= self.max_jobs:
+            return
+        finished.sort(key=lambda job: job['finished'])
+        for job in finished[:len(finished) - self.max_jobs]:
+            del self.jobs[job['id']]
+
+    def _worker(self, processor):
+        """工作线程：依次处理队列中的任务"""
+        defaults = {attr: get_setting(processor, attr) for attr in JOB_OPTIONS.values()}
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                break
+
+            with self._lock:
+                job = self.jobs[job_id]
+                job['status'] = 'running'
+                job['started'] = time.time()
+                job['_processor'] = processor
+
+            for key, attr in JOB_OPTIONS.items():
+                set_setting(processor, attr, job['options'].get(key, defaults[attr]))
+
+            status, error = 'success', None
+            try:
+                processor.process(job['input'], job['output'])
+            except Exception as e:
+                status, error = 'failed', str(e)
+                logger.error(f"任务失败: {job_id} - {error}")
+
+            report = processor.perf.to_dict() if processor.perf is not None else None
+            with self._lock:
+                job.pop('_processor', None)
+                job['status'] = status
+                job['error'] = error
+                job['finished'] = time.time()
+                job['elapsed'] = round(job['finished'] - job['started'], 2)
+                if report is not None:
+                    job['stages'] = [item['stage'] for item in report['stages']]
+                    # CPU 时间和峰值内存是进程级统计，包含同时运行的其他任务，按进程级字段返回
+                    job['perf'] = {
+                        'total_wall_seconds': report['total_wall_seconds'],
+                        'process_cpu_seconds': report['total_cpu_seconds'],
+                        'process_peak_rss_mb': report['peak_rss_mb']
+                    }
+                self._prune_jobs()
+            logger.info(f"任务完成: {job_id} ({status})")
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """HTTP 接口
+
+    POST /jobs          提交任务 {"input": ..., "output": ..., "options": {...}}
+    GET  /jobs          所有任务
+    GET  /jobs/<id>     任务状态、已完成阶段和结果
+    GET  /health        服务状态
+    """
+
+    service = None  # 由 serve 设置
+
+    def _send_json(self, status: int, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.rstrip('/')
+        if path == '/health':
+            jobs = self.service.list()
+            self._send_json(200, {
+                'status': 'ok',
+                'concurrency': self.service.concurrency,
+                'queued': sum(1 for job in jobs if job['status'] == 'queued'),
+                'running': sum(1 for job in jobs if job['status'] == 'running')
+            })
+        elif path == '/jobs':
+            self._send_json(200, self.service.list())
+        elif path.startswith('/jobs/'):
+            job = self.service.get(path[len('/jobs/'):])
+            if job is None:
+                self._send_json(404, {'error': '任务不存在'})
+            else:
+                self._send_json(200, job)
+        else:
+            self._send_json(404, {'error': '接口不存在'})
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/jobs':
+            self._send_json(404, {'error': '接口不存在'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            data = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(data, dict):
+                raise ValueError("请求体必须是 JSON 对象")
+            if not data.get('input') or not isinstance(data['input'], str):
+                raise ValueError("缺少 input 字段")
+            job = self.service.submit(data['input'], data.get('output'), data.get('options'))
+            self._send_json(202, job)
+        except (ValueError, FileNotFoundError) as e:
+            self._send_json(400, {'error': str(e)})
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+def create_server(service: JobService, host: str = '127.0.0.1', port: int = 8765) -> ThreadingHTTPServer:
+    """创建 HTTP 服务（不启动任务服务）"""
+    handler = type('RequestHandler', (_RequestHandler,), {'service': service})
+    return ThreadingHTTPServer((host, port), handler)
+
+def serve(settings: dict, host: str = '127.0.0.1', port: int = 8765, concurrency: int = 1,
+          max_jobs: int = 1000):
+    """启动常驻任务服务，直到收到中断信号"""
+    service = JobService(settings, concurrency, max_jobs=max_jobs)
+    service.start()
+    server = create_server(service, host, port)
+    logger.info(f"服务已启动: http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("正在停止服务...")
+    finally:
+        server.server_close()
+        service.stop()
@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+from .utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class StageCache:
+    """基于内容哈希的阶段缓存
+
+    每个处理阶段的产物按 "输入文件哈希 + 阶段参数" 计算出的键存放在磁盘上，
+    下游阶段的键包含上游阶段的键，因此只修改下游参数时上游阶段可以直接命中。
+    缓存总大小超过上限时按最近访问时间（LRU）淘汰。
+    """
+
+    def __init__(self, cache_dir: str = None, max_size_mb: int = None):
+        """初始化阶段缓存
+
+        Args:
+            cache_dir: 缓存目录（默认读取 VIDEOPROCESSOR_CACHE_DIR，否则为 ~/.cache/videoprocessor）
+            max_size_mb: 缓存大小上限，单位 MB（默认读取 VIDEOPROCESSOR_CACHE_SIZE_MB，否则为 10240）
+        """
+        self.cache_dir = os.path.expanduser(
+            cache_dir
+            or os.getenv('VIDEOPROCESSOR_CACHE_DIR')
+            or os.path.join('~', '.cache', 'videoprocessor')
+        )
+        if max_size_mb is None:
+            max_size_mb = int(os.getenv('VIDEOPROCESSOR_CACHE_SIZE_MB', '10240'))
+        self.max_size = max_size_mb * 1024 * 1024
+        self.chunk_size = 4 * 1024 * 1024  # 计算哈希时每次读取的字节数
+
+        # 文件哈希缓存 {(path, size, mtime): sha256}
+        self._hash_memo = {}
+
+    def hash_file(self, path: str) -> str:
+        """计算文件内容的 SHA-256"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        memo_key = (path, stat.st_size, stat.st_mtime_ns)
+        if memo_key in self._hash_memo:
+            return self._hash_memo[memo_key]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+
+        file_hash = digest.hexdigest()
+        self._hash_memo[memo_key] = file_hash
+        return file_hash
+
+    def make_key(self, stage: str, **params) -> str:
+        """根据阶段名称和参数生成缓存键"""
+        payload = json.dumps({'stage': stage, 'params': params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _entry_dir(self, key: str) -> str:
+        """缓存条目所在目录"""
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, key: str) -> dict:
+        """查询缓存
+
+        Returns:
+            dict: 命中时返回 {产物名称: 文件路径}，未命中返回 None
+        """
+        entry_dir = self._entry_dir(key)
+        meta_path = os.path.join(entry_dir, 'meta.json')
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+
+            files = {
+                name: os.path.join(entry_dir, filename)
+                for name, filename in meta['files'].items()
+            }
+            if not all(os.path.exists(path) for path in files.values()):
+                return None
+
+            # 更新访问时间，用于 LRU 淘汰
+            os.utime(meta_path, None)
+            return files
+
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, key: str, files: dict, stage: str = None) -> dict:
+        """写入缓存
+
+        Args:
+            key: 缓存键
+            files: {产物名称: 文件路径}
+            stage: 阶段名称（仅用于记录）
+
+        Returns:
+            dict: 缓存中的 {产物名称: 文件路径}
+        """
+        entry_dir = self._entry_dir(key)
+        os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+
+        # 先写入临时目录再整体重命名，避免并发或中断时出现不完整的条目
+        staging_dir = tempfile.mkdtemp(prefix='.staging-', dir=os.path.dirname(entry_dir))
+        try:
+            meta = {'stage': stage, 'created': time.time(), 'files': {}, 'size': 0}
+            for name, path in files.items():
+                filename = f"{name}{os.path.splitext(path)[1]}"
+                shutil.copy2(path, os.path.join(staging_dir, filename))
+                meta['files'][name] = filename
+                meta['size'] += os.path.getsize(path)
+
+            with open(os.path.join(staging_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+
+            if os.path.exists(entry_dir):
+                shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(staging_dir, entry_dir)
+            logger.info(f"缓存已写入: {stage or key[:12]}")
+
+        except Exception as e:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            logger.warning(f"写入缓存失败: {str(e)}")
+            return files
+
+        self._evict()
+        return self.get(key) or files
+
+    def _evict(self):
+        """按最近访问时间淘汰超出大小上限的条目"""
+        entries = []
+        total_size = 0
+        for meta_path in self._iter_meta_files():
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    size = json.load(f).get('size', 0)
+                entries.append((os.path.getmtime(meta_path), size, os.path.dirname(meta_path)))
+                total_size += size
+            except (OSError, ValueError):
+                continue
+
+        if total_size <= self.max_size:
+            return
+
+        entries.sort()
+        for _, size, entry_dir in entries:
+            if total_size <= self.max_size:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_size -= size
+            logger.info(f"缓存已淘汰: {os.path.basename(entry_dir)[:12]}")
+
+    def _iter_meta_files(self):
+        """遍历所有缓存条目的元数据文件"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for prefix in os.listdir(self.cache_dir):
+            prefix_dir = os.path.join(self.cache_dir, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for key in os.listdir(prefix_dir):
+                meta_path = os.path.join(prefix_dir, key, 'meta.json')
+                if os.path.exists(meta_path):
+                    yield meta_path
+
+    def clear(self):
+        """清空缓存"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
@@ -0,0 +1,211 @@
+import queue
+import threading
+import srt
+from datetime import timedelta
+from .utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 队列结束标记
+_DONE = object()
+
+class StreamingPipeline:
+    """流式处理管线
+
+    语音识别每完成一个窗口就把片段按批次送入翻译，每批翻译结果直接送入配音。
+    识别、翻译、配音分别运行在独立线程中，网络密集的翻译和配音可以与
+    CPU 密集的识别重叠执行，而不必等待上一阶段全部完成。
+    """
+
+    def __init__(self, subtitle_generator, translation_service, tts_service,
+                 target_language: str = 'zh-cn', voice_name: str = None,
+                 batch_size: int = 10, use_batch_translation: bool = True,
+                 timestamp_scale: float = 1.0):
+        """初始化流式处理管线
+
+        Args:
+            subtitle_generator: 字幕生成器（提供 iter_segments）
+            translation_service: 翻译服务
+            tts_service: 语音合成服务
+            target_language: 目标语言
+            voice_name: 语音名称
+            batch_size: 每批送入翻译和配音的字幕条数
+            use_batch_translation: 是否将一批字幕合并为一次翻译请求
+            timestamp_scale: 识别结果时间戳的缩放比例（识别原始音频、输出变速视频时为 1 / 速度因子）
+        """
+        self.subtitle_generator = subtitle_generator
+        self.translation_service = translation_service
+        self.tts_service = tts_service
+        self.target_language = target_language
+        self.voice_name = voice_name
+        self.batch_size = batch_size
+        self.use_batch_translation = use_batch_translation
+        self.timestamp_scale = timestamp_scale
+        self.queue_size = 4  # 阶段之间最多缓冲的批次数
+
+        self._stop = threading.Event()
+        self._errors = []
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        """放入队列，管线停止时放弃"""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue):
+        """从队列取出，管线停止时返回结束标记"""
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _run_thread(self, name: str, target, *args) -> threading.Thread:
+        """启动阶段线程，异常时停止整个管线"""
+        def runner():
+            try:
+                target(*args)
+            except Exception as e:
+                logger.error(f"流式处理阶段失败 ({name}): {str(e)}")
+                self._errors.append(e)
+                self._stop.set()
+
+        thread = threading.Thread(target=runner, name=f"stream-{name}", daemon=True)
+        thread.start()
+        return thread
+
+    def _transcribe(self, audio_path, original_subs: list, output: queue.Queue):
+        """识别阶段：按批次产出原始字幕"""
+        batch = []
+        for segment in self.subtitle_generator.iter_segments(audio_path):
+            if self._stop.is_set():
+                return
+            sub = srt.Subtitle(
+                index=len(original_subs) + 1,
+                start=timedelta(seconds=segment['start'] * self.timestamp_scale),
+                end=timedelta(seconds=segment['end'] * self.timestamp_scale),
+                content=segment['text']
+            )
+            original_subs.append(sub)
+            batch.append(sub)
+            if len(batch) >= self.batch_size:
+                if not self._put(output, batch):
+                    return
+                batch = []
+
+        if batch:
+            self._put(output, batch)
+        self._put(output, _DONE)
+        logger.info(f"流式识别完成，共 {len(original_subs)} 条字幕")
+
+    def _translate_batch(self, subs: list) -> list:
+        """翻译一批字幕，返回与字幕一一对应的译文"""
+        texts = [sub.content for sub in subs]
+
+        if self.use_batch_translation:
+            translated = self.translation_service.translate_text(
+                ['\n'.join(texts)],
+                target_language=self.target_language,
+                use_batch=True
+            )
+            lines = [line.strip() for line in translated.strip().split('\n')]
+            if len(lines) == len(texts):
+                return lines
+            logger.warning(f"批量翻译行数不匹配 ({len(texts)} -> {len(lines)})，改为逐句翻译")
+
+        translated = self.translation_service.translate_text(
+            texts,
+            target_language=self.target_language,
+            use_batch=False
+        )
+        lines = [line.strip() for line in translated.strip().split('\n')]
+        if len(lines) != len(texts):
+            raise Exception(f"翻译文本数量与原始字幕不匹配: 原始字幕 {len(texts)} 条, 翻译文本 {len(lines)} 条")
+        return lines
+
+    def _translate(self, source: queue.Queue, translated_subs: list, output: queue.Queue):
+        """翻译阶段：逐批翻译并送入配音"""
+        while True:
+            batch = self._get(source)
+            if batch is _DONE:
+                break
+            lines = self._translate_batch(batch)
+            translated_batch = [
+                srt.Subtitle(index=sub.index, start=sub.start, end=sub.end, content=line)
+                for sub, line in zip(batch, lines)
+            ]
+            translated_subs.extend(translated_batch)
+            logger.info(f"流式翻译进度: {len(translated_subs)} 条")
+            if not self._put(output, translated_batch):
+                return
+        self._put(output, _DONE)
+
+    def _synthesize(self, source: queue.Queue, segment_dir: str, audio_segments: list,
+                    completed_segments: dict, on_segment_done):
+        """配音阶段：逐批生成配音片段"""
+        while True:
+            batch = self._get(source)
+            if batch is _DONE:
+                break
+            audio_segments.extend(self.tts_service.synthesize_segments(
+                batch,
+                segment_dir,
+                target_language=self.target_language,
+                voice_name=self.voice_name,
+                completed_segments=completed_segments,
+                on_segment_done=on_segment_done
+            ))
+            logger.info(f"流式配音进度: {len(audio_segments)} 个片段")
+
+    def run(self, audio_path, original_srt_path: str, translated_srt_path: str,
+            dubbed_audio_path: str, segment_dir: str, completed_segments: dict = None,
+            on_segment_done=None) -> dict:
+        """运行流式管线
+
+        Args:
+            audio_path: 音频文件路径，或 16kHz 单声道 float32 采样（numpy 数组）
+
+        Returns:
+            dict: {'original_srt': 原始字幕, 'translated_srt': 翻译字幕, 'dubbed_audio': 配音}
+        """
+        self._stop.clear()
+        self._errors = []
+
+        original_subs = []
+        translated_subs = []
+        audio_segments = []
+        to_translate = queue.Queue(maxsize=self.queue_size)
+        to_synthesize = queue.Queue(maxsize=self.queue_size)
+
+        threads = [
+            self._run_thread('transcribe', self._transcribe, audio_path, original_subs, to_translate),
+            self._run_thread('translate', self._translate, to_translate, translated_subs, to_synthesize),
+            self._run_thread('tts', self._synthesize, to_synthesize, segment_dir, audio_segments,
+                             completed_segments, on_segment_done)
+        ]
+        for thread in threads:
+            thread.join()
+
+        if self._errors:
+            raise self._errors[0]
+
+        # 写入字幕并合并配音
+        with open(original_srt_path, 'w', encoding='utf-8') as f:
+            f.write(srt.compose(original_subs))
+        with open(translated_srt_path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(srt.compose(translated_subs))
+
+        audio_segments.sort(key=lambda seg: seg['start_time'])
+        self.tts_service.merge_segments(audio_segments, dubbed_audio_path)
+
+        logger.info(f"流式处理完成: {len(translated_subs)} 条字幕, {len(audio_segments)} 个配音片段")
+        return {
+            'original_srt': original_srt_path,
+            'translated_srt': translated_srt_path,
+            'dubbed_audio': dubbed_audio_path
+        }
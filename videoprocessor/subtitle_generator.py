@@ -1,26 +1,175 @@
-import whisper
+import os
 import srt
+import multiprocessing
 from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor
+from .audio_chunks import split_on_silence
+from .asr_engines import SAMPLE_RATE, create_engine
 from .utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# 分段识别工作进程中常驻的识别引擎
+_worker_engine = None
+
+def _init_chunk_worker(engine: str, model_name: str, device: str, threads: int, compute_type: str):
+    """分段识别工作进程初始化：限制线程数并加载模型"""
+    global _worker_engine
+    _worker_engine = create_engine(engine, model_name, device, threads, compute_type)
+    _worker_engine.model
+
+def _transcribe_chunk(samples, options: dict) -> list:
+    """在工作进程中识别一个音频片段，返回相对片段起点的时间戳"""
+    return _worker_engine.transcribe(samples, **options)
+
 class SubtitleGenerator:
     """字幕生成器"""
     
     def __init__(self):
-        """初始化 Whisper 模型"""
-        self.model = whisper.load_model("base")
+        """初始化字幕生成器（模型在首次使用时从进程内共享的模型注册表获取）"""
+        # 识别引擎、模型与解码参数，默认值可通过环境变量配置
+        self.engine = os.getenv('VIDEOPROCESSOR_ASR_ENGINE', 'whisper')  # whisper / faster-whisper
+        self.compute_type = os.getenv('VIDEOPROCESSOR_ASR_COMPUTE_TYPE') or None  # faster-whisper 默认 int8
+        self.model_name = os.getenv('VIDEOPROCESSOR_WHISPER_MODEL', 'base')
+        self.device = os.getenv('VIDEOPROCESSOR_WHISPER_DEVICE') or None  # 默认自动选择
+        self.threads = None  # CPU 线程数，默认不修改
+        self.beam_size = int(os.getenv('VIDEOPROCESSOR_WHISPER_BEAM_SIZE', 0)) or None  # 默认贪心解码
+        self.temperature = None  # 温度回退序列，默认使用 Whisper 的 (0.0, 0.2, ..., 1.0)
+        self.language = os.getenv('VIDEOPROCESSOR_WHISPER_LANGUAGE') or None  # 默认自动检测
+        
+        self.window_seconds = 300  # 流式识别时每个窗口的时长（秒）
+        self.prompt_chars = 200  # 跨窗口传递的上文字符数
+        self.workers = 1  # 分段并行识别的进程数，1 表示整段识别
+        self.chunk_seconds = 120  # 分段识别时每段的目标时长（秒），在静音处切分
+        
+        # 两级识别：先用当前模型识别全部音频，再用较大模型重新识别低置信度片段
+        self.cascade_model = None  # 第二级模型，例如 medium；为 None 时不启用
+        self.cascade_logprob_threshold = -1.0  # 平均对数概率低于该值时重新识别
+        self.cascade_compression_threshold = 2.4  # 文本压缩比高于该值（重复、幻觉）时重新识别
+        self.cascade_padding = 0.2  # 重新识别时片段两侧多截取的音频（秒）
+        self.cascade_max_gap = 2.0  # 间隔不超过该值（秒）的相邻低置信度片段合并识别
+        self._pool = None
+        self._pool_key = None
+    
+    @property
+    def asr_engine(self):
+        """当前配置的识别引擎"""
+        return create_engine(self.engine, self.model_name, self.device, self.threads, self.compute_type)
+    
+    @property
+    def model(self):
+        """识别模型，同一进程中相同配置的模型只加载一次"""
+        return self.asr_engine.model
+    
+    def decode_options(self) -> dict:
+        """传给识别引擎的解码参数（只包含已设置的项）"""
+        options = {}
+        if self.beam_size:
+            options['beam_size'] = self.beam_size
+        if self.temperature is not None:
+            options['temperature'] = self.temperature
+        if self.language:
+            options['language'] = self.language
+        return options
+    
+    def cascade_options(self) -> dict:
+        """两级识别参数，未启用时返回 None"""
+        if not self.cascade_model:
+            return None
+        return {
+            'model': self.cascade_model,
+            'logprob_threshold': self.cascade_logprob_threshold,
+            'compression_threshold': self.cascade_compression_threshold,
+            'padding': self.cascade_padding,
+            'max_gap': self.cascade_max_gap
+        }
+    
+    def _needs_refine(self, segment: dict) -> bool:
+        """片段是否需要用第二级模型重新识别"""
+        logprob = segment.get('avg_logprob')
+        ratio = segment.get('compression_ratio')
+        return ((logprob is not None and logprob < self.cascade_logprob_threshold)
+                or (ratio is not None and ratio > self.cascade_compression_threshold))
+    
+    def _refine_segments(self, audio, segments: list) -> list:
+        """用第二级模型重新识别低置信度片段
+        
+        相邻的低置信度片段合并为一段音频，截取时不越过前后保留片段的边界，
+        识别结果按截取位置偏移后替换原片段，其余片段保持不变。
+        
+        Args:
+            audio: 16kHz 单声道 float32 采样，片段时间戳相对于它的起点
+            segments: 第一级识别结果
+        
+        Returns:
+            list: 合并后的片段
+        """
+        if not self.cascade_model or not segments:
+            return segments
+        flags = [self._needs_refine(segment) for segment in segments]
+        if not any(flags):
+            return segments
+        
+        engine = create_engine(self.engine, self.cascade_model, self.device, self.threads, self.compute_type)
+        total_seconds = len(audio) / SAMPLE_RATE
+        refined = []
+        redecoded_seconds = 0.0
+        
+        i = 0
+        while i < len(segments):
+            if not flags[i]:
+                refined.append(segments[i])
+                i += 1
+                continue
+            
+            j = i
+            while (j + 1 < len(segments) and flags[j + 1]
+                   and segments[j + 1]['start'] - segments[j]['end'] <= self.cascade_max_gap):
+                j += 1
+            
+            lower = segments[i - 1]['end'] if i > 0 else 0.0
+            upper = segments[j + 1]['start'] if j + 1 < len(segments) else total_seconds
+            span_start = min(max(lower, segments[i]['start'] - self.cascade_padding), segments[i]['start'])
+            span_end = max(min(upper, segments[j]['end'] + self.cascade_padding), segments[j]['end'])
+            
+            samples = audio[int(span_start * SAMPLE_RATE):int(span_end * SAMPLE_RATE)]
+            for segment in engine.transcribe(samples, **self.decode_options()):
+                start = min(span_start + segment['start'], span_end)
+                end = min(span_start + segment['end'], span_end)
+                if end > start and segment['text'].strip():
+                    refined.append(dict(segment, start=start, end=end))
+            
+            redecoded_seconds += span_end - span_start
+            i = j + 1
+        
+        logger.info(
+            f"两级识别: {sum(flags)}/{len(segments)} 个片段使用 {self.cascade_model} 重新识别, "
+            f"共 {redecoded_seconds:.1f}/{total_seconds:.1f} 秒音频"
+        )
+        return refined
     
-    def generate(self, audio_path: str, output_path: str) -> str:
-        """生成字幕文件"""
+    def generate(self, audio_path, output_path: str) -> str:
+        """生成字幕文件
+        
+        Args:
+            audio_path: 音频文件路径，或 16kHz 单声道 float32 采样（numpy 数组）
+            output_path: 字幕输出路径
+        """
         try:
-            # 使用 Whisper 识别音频
-            result = self.model.transcribe(audio_path)
+            # 两级识别需要按时间截取音频
+            if self.cascade_model and isinstance(audio_path, str):
+                audio_path = self.asr_engine.load_audio(audio_path)
+            
+            if self.workers > 1:
+                segments = self._transcribe_parallel(audio_path)
+            else:
+                # 识别音频（数组直接识别，不再解码）
+                segments = self.asr_engine.transcribe(audio_path, **self.decode_options())
+            segments = self._refine_segments(audio_path, segments)
             
             # 转换为 SRT 格式
             subs = []
-            for i, segment in enumerate(result["segments"], start=1):
+            for i, segment in enumerate(segments, start=1):
                 start = timedelta(seconds=segment["start"])
                 end = timedelta(seconds=segment["end"])
                 text = segment["text"].strip()
@@ -41,4 +190,162 @@ class SubtitleGenerator:
             
         except Exception as e:
             logger.error(f"字幕生成失败: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """分段识别进程池，首次使用时创建，之后的任务复用（模型只加载一次）"""
+        pool_key = (self.engine, self.model_name, self.device, self.compute_type, self.workers)
+        if self._pool is not None and self._pool_key != pool_key:
+            self.close()
+        if self._pool is None:
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+            logger.info(f"启动分段识别进程池: {self.workers} 个进程, 每个进程 {threads} 个线程")
+            # 使用 spawn 启动工作进程，避免 fork 继承 torch 线程状态
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_chunk_worker,
+                initargs=(self.engine, self.model_name, self.device, threads, self.compute_type)
+            )
+            self._pool_key = pool_key
+        return self._pool
+    
+    def _transcribe_parallel(self, audio_path) -> list:
+        """在静音处切分音频，多进程并行识别后按顺序合并
+        
+        Returns:
+            list: 时间戳已加上片段偏移的识别片段
+        """
+        engine = self.asr_engine
+        audio = engine.load_audio(audio_path) if isinstance(audio_path, str) else audio_path
+        sample_rate = SAMPLE_RATE
+        bounds = split_on_silence(audio, sample_rate, self.chunk_seconds)
+        
+        pool = self._get_pool()
+        futures = [pool.submit(_transcribe_chunk, audio[start:end], self.decode_options()) for start, end in bounds]
+        
+        segments = []
+        for (start, _), future in zip(bounds, futures):
+            offset = start / sample_rate
+            for segment in future.result():
+                segments.append(dict(
+                    segment,
+                    start=offset + segment['start'],
+                    end=offset + segment['end']
+                ))
+        logger.info(f"分段识别完成: {len(bounds)} 段, {len(segments)} 条字幕")
+        return segments
+    
+    def close(self):
+        """关闭分段识别进程池"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            self._pool_key = None
+    
+    def generate_windowed(self, audio_path, output_path: str) -> str:
+        """按时间窗口识别并逐条写入字幕文件，内存占用与音频总时长无关
+        
+        Args:
+            audio_path: 音频文件路径、16kHz 单声道 float32 采样，或提供 read(采样数) 的采样流
+            output_path: 字幕输出路径
+        """
+        try:
+            count = 0
+            with open(output_path, 'w', encoding='utf-8') as f:
+                for segment in self.iter_segments(audio_path):
+                    count += 1
+                    f.write(srt.Subtitle(
+                        index=count,
+                        start=timedelta(seconds=segment['start']),
+                        end=timedelta(seconds=segment['end']),
+                        content=segment['text']
+                    ).to_srt())
+                    f.flush()
+            
+            logger.info(f"分窗识别完成: {count} 条字幕")
+            return output_path
+            
+        except Exception as e:
+            logger.error(f"字幕生成失败: {str(e)}")
+            raise
+    
+    def iter_segments(self, audio_path):
+        """按时间窗口逐段识别音频，每识别完一个窗口就产出其中的片段
+        
+        每次只读取一个窗口的音频，窗口末尾的片段可能被截断，因此除最后一个窗口外都会丢弃末尾片段，
+        下一个窗口从该片段的起点重新识别；上一窗口的文本作为提示词传给下一窗口。
+        输入为采样流时内存中最多保留一个窗口的音频。
+        
+        Args:
+            audio_path: 音频文件路径、16kHz 单声道 float32 采样，或提供 read(采样数) 的采样流
+        
+        Yields:
+            dict: {'start': 秒, 'end': 秒, 'text': 文本, 'confidence': 置信度}
+        """
+        import numpy as np
+        
+        engine = self.asr_engine
+        if isinstance(audio_path, str):
+            audio_path = engine.load_audio(audio_path)
+        reader = audio_path if hasattr(audio_path, 'read') else _ArrayReader(audio_path)
+        sample_rate = SAMPLE_RATE
+        window_samples = int(self.window_seconds * sample_rate)
+        
+        window_audio = np.asarray(reader.read(window_samples))
+        exhausted = len(window_audio) < window_samples
+        offset = 0
+        prompt = None
+        while len(window_audio):
+            offset_seconds = offset / sample_rate
+            segments = engine.transcribe(
+                window_audio,
+                initial_prompt=prompt,
+                **self.decode_options()
+            )
+            
+            consumed = len(window_audio)
+            if not exhausted and len(segments) > 1:
+                # 丢弃可能被截断的末尾片段，从它的起点开始下一个窗口
+                consumed = int(segments[-1]["start"] * sample_rate)
+                segments = segments[:-1]
+            segments = self._refine_segments(window_audio, segments)
+            
+            for segment in segments:
+                text = segment["text"].strip()
+                if not text:
+                    continue
+                yield {
+                    'start': offset_seconds + segment["start"],
+                    'end': offset_seconds + segment["end"],
+                    'text': text,
+                    'confidence': segment.get("confidence")
+                }
+            
+            window_text = ''.join(segment["text"] for segment in segments).strip()
+            if window_text:
+                prompt = window_text[-self.prompt_chars:]
+            
+            consumed = max(consumed, sample_rate)  # 至少前进 1 秒，避免死循环
+            offset += consumed
+            logger.info(f"已识别至 {min(offset, offset - consumed + len(window_audio)) / sample_rate:.1f} 秒")
+            if exhausted:
+                break
+            
+            # 保留未识别的部分，再读取音频补满一个窗口
+            remainder = window_audio[consumed:]
+            more = np.asarray(reader.read(window_samples - len(remainder)))
+            exhausted = len(more) < window_samples - len(remainder)
+            window_audio = np.concatenate([remainder, more]) if len(remainder) else more
+
+class _ArrayReader:
+    """以采样流的接口读取内存中的采样"""
+    
+    def __init__(self, audio):
+        self.audio = audio
+        self.position = 0
+    
+    def read(self, count: int):
+        chunk = self.audio[self.position:self.position + count]
+        self.position += len(chunk)
+        return chunk
@@ -249,4 +249,41 @@ class SubtitleProcessor:
             
         except Exception as e:
             logger.error(f"字幕填充失败: {str(e)}")
-            raise 
\ No newline at end of file
+            raise 
+    
+    def scale_timings(self, input_path: str, output_path: str, factor: float) -> str:
+        """按比例缩放字幕时间轴
+        
+        用于在原始音频上识别、在变速后的视频上显示：速度因子为 speed 时，factor 为 1 / speed。
+        
+        Args:
+            input_path: 输入字幕路径
+            output_path: 输出字幕路径
+            factor: 时间缩放比例
+        
+        Returns:
+            str: 输出字幕路径
+        """
+        try:
+            with open(input_path, 'r', encoding='utf-8') as f:
+                subtitles = list(srt.parse(f.read()))
+            
+            scaled = [
+                srt.Subtitle(
+                    index=sub.index,
+                    start=timedelta(seconds=sub.start.total_seconds() * factor),
+                    end=timedelta(seconds=sub.end.total_seconds() * factor),
+                    content=sub.content
+                )
+                for sub in subtitles
+            ]
+            
+            with open(output_path, 'w', encoding='utf-8', newline='\n') as f:
+                f.write(srt.compose(scaled))
+            
+            logger.info(f"字幕时间轴已缩放 {factor:.3f} 倍: {len(scaled)} 条")
+            return output_path
+        
+        except Exception as e:
+            logger.error(f"字幕时间轴缩放失败: {str(e)}")
+            raise
@@ -0,0 +1,186 @@
+import os
+import re
+import srt
+from .media_info import probe
+from .utils.logger import setup_logger
+from .utils.ffmpeg import run_ffmpeg
+
+logger = setup_logger(__name__)
+
+# 可以转换为 SRT 的文本字幕编码，按优先级排列（图形字幕如 PGS、DVD 字幕无法直接使用）
+TEXT_SUBTITLE_CODECS = ('subrip', 'srt', 'mov_text', 'webvtt', 'ass', 'ssa')
+
+# 常见 ISO 639-2 语言代码到 ISO 639-1 的映射
+LANGUAGE_CODES = {
+    'eng': 'en', 'jpn': 'ja', 'kor': 'ko', 'chi': 'zh', 'zho': 'zh',
+    'fre': 'fr', 'fra': 'fr', 'ger': 'de', 'deu': 'de', 'spa': 'es',
+    'rus': 'ru', 'ita': 'it', 'por': 'pt', 'ara': 'ar', 'hin': 'hi',
+    'tha': 'th', 'vie': 'vi', 'ind': 'id', 'dut': 'nl', 'nld': 'nl'
+}
+
+def normalize_language(code: str) -> str:
+    """统一语言代码，例如 eng / en-US -> en，未知或未标注时返回 None"""
+    if not code:
+        return None
+    code = code.lower().replace('_', '-').split('-')[0]
+    if code in ('und', 'unk', 'mul', 'zxx'):
+        return None
+    return LANGUAGE_CODES.get(code, code)
+
+class EmbeddedSubtitleExtractor:
+    """内嵌字幕提取器
+
+    探测视频中的软字幕流（SRT、mov_text、ASS、WebVTT），选择源语言中最合适的一条并转换为 SRT，
+    有可用字幕时可以跳过语音识别。
+    """
+
+    def __init__(self):
+        self.perf = None  # 性能报告（PerfReport），由 VideoProcessor 设置
+
+    def find_tracks(self, video_path: str) -> list:
+        """探测视频中的字幕流
+
+        Returns:
+            list: [{'index': 流序号, 'codec': 编码, 'language': 语言, 'title': 标题,
+                    'default': bool, 'forced': bool, 'hearing_impaired': bool}, ...]
+        """
+        tracks = []
+        for stream in probe(video_path, self.perf).subtitle_streams:
+            disposition = stream['disposition']
+            tracks.append({
+                'index': stream['index'],
+                'codec': stream['codec'],
+                'language': normalize_language(stream['language']),
+                'title': stream['title'],
+                'default': bool(disposition.get('default')),
+                'forced': bool(disposition.get('forced')),
+                'hearing_impaired': bool(disposition.get('hearing_impaired'))
+            })
+        return tracks
+
+    def audio_language(self, video_path: str) -> str:
+        """主音轨（默认音轨，没有时为第一条音轨）的语言，未标注时返回 None"""
+        streams = probe(video_path, self.perf).audio_streams
+        if not streams:
+            return None
+        primary = next((stream for stream in streams if stream['disposition'].get('default')), streams[0])
+        return normalize_language(primary['language'])
+
+    def select_track(self, tracks: list, source_language: str = None, target_language: str = None) -> dict:
+        """选择最合适的字幕流
+
+        只考虑文本字幕，排除强制字幕（只覆盖部分对白）和目标语言的字幕。
+        优先选择与源语言一致的字幕，其次是未标注语言的字幕；
+        同等条件下优先默认字幕、非听障字幕和 SRT 编码。
+        源语言未知时无法判断字幕是否为原文，不选择任何字幕。
+
+        Returns:
+            dict: 选中的字幕流，没有合适的字幕时返回 None
+        """
+        source_language = normalize_language(source_language)
+        target_language = normalize_language(target_language)
+        if source_language is None:
+            return None
+
+        candidates = []
+        for track in tracks:
+            if track['codec'] not in TEXT_SUBTITLE_CODECS or track['forced']:
+                continue
+            if target_language and track['language'] == target_language:
+                continue
+            if track['language'] not in (source_language, None):
+                continue
+            candidates.append(track)
+
+        if not candidates:
+            return None
+
+        return min(candidates, key=lambda track: (
+            track['language'] is None,  # 语言一致优先于未标注语言
+            not track['default'],
+            track['hearing_impaired'],
+            TEXT_SUBTITLE_CODECS.index(track['codec']),
+            track['index']
+        ))
+
+    def extract(self, video_path: str, output_path: str, source_language: str = None,
+                target_language: str = None) -> str:
+        """提取内嵌字幕为 SRT
+
+        Args:
+            video_path: 输入视频路径
+            output_path: 字幕输出路径
+            source_language: 源语言（例如 en），为 None 时使用主音轨标注的语言
+            target_language: 目标语言（例如 zh-cn），该语言的字幕不作为原始字幕
+
+        Returns:
+            str: 字幕路径，没有可用字幕或无法确定源语言时返回 None
+        """
+        try:
+            source_language = normalize_language(source_language) or self.audio_language(video_path)
+            if source_language is None:
+                logger.info("无法确定源语言（未指定语言且音轨未标注语言），不使用内嵌字幕")
+                return None
+
+            track = self.select_track(self.find_tracks(video_path), source_language, target_language)
+            if track is None:
+                logger.info("视频中没有可用的内嵌字幕")
+                return None
+
+            command = [
+                'ffmpeg',
+                '-nostdin',
+                '-i', video_path,
+                '-map', f"0:{track['index']}",
+                '-c:s', 'srt',
+                '-y',
+                output_path
+            ]
+            result = run_ffmpeg(command, 'subtitles', self.perf)
+            if result.returncode != 0:
+                raise Exception(f"内嵌字幕提取失败: {result.stderr}")
+
+            # 去掉格式标签，只保留文本
+            with open(output_path, 'r', encoding='utf-8') as f:
+                subs = []
+                for sub in srt.parse(f.read()):
+                    content = re.sub(r'<[^>]+>|\{\\[^}]*\}', '', sub.content).strip()
+                    if content:
+                        subs.append(srt.Subtitle(index=len(subs) + 1, start=sub.start,
+                                                 end=sub.end, content=content))
+            if not subs:
+                logger.warning(f"内嵌字幕流 {track['index']} 为空")
+                os.remove(output_path)
+                return None
+
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(srt.compose(subs))
+
+            logger.info(
+                f"使用内嵌字幕: 流 {track['index']} ({track['codec']}, "
+                f"{track['language'] or '未标注语言'}), 共 {len(subs)} 条"
+            )
+            return output_path
+
+        except Exception as e:
+            logger.error(f"内嵌字幕提取失败: {str(e)}")
+            raise
+
+class SubtitleFileSource:
+    """把已有字幕文件包装成识别片段来源
+
+    提供与 SubtitleGenerator 相同的 iter_segments 接口，流式管线使用内嵌字幕时无需读取音频。
+    """
+
+    def __init__(self, subtitle_path: str):
+        self.subtitle_path = subtitle_path
+
+    def iter_segments(self, audio=None):
+        """逐条产出字幕片段 {'start': 秒, 'end': 秒, 'text': 文本}（忽略 audio）"""
+        with open(self.subtitle_path, 'r', encoding='utf-8') as f:
+            for sub in srt.parse(f.read()):
+                yield {
+                    'start': sub.start.total_seconds(),
+                    'end': sub.end.total_seconds(),
+                    'text': sub.content
+                }
@@ -0,0 +1,148 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+import unicodedata
+from .utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def normalize_text(text: str) -> str:
+    """翻译记忆的查询键：Unicode NFC，每行去掉首尾空白并合并连续空白（保留换行，批量翻译按行拆分）"""
+    text = unicodedata.normalize('NFC', text)
+    return '\n'.join(re.sub(r'[ \t　]+', ' ', line).strip() for line in text.strip().splitlines())
+
+class TranslationMemory:
+    """持久化的翻译记忆（SQLite）
+
+    按（规范化的原文、源语言、目标语言、翻译服务）保存译文，翻译前先查询，
+    同一系列视频中重复的片头、片尾和台词以及重新运行时不再请求网络。
+    条目数超过上限时按最近使用时间（LRU）淘汰。
+    """
+
+    def __init__(self, path: str = None, max_entries: int = None):
+        """初始化翻译记忆
+
+        Args:
+            path: 数据库路径（默认读取 VIDEOPROCESSOR_TM_PATH，否则为缓存目录下的 translation_memory.db）
+            max_entries: 条目数上限（默认读取 VIDEOPROCESSOR_TM_SIZE，否则为 100000）
+        """
+        cache_dir = os.getenv('VIDEOPROCESSOR_CACHE_DIR') or os.path.join('~', '.cache', 'videoprocessor')
+        self.path = os.path.expanduser(
+            path
+            or os.getenv('VIDEOPROCESSOR_TM_PATH')
+            or os.path.join(cache_dir, 'translation_memory.db')
+        )
+        if max_entries is None:
+            max_entries = int(os.getenv('VIDEOPROCESSOR_TM_SIZE', '100000'))
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        # 多个批处理进程可能同时写入同一个数据库
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS memory (
+                    source TEXT NOT NULL,
+                    source_language TEXT NOT NULL,
+                    target_language TEXT NOT NULL,
+                    backend TEXT NOT NULL,
+                    translation TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL,
+                    PRIMARY KEY (source, source_language, target_language, backend)
+                )
+            """)
+            self._db.execute("CREATE INDEX IF NOT EXISTS memory_accessed ON memory (accessed)")
+        # 条目数按本进程新增的条目累计，写入时不再每次统计整张表
+        self._entries = self._db.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+
+    def get(self, text: str, source_language: str, target_language: str, backends: list) -> str:
+        """查询译文
+
+        Args:
+            text: 原文
+            source_language: 源语言（未知时为 auto）
+            target_language: 目标语言
+            backends: 可接受的翻译服务，按优先顺序
+
+        Returns:
+            str: 优先级最高的服务的译文，未命中返回 None
+        """
+        if not backends:
+            return None
+        source = normalize_text(text)
+        with self._lock:
+            rows = dict(self._db.execute(
+                f"SELECT backend, translation FROM memory "
+                f"WHERE source = ? AND source_language = ? AND target_language = ? "
+                f"AND backend IN ({', '.join('?' * len(backends))})",
+                (source, source_language, target_language.lower(), *backends)
+            ).fetchall())
+            for backend in backends:
+                if backend in rows:
+                    with self._db:
+                        self._db.execute(
+                            "UPDATE memory SET accessed = ? WHERE source = ? AND source_language = ? "
+                            "AND target_language = ? AND backend = ?",
+                            (time.time(), source, source_language, target_language.lower(), backend)
+                        )
+                    self.hits += 1
+                    return rows[backend]
+            self.misses += 1
+            return None
+
+    def put(self, text: str, source_language: str, target_language: str, backend: str, translation: str):
+        """保存译文，超过条目上限时淘汰最久未使用的条目"""
+        now = time.time()
+        key = (normalize_text(text), source_language, target_language.lower(), backend)
+        with self._lock, self._db:
+            inserted = self._db.execute(
+                "INSERT OR IGNORE INTO memory VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, translation, now, now)
+            ).rowcount
+            if inserted:
+                self._entries += 1
+            else:
+                self._db.execute(
+                    "UPDATE memory SET translation = ?, accessed = ? WHERE source = ? AND source_language = ? "
+                    "AND target_language = ? AND backend = ?",
+                    (translation, now, *key)
+                )
+
+            if self.max_entries and self._entries > self.max_entries:
+                # 其他进程可能同时写入或淘汰，超过上限时才统计实际条目数
+                self._entries = self._db.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+                if self._entries > self.max_entries:
+                    # 一次淘汰到上限的 90%，避免每次写入都触发淘汰
+                    evict = self._entries - int(self.max_entries * 0.9)
+                    self._db.execute(
+                        "DELETE FROM memory WHERE rowid IN "
+                        "(SELECT rowid FROM memory ORDER BY accessed LIMIT ?)",
+                        (evict,)
+                    )
+                    self._entries -= evict
+                    logger.info(f"翻译记忆超过上限 {self.max_entries} 条，淘汰 {evict} 条")
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+
+    def stats(self) -> dict:
+        """命中统计 {'hits', 'misses', 'hit_rate', 'entries'}"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            'entries': len(self)
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
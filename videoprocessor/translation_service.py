@@ -1,13 +1,27 @@
 import os
 import srt
 import time
-from translate import Translator
-from googletrans import Translator as GoogleTranslator
-import requests
+import asyncio
+import threading
+from .rate_limiter import TokenBucket
+from .backend_health import BackendHealth, CLOSED
+from .translation_memory import TranslationMemory
 from .utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# 各翻译服务默认的每秒请求数
+DEFAULT_RATE_LIMITS = {'google': 2.0, 'translate': 1.0, 'youdao': 2.0}
+
+# 各翻译服务的令牌桶，进程内所有 TranslationService 共用，服务模式的多个槽位合计不超过限速
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+# 各翻译服务的健康状态与熔断器，同样在进程内所有 TranslationService 之间共用：
+# 服务模式的一个槽位触发熔断后，其他槽位也直接跳过该服务（批处理的各工作进程各自记录）
+_health = {}
+_health_lock = threading.Lock()
+
 class TranslationService:
     """翻译服务"""
     
@@ -15,8 +29,29 @@ class TranslationService:
         """初始化翻译服务"""
         self.max_retries = 3
         self.retry_delay = 2  # 秒
-        self.batch_size = 10  # 每次翻译5批
-        self.request_interval = 1.5  # 请求间隔加大到1.5秒
+        self.max_concurrency = 4  # 同时进行的翻译请求数
+        self.rate_limits = dict(DEFAULT_RATE_LIMITS)  # 各翻译服务每秒请求数（整个进程合计），0 表示不限速
+        self.source_language = None  # 源语言，未知时为 None（自动检测）
+        
+        # 连接设置：每个翻译服务一个长期客户端，复用 keep-alive 连接
+        self.pool_size = 10  # 每个翻译服务的连接池大小（不小于并发数）
+        self.request_timeout = 10  # 单次请求超时（秒）
+        self._clients = {}
+        self._clients_lock = threading.RLock()  # 创建客户端时可能需要先创建共用的会话
+        
+        # 熔断与服务选择设置
+        self.failure_threshold = 3  # 连续失败多少次后熔断
+        self.circuit_cooldown = 60  # 熔断持续时间（秒）
+        self.min_success_rate = 0.8  # 当前服务的成功率低于该值时重新选择
+        self.latency_factor = 3.0  # 当前服务的延迟超过其他服务该倍数时重新选择
+        self._preferred = None  # 当前首选的翻译服务，性能下降前一直复用
+        
+        # 翻译记忆设置
+        self.use_memory = True  # 是否使用持久化翻译记忆
+        self.memory_path = None  # 翻译记忆数据库路径（默认在缓存目录下）
+        self.memory_size = None  # 翻译记忆条目数上限（默认 100000）
+        self._memory = None
+        self.perf = None  # 性能报告（PerfReport），由 VideoProcessor 设置
         
         # 语言代码映射
         self.language_map = {
@@ -27,11 +62,11 @@ class TranslationService:
             'ko': {'google': 'ko', 'translate': 'ko', 'youdao': 'ko'}
         }
         
-        # 翻译服务列表
+        # 翻译服务列表（名称, 翻译函数），按顺序尝试
         self.translators = [
-            self._translate_with_google,
-            self._translate_with_translate,
-            self._translate_with_youdao
+            ('google', self._translate_with_google),
+            ('translate', self._translate_with_translate),
+            ('youdao', self._translate_with_youdao)
         ]
     
     def _normalize_language_code(self, language_code: str, service: str) -> str:
@@ -41,10 +76,57 @@ class TranslationService:
             return self.language_map[language_code][service]
         return language_code
     
+    def _client(self, name: str, factory):
+        """翻译服务的长期客户端，首次使用时创建，之后所有调用和并发请求共用"""
+        client = self._clients.get(name)
+        if client is None:
+            with self._clients_lock:
+                client = self._clients.get(name)
+                if client is None:
+                    client = self._clients[name] = factory()
+        return client
+    
+    def _create_session(self):
+        """带连接池的 requests 会话（每个翻译服务一个，不同主机的连接池不会互相挤占）"""
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        session = requests.Session()
+        pool_size = max(self.pool_size, self.max_concurrency)
+        # 同一服务的 HTTP 和 HTTPS（重定向后）各保留一个连接池
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def _create_google_translator(self):
+        import httpx
+        from googletrans import Translator as GoogleTranslator
+        
+        # googletrans 内部使用 httpx 客户端，实例共用即可复用连接；
+        # 它不支持设置连接池大小，按配置替换为新的客户端（保留原请求头）
+        translator = GoogleTranslator(timeout=self.request_timeout)
+        pool_size = max(self.pool_size, self.max_concurrency)
+        default_client = translator.client
+        translator.client = httpx.Client(
+            http2=True,
+            headers=default_client.headers,
+            timeout=self.request_timeout,
+            pool_limits=httpx.PoolLimits(soft_limit=pool_size, hard_limit=pool_size)
+        )
+        default_client.close()
+        return translator
+    
+    def _create_translate_translator(self, to_lang: str):
+        from translate import Translator
+        
+        # translate 库没有提供传入会话的接口，只复用 Translator 实例，请求参数由库自行处理
+        return Translator(to_lang=to_lang)
+    
     def _translate_with_google(self, text: str, target_language: str) -> str:
         """使用 Google Translate"""
         try:
-            translator = GoogleTranslator()
+            translator = self._client('google', self._create_google_translator)
             result = translator.translate(
                 text,
                 dest=self._normalize_language_code(target_language, 'google')
@@ -57,8 +139,10 @@ class TranslationService:
     def _translate_with_translate(self, text: str, target_language: str) -> str:
         """使用 translate 库"""
         try:
-            translator = Translator(
-                to_lang=self._normalize_language_code(target_language, 'translate')
+            to_lang = self._normalize_language_code(target_language, 'translate')
+            translator = self._client(
+                f'translate:{to_lang}',
+                lambda: self._create_translate_translator(to_lang)
             )
             return translator.translate(text)
         except Exception as e:
@@ -68,7 +152,8 @@ class TranslationService:
     def _translate_with_youdao(self, text: str, target_language: str) -> str:
         """使用有道翻译"""
         try:
-            response = requests.post(
+            session = self._client('youdao', self._create_session)
+            response = session.post(
                 'http://fanyi.youdao.com/translate',
                 data={
                     'doctype': 'json',
@@ -76,7 +161,7 @@ class TranslationService:
                     'i': text,
                     'to': self._normalize_language_code(target_language, 'youdao')
                 },
-                timeout=10
+                timeout=self.request_timeout
             )
             
             result = response.json()
@@ -88,25 +173,184 @@ class TranslationService:
             logger.warning(f"有道翻译失败: {str(e)}")
             raise
     
-    def _try_translate(self, text: str, target_language: str) -> str:
-        """尝试使用不同的翻译服务"""
+    def _count(self, name: str):
+        """累加性能报告中的计数器"""
+        if self.perf is not None:
+            self.perf.increment(name)
+    
+    def _limiter(self, name: str) -> TokenBucket:
+        """翻译服务的令牌桶限速器（每个服务一个，进程内所有实例和任务共用）"""
+        rate = self.rate_limits.get(name)
+        with _limiters_lock:
+            limiter = _limiters.get(name)
+            if limiter is None:
+                limiter = _limiters[name] = TokenBucket(rate)
+            elif limiter.rate != rate:
+                # 各实例设置的速率不同时以最近使用的为准，原地修改，不清空已消耗的令牌
+                limiter.set_rate(rate)
+            return limiter
+    
+    def _backend_health(self, name: str) -> BackendHealth:
+        """翻译服务的健康状态（进程内所有实例和任务共用）"""
+        with _health_lock:
+            health = _health.get(name)
+            if health is None:
+                health = _health[name] = BackendHealth(name, self.failure_threshold, self.circuit_cooldown)
+            else:
+                # 熔断设置以最近使用的实例为准，不清除已记录的状态
+                health.failure_threshold = self.failure_threshold
+                health.cooldown = self.circuit_cooldown
+            return health
+    
+    def _is_degraded(self, name: str, candidates: list) -> bool:
+        """首选服务是否性能下降：未恢复正常、成功率过低，或延迟明显高于其他正常的服务"""
+        health = self._backend_health(name)
+        if health.state != CLOSED or health.success_rate < self.min_success_rate:
+            return True
+        if health.latency is None:
+            return False
+        return any(
+            other.state == CLOSED and other.latency is not None
+            and health.latency > self.latency_factor * other.latency
+            for other in (self._backend_health(n) for n in candidates if n != name)
+        )
+    
+    def _backend_order(self) -> list:
+        """本次请求尝试翻译服务的顺序
+        
+        跳过熔断中的服务；首选服务性能下降前一直排在最前，
+        下降后改为评分（延迟 / 成功率）最好的服务。所有服务都在熔断中时按原顺序尝试。
+        
+        Returns:
+            list: [(名称, 翻译函数), ...]
+        """
+        names = [name for name, _ in self.translators]
+        available = [name for name in names if not self._backend_health(name).is_open]
+        if not available:
+            return list(self.translators)
+        
+        with self._clients_lock:
+            preferred = self._preferred
+            if preferred not in available or self._is_degraded(preferred, available):
+                best = min(available, key=lambda name: (self._backend_health(name).score(), names.index(name)))
+                if preferred is not None and best != preferred:
+                    logger.info(f"切换首选翻译服务: {preferred} -> {best}")
+                self._preferred = preferred = best
+        
+        translators = dict(self.translators)
+        return [(name, translators[name]) for name in [preferred] + [n for n in available if n != preferred]]
+    
+    def backend_health(self) -> dict:
+        """各翻译服务的健康状态 {名称: {'state', 'latency', 'success_rate', 'requests', 'failures'}}"""
+        with _health_lock:
+            return {name: health.to_dict() for name, health in _health.items()}
+    
+    @property
+    def memory(self) -> TranslationMemory:
+        """翻译记忆（首次使用时打开），未启用或无法打开时为 None"""
+        if not self.use_memory:
+            return None
+        if self._memory is None:
+            try:
+                self._memory = TranslationMemory(self.memory_path, self.memory_size)
+            except Exception as e:
+                logger.warning(f"无法打开翻译记忆，本次不使用: {str(e)}")
+                self.use_memory = False
+                return None
+        return self._memory
+    
+    async def _try_translate(self, text: str, target_language: str) -> str:
+        """尝试使用不同的翻译服务
+        
+        先查询翻译记忆，未命中时才请求网络，成功的译文写回翻译记忆（SQLite 读写在线程池中执行，不阻塞事件循环）。
+        按 _backend_order 选择服务，熔断中的服务直接跳过；某个服务在重试过程中被熔断时立即切换。
+        每次请求前从该服务的令牌桶取得令牌，翻译库是同步的，在线程池中执行。
+        """
         last_error = None
+        memory = self.memory
+        source_language = self.source_language or 'auto'
+        if memory is not None:
+            cached = await asyncio.to_thread(
+                memory.get, text, source_language, target_language, [name for name, _ in self.translators]
+            )
+            if cached is not None:
+                self._count('translation.memory_hits')
+                return cached
+            self._count('translation.memory_misses')
+        
+        backends = self._backend_order()
+        # 所有服务都在熔断中时不再跳过
+        bypass = all(self._backend_health(name).is_open for name, _ in backends)
         
-        for translator in self.translators:
+        for name, translator in backends:
+            health = self._backend_health(name)
             for retry in range(self.max_retries):
+                if not bypass and not health.allow_request():
+                    self._count('translation.circuit_skips')
+                    break
                 try:
-                    result = translator(text, target_language)
-                    if result:
-                        return result
+                    await self._limiter(name).acquire()
+                    self._count('translation.requests')
+                    started = time.monotonic()
+                    result = await asyncio.to_thread(translator, text, target_language)
+                    if not result:
+                        raise Exception(f"{name} 返回空结果")
+                    health.record_success(time.monotonic() - started)
+                    if memory is not None:
+                        await asyncio.to_thread(memory.put, text, source_language, target_language, name, result)
+                    return result
+                except asyncio.CancelledError:
+                    health.abandon()
+                    raise
                 except Exception as e:
                     last_error = e
-                    logger.warning(f"翻译重试 ({retry+1}/{self.max_retries}): {str(e)}")
-                    time.sleep(self.retry_delay)
+                    self._count('translation.retries')
+                    logger.warning(f"翻译重试 {name} ({retry+1}/{self.max_retries}): {str(e)}")
+                    if health.record_failure():
+                        self._count('translation.circuit_opened')
+                        break
+                    if retry < self.max_retries - 1:
+                        await asyncio.sleep(self.retry_delay)
             
             logger.warning(f"切换下一个翻译服务")
         
         raise Exception(f"所有翻译服务都失败: {str(last_error)}")
     
+    async def _translate_all(self, texts: list, target_language: str) -> list:
+        """并发翻译一组文本，结果按原顺序返回
+        
+        最多 max_concurrency 个请求同时进行，请求速率由各翻译服务的令牌桶限制。
+        """
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        # 相同的文本只翻译一次
+        unique_texts = list(dict.fromkeys(texts))
+        total = len(unique_texts)
+        finished = 0
+        
+        async def translate_one(text: str) -> str:
+            nonlocal finished
+            async with semaphore:
+                result = await self._try_translate(text, target_language)
+            finished += 1
+            if finished % 10 == 0 or finished == total:
+                logger.info(f"翻译进度: {finished}/{total}")
+            return result
+        
+        results = await asyncio.gather(*(translate_one(text) for text in unique_texts))
+        for name, health in self.backend_health().items():
+            logger.info(
+                f"翻译服务 {name}: {health['state']}, 成功率 {health['success_rate']:.0%}, "
+                f"平均延迟 {health['latency']} 秒, 请求 {health['requests']} 次, 失败 {health['failures']} 次"
+            )
+        if self._memory is not None:
+            stats = self._memory.stats()
+            logger.info(
+                f"翻译记忆: 累计命中 {stats['hits']} 次, 未命中 {stats['misses']} 次, "
+                f"共 {stats['entries']} 条"
+            )
+        translated = dict(zip(unique_texts, results))
+        return [translated[text] for text in texts]
+    
     def translate_text(self, texts: list, target_language: str = 'zh-cn', use_batch: bool = False) -> str:
         """翻译文本"""
         try:
@@ -122,42 +366,16 @@ class TranslationService:
             raise
     
     def _single_translate(self, texts: list, target_language: str) -> str:
-        """逐句翻译"""
-        translated_texts = []
-        total_texts = len(texts)
-        
-        for i, text in enumerate(texts, 1):
-            logger.info(f"正在翻译第 {i}/{total_texts} 条字幕")
-            translated_text = self._try_translate(text, target_language)
-            translated_texts.append(translated_text)
-            time.sleep(self.request_interval)
-        
+        """逐句翻译（并发请求，按原顺序合并）"""
+        translated_texts = asyncio.run(self._translate_all(texts, target_language))
         logger.info(f"翻译完成，共处理 {len(translated_texts)} 条字幕")
         return '\n'.join(translated_texts)
     
     def _batch_translate(self, text_batches: list, target_language: str) -> str:
-        """批量翻译"""
-        translated_batches = []
-        total_batches = len(text_batches)
-        
-        for i in range(0, total_batches, self.batch_size):
-            current_group = text_batches[i:i + self.batch_size]
-            batch_start = i + 1
-            batch_end = min(i + self.batch_size, total_batches)
-            logger.info(f"正在处理第 {batch_start}-{batch_end}/{total_batches} 批文本")
-            
-            group_results = []
-            for batch in current_group:
-                translated_text = self._try_translate(batch, target_language)
-                group_results.append(translated_text)
-                time.sleep(self.request_interval)
-            
-            translated_batches.extend(group_results)
-            logger.info(f"完成第 {batch_start}-{batch_end} 批翻译")
-        
-        final_text = '\n'.join(translated_batches)
+        """批量翻译（并发请求，按原顺序合并）"""
+        translated_batches = asyncio.run(self._translate_all(text_batches, target_language))
         logger.info(f"翻译完成，共处理 {len(translated_batches)} 批文本")
-        return final_text
+        return '\n'.join(translated_batches)
     
     def translate(self, subtitle_path: str, target_language: str, output_path: str) -> str:
         """翻译字幕文件"""
@@ -168,11 +386,10 @@ class TranslationService:
             
             logger.info(f"开始翻译 {len(subs)} 条字幕")
             
-            # 翻译每个字幕
+            # 并发翻译所有字幕
+            translated_texts = asyncio.run(self._translate_all([sub.content for sub in subs], target_language))
             translated_subs = []
-            for i, sub in enumerate(subs, 1):
-                logger.info(f"翻译第 {i}/{len(subs)} 条字幕")
-                translated_text = self.translate_text(sub.content, target_language)
+            for sub, translated_text in zip(subs, translated_texts):
                 new_sub = srt.Subtitle(
                     index=sub.index,
                     start=sub.start,
@@ -190,4 +407,18 @@ class TranslationService:
             
         except Exception as e:
             logger.error(f"字幕翻译失败: {str(e)}")
-            raise 
\ No newline at end of file
+            raise 
+    
+    def close(self):
+        """关闭各翻译服务的长期连接和翻译记忆"""
+        with self._clients_lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            # requests 会话直接关闭，googletrans 关闭其内部的 httpx 客户端
+            close = getattr(client, 'close', None) or getattr(getattr(client, 'client', None), 'close', None)
+            if close is not None:
+                close()
+        if self._memory is not None:
+            self._memory.close()
+            self._memory = None
@@ -1,12 +1,9 @@
 import os
+import shutil
+import tempfile
 import srt
 import asyncio
 from datetime import timedelta
-from edge_tts import Communicate
-from pydub import AudioSegment
-import soundfile as sf
-import io
-from concurrent.futures import ThreadPoolExecutor
 from .utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -69,6 +66,13 @@ class TextToSpeechService:
         self.max_retries = 3
         self.retry_delay = 2  # 秒
         self.retry_backoff = 1.5  # 重试延迟增长因子
+        
+        self.perf = None  # 性能报告（PerfReport），由 VideoProcessor 设置
+    
+    def _count(self, name: str):
+        """累加性能报告中的计数器"""
+        if self.perf is not None:
+            self.perf.increment(name)
     
     def get_voice(self, language: str, voice_name: str = None) -> str:
         """获取语音标识符"""
@@ -167,7 +171,11 @@ class TextToSpeechService:
                 if attempt > 0:
                     logger.info(f"第 {attempt + 1} 次重试生成音频...")
                 
+                from edge_tts import Communicate
+                from pydub import AudioSegment
+                
                 # 创建通信对象
+                self._count('tts.requests')
                 communicate = Communicate(text, voice, rate=rate)
                 temp_mp3 = f"{output_path}.mp3"
                 await communicate.save(temp_mp3)
@@ -196,6 +204,7 @@ class TextToSpeechService:
                 
             except Exception as e:
                 last_error = e
+                self._count('tts.retries')
                 logger.warning(f"音频生成失败 (尝试 {attempt + 1}/{self.max_retries}): {str(e)}")
                 
                 if attempt < self.max_retries - 1:
@@ -216,8 +225,12 @@ class TextToSpeechService:
             
             # 对较大的语速调整进行分段处理
             if abs(rate_value) > 20:
+                from edge_tts import Communicate
+                from pydub import AudioSegment
+                
                 # 第一步：使用温和的语速调整
                 base_rate = f"{int(rate_value * 0.7):+d}%"
+                self._count('tts.requests')
                 communicate = Communicate(text, voice, rate=base_rate)
                 
                 # 生成临时文件
@@ -246,6 +259,8 @@ class TextToSpeechService:
     def _merge_audio_files(self, audio_segments: list, output_path: str):
         """合并音频片段"""
         try:
+            from pydub import AudioSegment
+            
             # 创建足够长的空白音频
             total_duration = max(seg['end_time'] for seg in audio_segments)
             total_ms = int(total_duration.total_seconds() * 1000)
@@ -351,16 +366,28 @@ class TextToSpeechService:
         
         return smoothed_rates
     
-    async def _generate_audio_chunk(self, subtitles: list, temp_dir: str, target_language: str, voice_name: str = None) -> list:
+    async def _generate_audio_chunk(self, subtitles: list, temp_dir: str, target_language: str, voice_name: str = None,
+                                    completed_segments: dict = None, on_segment_done=None) -> list:
         """并发生成一组音频"""
         # 计算平滑后的语速
         rates = self._smooth_rates(subtitles)
+        completed_segments = completed_segments or {}
         
         tasks = []
+        results = []
         for i, (subtitle, rate) in enumerate(zip(subtitles, rates)):
             if not subtitle.content.strip():
                 continue
             
+            # 跳过上次运行已经生成的片段
+            if subtitle.index in completed_segments:
+                results.append({
+                    'path': completed_segments[subtitle.index],
+                    'start_time': subtitle.start,
+                    'end_time': subtitle.end
+                })
+                continue
+            
             temp_path = os.path.join(temp_dir, f"temp_{subtitle.index}.wav")
             
             task = asyncio.create_task(self._generate_audio(
@@ -372,7 +399,6 @@ class TextToSpeechService:
             ))
             tasks.append((subtitle, temp_path, task))
         
-        results = []
         for subtitle, temp_path, task in tasks:
             try:
                 await task
@@ -381,6 +407,8 @@ class TextToSpeechService:
                     'start_time': subtitle.start,
                     'end_time': subtitle.end
                 })
+                if on_segment_done:
+                    on_segment_done(subtitle.index, temp_path)
                 logger.info(f"音频片段生成成功: {temp_path}")
             except Exception as e:
                 logger.error(f"生成音频片段失败: {str(e)}")
@@ -389,7 +417,8 @@ class TextToSpeechService:
         
         return results
     
-    async def _process_subtitles(self, subs: list, temp_dir: str, target_language: str, voice_name: str = None) -> list:
+    async def _process_subtitles(self, subs: list, temp_dir: str, target_language: str, voice_name: str = None,
+                                 completed_segments: dict = None, on_segment_done=None) -> list:
         """分批处理字幕"""
         all_segments = []
         total_subs = len(subs)
@@ -403,7 +432,9 @@ class TextToSpeechService:
                 chunk, 
                 temp_dir,
                 target_language=target_language,
-                voice_name=voice_name
+                voice_name=voice_name,
+                completed_segments=completed_segments,
+                on_segment_done=on_segment_done
             )
             all_segments.extend(segments)
             
@@ -412,9 +443,46 @@ class TextToSpeechService:
         
         return all_segments
     
+    def synthesize_segments(self, subs: list, temp_dir: str, target_language: str = 'zh-cn',
+                            voice_name: str = None, completed_segments: dict = None,
+                            on_segment_done=None) -> list:
+        """为一组字幕生成配音片段（不合并）
+        
+        Returns:
+            list: [{'path': 音频路径, 'start_time': 开始时间, 'end_time': 结束时间}, ...]
+        """
+        os.makedirs(temp_dir, exist_ok=True)
+        return asyncio.run(self._process_subtitles(
+            subs,
+            temp_dir,
+            target_language=target_language,
+            voice_name=voice_name,
+            completed_segments=completed_segments,
+            on_segment_done=on_segment_done
+        ))
+    
+    def merge_segments(self, audio_segments: list, output_path: str) -> str:
+        """将配音片段按时间轴合并为完整音频"""
+        self._merge_audio_files(audio_segments, output_path)
+        return output_path
+    
     def synthesize(self, srt_path: str, target_language: str = 'zh-cn', 
-                  voice_name: str = None, output_path: str = None) -> str:
-        """将字幕文件转换为语音"""
+                  voice_name: str = None, output_path: str = None,
+                  temp_dir: str = None, completed_segments: dict = None,
+                  on_segment_done=None) -> str:
+        """将字幕文件转换为语音
+        
+        Args:
+            srt_path: 字幕文件路径
+            target_language: 目标语言
+            voice_name: 语音名称
+            output_path: 输出音频路径
+            temp_dir: 配音片段目录（通常位于任务工作区，由调用方提供时不会被清理；
+                      未提供时创建独立的临时目录并在结束后删除）
+            completed_segments: 已生成的片段 {字幕序号: 音频路径}，这些片段不再重新生成
+            on_segment_done: 每个片段生成后的回调 (字幕序号, 音频路径)
+        """
+        owns_temp_dir = temp_dir is None
         try:
             # 获取语音标识符
             logger.info(f"请求语音: {voice_name or '默认'}")
@@ -428,15 +496,21 @@ class TextToSpeechService:
             logger.info(f"开始处理 {len(subs)} 条字幕")
             
             # 创建临时目录
-            temp_dir = "temp_audio"
+            if owns_temp_dir:
+                temp_dir = tempfile.mkdtemp(prefix='temp_audio-')
             os.makedirs(temp_dir, exist_ok=True)
             
+            if completed_segments:
+                logger.info(f"复用已生成的配音片段: {len(completed_segments)} 个")
+            
             # 使用事件循环处理所有字幕
             audio_segments = asyncio.run(self._process_subtitles(
                 subs, 
                 temp_dir,
                 target_language=target_language,
-                voice_name=voice_name
+                voice_name=voice_name,
+                completed_segments=completed_segments,
+                on_segment_done=on_segment_done
             ))
             
             # 合并所有音频片段
@@ -450,13 +524,8 @@ class TextToSpeechService:
             raise
         finally:
             # 清理临时文件
-            if os.path.exists(temp_dir):
-                for file in os.listdir(temp_dir):
-                    try:
-                        os.remove(os.path.join(temp_dir, file))
-                    except Exception as e:
-                        logger.warning(f"清理临时文件失败: {str(e)}")
+            if owns_temp_dir and temp_dir and os.path.exists(temp_dir):
                 try:
-                    os.rmdir(temp_dir)
+                    shutil.rmtree(temp_dir)
                 except Exception as e:
                     logger.warning(f"清理临时目录失败: {str(e)}") 
\ No newline at end of file
@@ -1,4 +1,7 @@
 """工具模块"""
 from .logger import setup_logger
+from .ffmpeg import (atempo_filter, run_ffmpeg, read_ffmpeg_output, stream_ffmpeg_output,
+                     parse_progress, follow_progress)
 
-__all__ = ['setup_logger'] 
\ No newline at end of file
+__all__ = ['setup_logger', 'atempo_filter', 'run_ffmpeg', 'read_ffmpeg_output', 'stream_ffmpeg_output',
+           'parse_progress', 'follow_progress']
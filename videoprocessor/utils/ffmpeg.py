@@ -0,0 +1,294 @@
+import re
+import time
+import threading
+import subprocess
+import tempfile
+from collections import deque
+from contextlib import contextmanager, ExitStack
+
+# -progress 输出的 key=value 行
+_PROGRESS_LINE = re.compile(r'^([a-z0-9_]+)=(.*)$')
+
+# 输出进度时只保留 stderr 末尾的行数（用于错误信息），不在内存中缓存完整日志
+STDERR_TAIL_LINES = 200
+
+def _progress_command(command: list) -> list:
+    """在 FFmpeg 命令中加入 -progress，把机器可读的进度写到 stderr"""
+    return [command[0], '-hide_banner', '-nostats', '-progress', 'pipe:2'] + command[1:]
+
+def _parse_number(value, cast=float):
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+def parse_progress(block: dict, name: str = 'ffmpeg', duration: float = None,
+                   elapsed: float = 0.0) -> dict:
+    """把一组 -progress 输出换算为进度信息
+    
+    Args:
+        block: 一组 key=value（以 progress=continue/end 结尾）
+        name: 命令名称
+        duration: 输出的预计时长（秒），提供时计算百分比和剩余时间
+        elapsed: 已运行时间（秒）
+    
+    Returns:
+        dict: {'name', 'frame', 'fps', 'speed': 相对实时的倍数, 'out_time': 已输出时长（秒）,
+               'total_size': 已输出字节数, 'bitrate', 'elapsed', 'percent', 'eta': 剩余秒数, 'done'}
+    """
+    # out_time_ms 实际也是微秒
+    out_time = _parse_number(block.get('out_time_us', block.get('out_time_ms')), int)
+    out_time = max(0.0, out_time / 1e6) if out_time is not None else None
+    speed = _parse_number(block.get('speed', '').rstrip('x'))
+    done = block.get('progress') == 'end'
+    
+    percent = eta = None
+    if duration and out_time is not None:
+        percent = round(min(100.0, out_time / duration * 100), 1)
+        if done:
+            eta = 0.0
+        elif speed:
+            eta = round(max(0.0, duration - out_time) / speed, 1)
+        elif percent > 0:
+            eta = round(elapsed * (100 - percent) / percent, 1)
+    
+    return {
+        'name': name,
+        'frame': _parse_number(block.get('frame'), int),
+        'fps': _parse_number(block.get('fps')),
+        'speed': speed,
+        'out_time': out_time,
+        'total_size': _parse_number(block.get('total_size'), int),
+        'bitrate': block.get('bitrate'),
+        'elapsed': round(elapsed, 1),
+        'percent': 100.0 if done and duration else percent,
+        'eta': eta,
+        'done': done
+    }
+
+def follow_progress(pipe, name: str, callback, duration: float = None, tail: deque = None) -> dict:
+    """逐行读取 FFmpeg 的 stderr，解析 -progress 输出并调用回调
+    
+    其他日志行放入 tail（只保留末尾若干行）。回调出错时不再调用，但继续读到结尾，避免 FFmpeg 阻塞。
+    
+    Args:
+        pipe: 二进制文件对象（FFmpeg 的 stderr）
+        name: 命令名称
+        callback: 进度回调，参数为 parse_progress 的结果
+        duration: 输出的预计时长（秒）
+        tail: 保存非进度日志行的 deque
+    
+    Returns:
+        dict: 最后一次进度信息，没有进度输出时为 None
+    """
+    started = time.monotonic()
+    block = {}
+    last = None
+    for raw in iter(pipe.readline, b''):
+        line = raw.decode('utf-8', errors='replace').strip()
+        match = _PROGRESS_LINE.match(line)
+        if not match:
+            if line and tail is not None:
+                tail.append(line)
+            continue
+        
+        block[match.group(1)] = match.group(2).strip()
+        if match.group(1) == 'progress':
+            last = parse_progress(block, name, duration, time.monotonic() - started)
+            block = {}
+            if callback is not None:
+                try:
+                    callback(last)
+                except Exception as e:
+                    callback = None
+                    if tail is not None:
+                        tail.append(f"进度回调出错，已停止回调: {e}")
+    return last
+
+class _StderrReader:
+    """收集 FFmpeg 子进程的 stderr
+    
+    有进度回调时在命令中加入 -progress，由后台线程边读边解析，只保留末尾若干行日志；
+    否则写入临时文件，避免管道写满阻塞。
+    """
+    
+    def __init__(self, command: list, name: str, progress=None, duration: float = None, record: dict = None):
+        self.progress = progress if command[0] == 'ffmpeg' else None
+        self.command = _progress_command(command) if self.progress else command
+        self.name = name
+        self.duration = duration
+        self.record = record if record is not None else {}
+        self._tail = deque(maxlen=STDERR_TAIL_LINES)
+        self._file = None
+        self._thread = None
+    
+    def popen(self, stdout) -> subprocess.Popen:
+        """启动子进程"""
+        if self.progress is None:
+            self._file = tempfile.TemporaryFile()
+            return subprocess.Popen(self.command, stdin=subprocess.DEVNULL, stdout=stdout, stderr=self._file)
+        
+        process = subprocess.Popen(self.command, stdin=subprocess.DEVNULL, stdout=stdout, stderr=subprocess.PIPE)
+        self._thread = threading.Thread(target=self._follow, args=(process.stderr,),
+                                        name=f"ffmpeg-progress-{self.name}", daemon=True)
+        self._thread.start()
+        return process
+    
+    def _follow(self, pipe):
+        with pipe:
+            last = follow_progress(pipe, self.name, self.progress, self.duration, self._tail)
+        if last is not None:
+            self.record['speed'] = last['speed']
+            self.record['fps'] = last['fps']
+    
+    def join(self):
+        """等待进度解析线程读完 stderr"""
+        if self._thread is not None:
+            self._thread.join()
+    
+    def text(self) -> str:
+        """子进程结束后读取 stderr 文本"""
+        self.join()
+        if self._thread is not None:
+            return '\n'.join(self._tail)
+        self._file.seek(0)
+        return self._file.read().decode('utf-8', errors='replace')
+    
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+def run_ffmpeg(command: list, name: str = 'ffmpeg', perf=None, progress=None,
+               duration: float = None) -> subprocess.CompletedProcess:
+    """执行 FFmpeg / FFprobe 命令
+    
+    Args:
+        command: 命令参数列表
+        name: 命令名称（用于性能报告）
+        perf: 性能报告（PerfReport），提供时记录该子进程的资源消耗
+        progress: 进度回调，提供时 FFmpeg 以 -progress 输出实时进度（FFprobe 忽略）
+        duration: 输出的预计时长（秒），用于计算进度百分比和剩余时间
+    
+    Returns:
+        subprocess.CompletedProcess: 执行结果（文本模式的 stdout/stderr；输出进度时 stdout 为空，
+        stderr 只包含末尾若干行）
+    """
+    def execute(record):
+        if progress is None or command[0] != 'ffmpeg':
+            result = subprocess.run(command, capture_output=True, text=True)
+        else:
+            reader = _StderrReader(command, name, progress, duration, record)
+            process = reader.popen(subprocess.DEVNULL)
+            returncode = process.wait()
+            result = subprocess.CompletedProcess(command, returncode, stdout='', stderr=reader.text())
+        record['returncode'] = result.returncode
+        return result
+    
+    if perf is None:
+        return execute({})
+    
+    with perf.command(name, command) as record:
+        return execute(record)
+
+def read_ffmpeg_output(command: list, name: str = 'ffmpeg', perf=None,
+                       chunk_size: int = 1 << 20, progress=None, duration: float = None) -> tuple:
+    """执行输出到标准输出（pipe:1）的 FFmpeg 命令，并读取全部输出
+    
+    输出按块读入可写的 bytearray，不经过临时文件；stderr 写入临时文件，避免管道写满阻塞。
+    
+    Args:
+        command: 命令参数列表
+        name: 命令名称（用于性能报告）
+        perf: 性能报告（PerfReport）
+        chunk_size: 每次读取的字节数
+        progress: 进度回调
+        duration: 输出的预计时长（秒）
+    
+    Returns:
+        tuple: (输出内容 bytearray, 返回码, stderr 文本)
+    """
+    def execute(record):
+        output = bytearray()
+        reader = _StderrReader(command, name, progress, duration, record)
+        try:
+            process = reader.popen(subprocess.PIPE)
+            with process.stdout:
+                for chunk in iter(lambda: process.stdout.read(chunk_size), b''):
+                    output.extend(chunk)
+            returncode = process.wait()
+            return output, returncode, reader.text()
+        finally:
+            reader.close()
+    
+    if perf is None:
+        return execute({})
+    
+    with perf.command(name, command) as record:
+        output, returncode, stderr = execute(record)
+        record['returncode'] = returncode
+        record['output_bytes'] = len(output)
+    return output, returncode, stderr
+
+@contextmanager
+def stream_ffmpeg_output(command: list, name: str = 'ffmpeg', perf=None, progress=None,
+                         duration: float = None):
+    """执行输出到标准输出（pipe:1）的 FFmpeg 命令，由调用方边读边处理
+    
+    调用方需要读到 EOF；退出时等待进程结束，返回码非 0 时抛出异常。
+    处理过程中出现异常时终止 FFmpeg 进程。
+    
+    Args:
+        command: 命令参数列表
+        name: 命令名称（用于性能报告）
+        perf: 性能报告（PerfReport）
+        progress: 进度回调
+        duration: 输出的预计时长（秒）
+    
+    Yields:
+        二进制文件对象（FFmpeg 的标准输出）
+    """
+    with ExitStack() as stack:
+        record = stack.enter_context(perf.command(name, command)) if perf is not None else {}
+        reader = _StderrReader(command, name, progress, duration, record)
+        stack.callback(reader.close)
+        process = reader.popen(subprocess.PIPE)
+        try:
+            yield process.stdout
+        except BaseException:
+            process.kill()
+            process.wait()
+            reader.join()
+            record['returncode'] = process.returncode
+            raise
+        finally:
+            process.stdout.close()
+        
+        returncode = process.wait()
+        record['returncode'] = returncode
+        reader.join()
+        if returncode != 0:
+            raise Exception(f"FFmpeg 执行失败 ({name}): {reader.text()}")
+
+def atempo_filter(speed: float) -> str:
+    """构建音频变速滤镜链
+    
+    atempo 滤镜只支持 0.5 到 2.0 的速度因子，超出范围时串联多个 atempo。
+    
+    Args:
+        speed: 速度因子 (0.5 表示减速一半，2.0 表示加速一倍)
+    
+    Returns:
+        str: 例如 "atempo=0.5,atempo=0.8"
+    """
+    atempo_filters = []
+    remaining_speed = speed
+    
+    while remaining_speed < 0.5:
+        atempo_filters.append("atempo=0.5")
+        remaining_speed /= 0.5
+    while remaining_speed > 2.0:
+        atempo_filters.append("atempo=2.0")
+        remaining_speed /= 2.0
+    atempo_filters.append(f"atempo={remaining_speed}")
+    
+    return ','.join(atempo_filters)
@@ -0,0 +1,79 @@
+import sys
+import time
+
+def _format_seconds(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def _format_size(size: int) -> str:
+    if size >= 1 << 30:
+        return f"{size / (1 << 30):.2f} GB"
+    return f"{size / (1 << 20):.1f} MB"
+
+class ProgressDisplay:
+    """命令行进度显示，作为 FFmpeg 进度回调使用
+
+    终端中在同一行刷新进度，输出被重定向时每隔 interval 秒输出一行。
+    已输出时长长时间没有变化时提示编码可能卡住。
+    """
+
+    def __init__(self, stream=None, interval: float = 10.0, stall_seconds: float = 30.0):
+        """
+        Args:
+            stream: 输出流，默认 sys.stderr
+            interval: 非终端输出时的最小间隔（秒）
+            stall_seconds: 超过该时长没有进展时提示
+        """
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.stall_seconds = stall_seconds
+        self.tty = hasattr(self.stream, 'isatty') and self.stream.isatty()
+        self._last_print = None
+        self._last_out_time = None
+        self._last_advance = time.monotonic()
+
+    def format(self, info: dict) -> str:
+        """把进度信息格式化为一行文本"""
+        parts = [f"[{info['name']}]"]
+        if info['percent'] is not None:
+            parts.append(f"{info['percent']:5.1f}%")
+        if info['out_time'] is not None:
+            parts.append(_format_seconds(info['out_time']))
+        if info['frame']:
+            parts.append(f"帧 {info['frame']}")
+        if info['fps']:
+            parts.append(f"{info['fps']:.1f} fps")
+        if info['speed'] is not None:
+            parts.append(f"{info['speed']:.2f}x")
+        if info['total_size']:
+            parts.append(_format_size(info['total_size']))
+        if info['eta'] is not None and not info['done']:
+            parts.append(f"剩余 {_format_seconds(info['eta'])}")
+
+        stalled = time.monotonic() - self._last_advance
+        if not info['done'] and stalled >= self.stall_seconds:
+            parts.append(f"已 {int(stalled)} 秒无进展")
+        return ' | '.join(parts)
+
+    def __call__(self, info: dict):
+        now = time.monotonic()
+        if info['out_time'] != self._last_out_time:
+            self._last_out_time = info['out_time']
+            self._last_advance = now
+
+        if (not self.tty and not info['done'] and self._last_print is not None
+                and now - self._last_print < self.interval):
+            return
+        self._last_print = now
+
+        line = self.format(info)
+        if self.tty:
+            self.stream.write(f"\r\033[K{line}" + ('\n' if info['done'] else ''))
+        else:
+            self.stream.write(line + '\n')
+        self.stream.flush()
+
+        if info['done']:
+            self._last_out_time = None
+            self._last_print = None
+            self._last_advance = now
@@ -1,31 +1,60 @@
 import os
-import subprocess
-import json
+from .media_info import probe, expected_duration
 from .utils.logger import setup_logger
+from .utils.ffmpeg import run_ffmpeg
 import srt
 
 logger = setup_logger(__name__)
 
+# 编码配置：x264 预设、CRF、编码线程数（None 为 FFmpeg 默认）、最大输出高度（None 为不缩放）、音频码率
+ENCODER_PROFILES = {
+    # 快速审片：降到 480p，ultrafast 预设
+    'preview': {'preset': 'ultrafast', 'crf': 30, 'threads': None, 'max_height': 480, 'audio_bitrate': '96k'},
+    'balanced': {'preset': 'medium', 'crf': 23, 'threads': None, 'max_height': None, 'audio_bitrate': '192k'},
+    'archive': {'preset': 'slow', 'crf': 18, 'threads': None, 'max_height': None, 'audio_bitrate': '256k'}
+}
+
 class VideoComposer:
     """视频合成器"""
     
+    def __init__(self):
+        self.perf = None  # 性能报告（PerfReport），由 VideoProcessor 设置
+        self.progress = None  # FFmpeg 进度回调，由 VideoProcessor 设置
+        self.profile = 'balanced'  # 编码配置，见 ENCODER_PROFILES
+        self.threads = None  # 编码线程数，覆盖编码配置中的设置
+    
+    @property
+    def encoder_profile(self) -> dict:
+        """当前编码配置"""
+        if self.profile not in ENCODER_PROFILES:
+            raise ValueError(f"不支持的编码配置: {self.profile} (可选: {', '.join(ENCODER_PROFILES)})")
+        profile = dict(ENCODER_PROFILES[self.profile])
+        if self.threads:
+            profile['threads'] = self.threads
+        return profile
+    
+    def _video_encoder_args(self) -> list:
+        """视频编码参数（所有重新编码视频的命令共用）"""
+        profile = self.encoder_profile
+        args = ['-c:v', 'libx264', '-preset', profile['preset'], '-crf', str(profile['crf'])]
+        if profile['threads']:
+            args += ['-threads', str(profile['threads'])]
+        return args
+    
+    def _output_size(self, width: int, height: int) -> tuple:
+        """按编码配置的最大高度计算输出尺寸（宽高保持偶数）"""
+        max_height = self.encoder_profile['max_height']
+        if not max_height or height <= max_height:
+            return width, height
+        return int(round(width * max_height / height / 2)) * 2, max_height
+    
     def _get_video_dimensions(self, video_path: str) -> tuple:
         """获取视频尺寸"""
         try:
-            command = [
-                'ffprobe',
-                '-v', 'error',
-                '-select_streams', 'v:0',
-                '-show_entries', 'stream=width,height',
-                '-of', 'json',
-                video_path
-            ]
-            
-            result = subprocess.run(command, capture_output=True, text=True)
-            data = json.loads(result.stdout)
-            
-            width = int(data['streams'][0]['width'])
-            height = int(data['streams'][0]['height'])
+            info = probe(video_path, self.perf)
+            if info.video_stream is None:
+                raise Exception("没有视频流")
+            width, height = info.width, info.height
             
             logger.info(f"视频尺寸: {width}x{height}")
             return width, height
@@ -38,39 +67,29 @@ class VideoComposer:
         """移��视频中的字幕流和硬编码字幕"""
         try:
             # 1. 首先检查视频流信息
-            probe_command = [
-                'ffprobe',
-                '-v', 'error',
-                '-select_streams', 'v:0',
-                '-show_entries', 'stream=codec_name,width,height',
-                '-of', 'json',
-                video_path
-            ]
-            
-            result = subprocess.run(probe_command, capture_output=True, text=True)
-            data = json.loads(result.stdout)
-            video_codec = data['streams'][0]['codec_name']
+            info = probe(video_path, self.perf)
             
             # 2. 使用 delogo 滤镜移除硬编码字幕
             # 针对不同视频尺寸调整字幕区域
-            width = int(data['streams'][0]['width'])
-            height = int(data['streams'][0]['height'])
+            width, height = self._output_size(info.width, info.height)
+            filters = [f"scale={width}:{height}"] if (width, height) != (info.width, info.height) else []
             
             # 计算字幕区域（通常在底部 1/4 区域）
             subtitle_y = int(height * 0.75)  # 从底部 1/4 处开始
             subtitle_h = int(height * 0.25)  # 覆盖底部 1/4
+            # 移除底部字幕区域
+            filters.append(f"delogo=x=0:y={subtitle_y}:w={width}:h={subtitle_h}:show=0")
             
             # 构建移除字幕的命令
             command = [
                 'ffmpeg',
                 '-i', video_path,
                 '-filter_complex', 
-                # 移除底部字幕区域
-                f"[0:v]delogo=x=0:y={subtitle_y}:w={width}:h={subtitle_h}:show=0[v]",
+                f"[0:v]{','.join(filters)}[v]",
                 '-map', '[v]',  # 使用处理后的视频流
                 '-map', '0:a',  # 复制所有音频流
                 '-c:a', 'copy',  # 音频直接复制
-                '-c:v', video_codec,  # 使用原始视频编码
+                *self._video_encoder_args(),  # 按编码配置编码
                 # 确保不复制任何字幕流
                 '-sn',  # 禁用字幕
                 '-dn',  # 禁用数据流
@@ -79,7 +98,7 @@ class VideoComposer:
             ]
             
             logger.info(f"执行字幕移除命令: {' '.join(command)}")
-            result = subprocess.run(command, capture_output=True, text=True)
+            result = run_ffmpeg(command, 'delogo', self.perf, self.progress, self._duration(video_path))
             
             if result.returncode != 0:
                 logger.error(f"移除字幕失败: {result.stderr}")
@@ -103,10 +122,11 @@ class VideoComposer:
                 'ffmpeg',
                 '-i', video_path,
                 # 使用 crop 滤镜裁剪掉字幕区域
-                '-vf', 'crop=iw:ih*0.85:0:0',  # 裁剪掉底部 15% 的区域
+                '-vf', ','.join(self._scale_filters(video_path) + ['crop=iw:ih*0.85:0:0']),  # 裁剪掉底部 15% 的区域
                 '-map', '0:v',  # 只要视频流
                 '-map', '0:a',  # 只要音频流
                 '-c:a', 'copy',
+                *self._video_encoder_args(),
                 '-sn',          # 禁用字幕流
                 '-dn',          # 禁用数据流
                 '-max_muxing_queue_size', '1024',  # 增加队列大小
@@ -115,7 +135,7 @@ class VideoComposer:
             ]
             
             logger.info(f"执行备用字幕移除命令: {' '.join(command)}")
-            result = subprocess.run(command, capture_output=True, text=True)
+            result = run_ffmpeg(command, 'crop', self.perf, self.progress, self._duration(video_path))
             
             if result.returncode != 0:
                 logger.error(f"备用方案移除字幕失败: {result.stderr}")
@@ -128,79 +148,101 @@ class VideoComposer:
             logger.error(f"备用方案移除字幕失败: {str(e)}")
             raise
     
-    def compose(self, video_path: str, audio_path: str, subtitle_path: str, output_path: str, remove_original_subs: bool = False) -> str:
-        """合成最终视频"""
+    def _scale_filters(self, video_path: str) -> list:
+        """按编码配置缩小分辨率的滤镜，不需要缩放时为空"""
+        source_size = self._get_video_dimensions(video_path)
+        width, height = self._output_size(*source_size)
+        return [f"scale={width}:{height}"] if (width, height) != source_size else []
+    
+    def _duration(self, video_path: str, speed: float = 1.0) -> float:
+        """输出视频的预计时长，只在需要显示进度时使用"""
+        if self.progress is None:
+            return None
+        return expected_duration(video_path, speed, self.perf)
+    
+    def _build_video_filter(self, video_path: str, subtitle_path: str, speed: float = 1.0,
+                            remove_original_subs: bool = False, crop_fallback: bool = False) -> str:
+        """构建视频滤镜链：速度调整 -> 移除原字幕 -> 烧录新字幕"""
+        # 获取视频尺寸并确定字体大小
+        source_size = self._get_video_dimensions(video_path)
+        width, height = self._output_size(*source_size)
+        font_size = 12 if height > width else 18  # 竖屏使用小字体
+        
+        filters = []
+        
+        # 1. 速度调整（字幕和配音的时间轴都基于调整后的速度）
+        if speed != 1.0:
+            filters.append(f"setpts={1/speed}*PTS")
+        
+        # 按编码配置限制分辨率，先缩小可以减少后续滤镜的计算量
+        if (width, height) != source_size:
+            filters.append(f"scale={width}:{height}")
+        
+        # 2. 如果需要，移除原字幕
+        if remove_original_subs:
+            if crop_fallback:
+                # 备用方案：裁剪掉底部 15% 的区域
+                filters.append("crop=iw:ih*0.85:0:0")
+            else:
+                # 使用 delogo 滤镜覆盖底部 1/4 区域的硬编码字幕
+                subtitle_y = int(height * 0.75)
+                subtitle_h = int(height * 0.25)
+                filters.append(f"delogo=x=0:y={subtitle_y}:w={width}:h={subtitle_h}:show=0")
+        
+        # 3. 合成新字幕
+        if subtitle_path.lower().endswith('.ass'):
+            filters.append(f"ass={os.path.abspath(subtitle_path)}")
+        else:
+            filters.append(
+                f"subtitles={os.path.abspath(subtitle_path)}"
+                f":force_style='Fontname=STHeiti,FontSize={font_size},"  # 动态字体大小
+                f"PrimaryColour=&HFFFFFF&,"
+                f"BorderStyle=1,"
+                f"Outline=1.5,"
+                f"Shadow=0.5,"
+                f"Alignment=2,"
+                f"MarginV=10'"
+            )
+        
+        return f"[0:v]{','.join(filters)}[v]"
+    
+    def compose(self, video_path: str, audio_path: str, subtitle_path: str, output_path: str,
+                remove_original_subs: bool = False, speed: float = 1.0) -> str:
+        """合成最终视频
+        
+        速度调整、移除原字幕、烧录新字幕和替换配音在同一个 FFmpeg 滤镜图中完成，
+        整个视频只解码和编码一次。
+        
+        Args:
+            video_path: 原始视频路径
+            audio_path: 配音音频路径（时间轴基于调整后的速度）
+            subtitle_path: 字幕路径（时间轴基于调整后的速度）
+            output_path: 输出视频路径
+            remove_original_subs: 是否移除原字幕
+            speed: 视频速度因子
+        """
         try:
-            # 创建临时目录
-            temp_dir = os.path.join(os.path.dirname(output_path), '.temp')
-            os.makedirs(temp_dir, exist_ok=True)
-            
-            # 获取视频尺寸并确定字体大小
-            width, height = self._get_video_dimensions(video_path)
-            font_size = 12 if height > width else 18  # 竖屏使用小字体
-            
-            # 1. 如果需要，移除原字幕
-            if remove_original_subs:
-                temp_video_no_subs = os.path.join(temp_dir, "temp_no_subs.mp4")
-                video_path = self._remove_subtitles(video_path, temp_video_no_subs)
+            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+            logger.info(f"编码配置: {self.profile} {self.encoder_profile}")
             
-            # 2. 合成新字幕
-            temp_video_with_sub = os.path.join(temp_dir, "temp_with_sub.mp4")
+            filter_complex = self._build_video_filter(
+                video_path, subtitle_path, speed, remove_original_subs
+            )
+            duration = self._duration(video_path, speed)
+            result = self._render(video_path, audio_path, filter_complex, output_path, duration)
             
-            # 判断字幕文件类型
-            is_ass = subtitle_path.lower().endswith('.ass')
-            
-            if is_ass:
-                filter_complex = f"ass={os.path.abspath(subtitle_path)}"
-            else:
-                filter_complex = (
-                    f"subtitles={os.path.abspath(subtitle_path)}"
-                    f":force_style='Fontname=STHeiti,FontSize={font_size},"  # 动态字体大小
-                    f"PrimaryColour=&HFFFFFF&,"
-                    f"BorderStyle=1,"
-                    f"Outline=1.5,"
-                    f"Shadow=0.5,"
-                    f"Alignment=2,"
-                    f"MarginV=10'"
+            if result.returncode != 0 and remove_original_subs:
+                logger.error(f"视频合成失败: {result.stderr}")
+                # 如果 delogo 失败，使用裁剪方案重试
+                logger.info("使用备用方案移除字幕")
+                filter_complex = self._build_video_filter(
+                    video_path, subtitle_path, speed, remove_original_subs, crop_fallback=True
                 )
+                result = self._render(video_path, audio_path, filter_complex, output_path, duration)
             
-            subtitle_command = [
-                'ffmpeg',
-                '-i', video_path,
-                '-vf', filter_complex,
-                '-c:a', 'copy',
-                '-y',
-                temp_video_with_sub
-            ]
-            
-            result = subprocess.run(subtitle_command, capture_output=True, text=True)
-            if result.returncode != 0:
-                logger.error(f"字幕合成失败: {result.stderr}")
-                raise Exception(f"字幕合成失败: {result.stderr}")
-            
-            logger.info("字幕合成完成")
-            
-            # 3. 替换音频
-            merge_command = [
-                'ffmpeg',
-                '-i', temp_video_with_sub,
-                '-i', audio_path,
-                '-c:v', 'copy',
-                '-c:a', 'aac',
-                '-strict', 'experimental',
-                '-map', '0:v:0',
-                '-map', '1:a:0',
-                '-shortest',
-                '-y',
-                output_path
-            ]
-            
-            result = subprocess.run(merge_command, capture_output=True, text=True)
             if result.returncode != 0:
-                logger.error(f"音频合成失败: {result.stderr}")
-                raise Exception(f"音频合成失败: {result.stderr}")
-            
-            logger.info("音频合成完成")
+                logger.error(f"视频合成失败: {result.stderr}")
+                raise Exception(f"视频合成失败: {result.stderr}")
             
             # 验证输出文件
             if not os.path.exists(output_path):
@@ -215,12 +257,26 @@ class VideoComposer:
         except Exception as e:
             logger.error(f"视频合成失败: {str(e)}")
             raise
-        finally:
-            # 清理临时文件
-            try:
-                if os.path.exists(temp_dir):
-                    for file in os.listdir(temp_dir):
-                        os.remove(os.path.join(temp_dir, file))
-                    os.rmdir(temp_dir)
-            except Exception as e:
-                logger.warning(f"清理临时文件失败: {str(e)}") 
\ No newline at end of file
+    
+    def _render(self, video_path: str, audio_path: str, filter_complex: str, output_path: str,
+                duration: float = None):
+        """单次解码、单次编码：处理后的视频流与配音音轨一起输出"""
+        command = [
+            'ffmpeg',
+            '-i', video_path,
+            '-i', audio_path,
+            '-filter_complex', filter_complex,
+            '-map', '[v]',  # 使用处理后的视频流
+            '-map', '1:a:0',  # 使用配音音轨
+            *self._video_encoder_args(),
+            '-c:a', 'aac',
+            '-b:a', self.encoder_profile['audio_bitrate'],
+            '-sn',  # 不复制字幕流
+            '-dn',  # 不复制数据流
+            '-shortest',
+            '-y',
+            output_path
+        ]
+        
+        logger.info(f"执行视频合成命令: {' '.join(command)}")
+        return run_ffmpeg(command, 'compose', self.perf, self.progress, duration)
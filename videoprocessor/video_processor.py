@@ -1,5 +1,6 @@
 import os
-import subprocess
+import shutil
+from contextlib import contextmanager, nullcontext
 from dotenv import load_dotenv
 from .audio_extractor import AudioExtractor
 from .subtitle_generator import SubtitleGenerator
@@ -7,6 +8,13 @@ from .subtitle_processor import SubtitleProcessor
 from .translation_service import TranslationService
 from .tts_service import TextToSpeechService
 from .video_composer import VideoComposer
+from .stage_cache import StageCache
+from .job_manifest import JobManifest
+from .workspace import Workspace
+from .streaming import StreamingPipeline
+from .subtitle_tracks import EmbeddedSubtitleExtractor, SubtitleFileSource
+from .perf_report import PerfReport
+from .media_info import probe
 from .utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -22,100 +30,46 @@ class VideoProcessor:
         # 初始化各个组件
         self.audio_extractor = AudioExtractor()
         self.subtitle_generator = SubtitleGenerator()
+        self.subtitle_extractor = EmbeddedSubtitleExtractor()
         self.subtitle_processor = SubtitleProcessor()
         self.translation_service = TranslationService()
         self.tts_service = TextToSpeechService()
         self.video_composer = VideoComposer()
         
-        # 创建临时文件夹
-        self.temp_dir = os.path.join(os.getcwd(), '.temp')
-        os.makedirs(self.temp_dir, exist_ok=True)
+        # 任务工作区（在 process 方法中为每个任务创建）
+        self.temp_base_dir = None  # 工作区根目录，默认为当前目录下的 .temp
+        self.workspace = None
         
         self.use_batch_translation = True  # 默认使用批量翻译
         self.remove_original_subs = False  # 默认不移除原字幕
         self.voice_name = None  # 存储语音选择
         self.speed_factor = 1.0  # 存储速度因子
+        self.streaming = False  # 是否流式执行识别、翻译和配音
+        self.stream_batch_size = 10  # 流式处理时每批字幕条数
+        self.audio_in_memory = True  # 识别用音频通过管道读入内存，不写 WAV 文件
+        self.windowed_asr = False  # 分窗识别：按窗口读取音频流并逐条写入字幕，内存占用恒定
+        self.scale_timestamps = True  # 识别原始音频并按速度因子缩放时间轴（不识别变速音频）
+        self.use_embedded_subs = True  # 视频带有源语言文本字幕时直接使用，跳过语音识别
         
         # 添加输出目录设置
         self.output_dir = None  # 将在 process 方法中设置
         self.save_intermediate = True  # 是否保存中间文件
-    
-    def _slow_down_video(self, input_path: str, speed: float = 1.0) -> str:
-        """减速视频和音频
         
-        Args:
-            input_path: 输入视频路径
-            speed: 速度因子 (0.5 表示减速一半，2.0 表示加速一倍)
+        # 阶段缓存设置
+        self.use_cache = True  # 是否启用阶段缓存
+        self.stage_cache = StageCache()
         
-        Returns:
-            str: 处理后的视频路径
-        """
-        try:
-            output_path = os.path.join(self.temp_dir, "speed_adjusted.mp4")
-            
-            # 处理 atempo 滤镜的限制（0.5 到 2.0）
-            atempo_filters = []
-            remaining_speed = speed
-            
-            # 如果速度因子超出范围，需要串联多个 atempo
-            while remaining_speed < 0.5:
-                atempo_filters.append("atempo=0.5")
-                remaining_speed /= 0.5
-            while remaining_speed > 2.0:
-                atempo_filters.append("atempo=2.0")
-                remaining_speed /= 2.0
-            if 0.5 <= remaining_speed <= 2.0:
-                atempo_filters.append(f"atempo={remaining_speed}")
-            
-            # 构建音频滤镜链
-            audio_filter = ','.join(atempo_filters)
-            
-            # 构建完整的滤镜图
-            filter_complex = (
-                # 视频速度调整
-                f"[0:v]setpts={1/speed}*PTS[v];"
-                # 音频速度调整（使用串联的 atempo）
-                f"[0:a]{audio_filter}[a]"
-            )
-            
-            command = [
-                'ffmpeg',
-                '-i', input_path,
-                '-filter_complex', filter_complex,
-                '-map', '[v]',  # 使用处理后的视频流
-                '-map', '[a]',  # 使用处理后的音频流
-                # 保持视频编码器
-                '-c:v', 'libx264',
-                '-preset', 'medium',  # 编码速度和质量的平衡
-                '-crf', '23',        # 视频质量控制
-                # 音频编码设置
-                '-c:a', 'aac',
-                '-b:a', '192k',      # 音频比特率
-                '-y',
-                output_path
-            ]
-            
-            logger.info(f"执行速度调整命令: {' '.join(command)}")
-            result = subprocess.run(command, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                logger.error(f"速度调整失败: {result.stderr}")
-                raise Exception(f"速度调整失败: {result.stderr}")
-            
-            # 验证输出文件
-            if not os.path.exists(output_path):
-                raise Exception("输出文件不存在")
-            
-            if os.path.getsize(output_path) == 0:
-                raise Exception("输出文件为空")
-            
-            logger.info(f"视频和音频速度调整完成: {speed}x")
-            return output_path
-            
-        except Exception as e:
-            logger.error(f"速度调整失败: {str(e)}")
-            raise
-
+        # 断点续跑设置
+        self.resume = False  # 是否从上次失败的检查点继续
+        self.keep_temp_files = False  # 是否保留临时文件
+        self.manifest = None  # 当前任务清单
+        
+        # 性能报告设置
+        self.write_perf_report = True  # 是否在输出文件旁保存性能报告
+        self.perf = None  # 当前任务的性能报告
+        self.progress_callback = None  # FFmpeg 编码进度回调（参数见 utils.ffmpeg.parse_progress）
+        self.media_info = None  # 当前输入的媒体信息（MediaInfo），各组件共用同一次探测结果
+    
     def process(self, input_path: str, output_path: str) -> str:
         """
         处理视频
@@ -127,122 +81,385 @@ class VideoProcessor:
         Returns:
             str: 处理后的视频路径
         """
+        succeeded = False
+        # 清除上一个任务的状态（批处理和服务模式复用同一个处理器）
+        self.workspace = None
+        self.manifest = None
+        self.media_info = None
+        self.output_dir = None
+        self.perf = PerfReport()
+        for component in (self.audio_extractor, self.subtitle_extractor, self.translation_service,
+                          self.tts_service, self.video_composer):
+            component.perf = self.perf
+        for component in (self.audio_extractor, self.video_composer):
+            component.progress = self.progress_callback
+        self.translation_service.source_language = self.subtitle_generator.language
         try:
             # 验证输入文件
             if not input_path or not os.path.exists(input_path):
                 raise FileNotFoundError(f"输入视频文件不存在: {input_path}")
             
-            # 确保输出目录存在
-            output_dir = os.path.dirname(os.path.abspath(output_path))
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # 存储原始视频路径，用于后续处理
-            original_video = input_path
+            # 探测一次媒体信息，后续组件从缓存中读取
+            with self.perf.stage('probe'):
+                self.media_info = probe(input_path, self.perf)
+            if self.media_info.video_stream is None:
+                raise Exception(f"输入文件没有视频流: {input_path}")
             
-            # 如果需要减速，先处理视频
-            if self.speed_factor != 1.0:
-                input_path = self._slow_down_video(input_path, self.speed_factor)
-                logger.info(f"视频速度调整为 {self.speed_factor}x")
+            # 创建任务工作区并加载任务清单
+            self.workspace = Workspace.for_job(input_path, output_path, self.temp_base_dir).create()
+            self.manifest = JobManifest(self.workspace.path('manifest.json'))
+            if self.resume and self.manifest.matches(input_path, output_path):
+                logger.info(f"从断点继续处理: {self.manifest.path}")
+            else:
+                if self.resume:
+                    logger.warning("未找到可继续的任务清单，将从头开始处理")
+                self.manifest.reset(input_path, output_path)
             
-            # 1. 提取音频
-            audio_path = self.audio_extractor.extract(input_path)
-            logger.info("提取音频完成")
+            # 确保输出目录存在
+            # 批处理和服务模式复用同一个处理器，每个任务都按自己的输出路径设置
+            self.output_dir = os.path.dirname(os.path.abspath(output_path))
+            os.makedirs(self.output_dir, exist_ok=True)
             
-            # 2. 生成原始字幕
-            original_subtitle_path = os.path.join(self.temp_dir, "original_subtitles.srt")
-            original_subtitle_path = self.subtitle_generator.generate(
-                audio_path,
-                original_subtitle_path
-            )
+            basename = os.path.splitext(os.path.basename(input_path))[0]
             
-            # 保存原始字幕
-            if self.save_intermediate:
-                output_original_srt = os.path.join(
-                    self.output_dir,
-                    f"{os.path.splitext(os.path.basename(input_path))[0]}_original.srt"
-                )
-                self._save_file(original_subtitle_path, output_original_srt)
-                logger.info(f"原始字幕已保存: {output_original_srt}")
+            # 识别原始音频时，字幕时间轴按速度因子缩放；否则识别变速后的音频
+            asr_speed = 1.0 if self.scale_timestamps else self.speed_factor
+            timestamp_scale = asr_speed / self.speed_factor
             
-            # 3. 处理字幕并获取文本
-            original_subs, texts = self.subtitle_processor.process(
-                original_subtitle_path,
-                use_batch=self.use_batch_translation
+            # 计算各阶段缓存键，下游阶段的键包含上游阶段的键
+            # 只有缓存和断点续跑需要输入文件的哈希，都未启用时不读取整个文件
+            source_hash = None
+            if self.use_cache or self.resume:
+                with self.perf.stage('hash'):
+                    source_hash = self.stage_cache.hash_file(input_path)
+            audio_key = self.stage_cache.make_key(
+                'audio', source=source_hash, speed=asr_speed
             )
-            logger.info("处理字幕完成")
-            
-            # 4. 翻译文本
-            translated_text = self.translation_service.translate_text(
-                texts,
+            transcribe_key = self.stage_cache.make_key(
+                'transcribe',
+                upstream=audio_key,
+                embedded_subs=self.use_embedded_subs,
+                engine=self.subtitle_generator.engine,
+                compute_type=self.subtitle_generator.compute_type,
+                model=self.subtitle_generator.model_name,
+                decode=self.subtitle_generator.decode_options(),
+                cascade=self.subtitle_generator.cascade_options(),
+                audio_in_memory=self.audio_in_memory,
+                window_seconds=self.subtitle_generator.window_seconds if self.windowed_asr or self.streaming else None,
+                chunk_seconds=self.subtitle_generator.chunk_seconds if self.subtitle_generator.workers > 1 else None
+            )
+            translate_key = self.stage_cache.make_key(
+                'translate',
+                upstream=transcribe_key,
                 target_language='zh-cn',
-                use_batch=self.use_batch_translation
+                use_batch=self.use_batch_translation,
+                max_chars_per_batch=self.subtitle_processor.max_chars_per_batch,
+                streaming=self.streaming,
+                timestamp_scale=timestamp_scale
             )
-            logger.info("翻译完成")
-            
-            # 5. 将翻译后的文本填充回字幕
-            translated_subtitle_path = os.path.join(self.temp_dir, "translated_subtitles.srt")
-            translated_subtitle_path = self.subtitle_processor.fill_subtitles(
-                original_subs,
-                translated_text,
-                translated_subtitle_path
+            tts_key = self.stage_cache.make_key(
+                'tts',
+                upstream=translate_key,
+                target_language='zh-cn',
+                voice=self.voice_name,
+                rates=self._tts_rate_params()
+            )
+            compose_key = self.stage_cache.make_key(
+                'compose',
+                source=source_hash,
+                speed=self.speed_factor,
+                subtitle=translate_key,
+                audio=tts_key,
+                remove_original_subs=self.remove_original_subs,
+                encoder=self.video_composer.encoder_profile
             )
             
-            # 保存翻译后的字幕
+            # 1. 提取音频（默认不变速，速度调整只在最终合成时进行）
+            # 只在识别阶段未命中缓存时才提取
+            open_audio = lambda: self._open_asr_audio(input_path, audio_key, asr_speed)
+            
+            if self.streaming:
+                # 2-6. 流式识别、翻译并生成配音，三个阶段重叠执行
+                streamed = self._run_stage('stream', tts_key, lambda: self._run_streaming(
+                    input_path, open_audio, tts_key, asr_speed
+                ))
+                original_subtitle_path = streamed['original_srt']
+                translated_subtitle_path = streamed['translated_srt']
+                dubbed_audio_path = streamed['dubbed_audio']
+            else:
+                # 2. 生成原始字幕
+                original_subtitle_path = self._run_stage('transcribe', transcribe_key, lambda: {
+                    'srt': self._transcribe(
+                        input_path, open_audio, self.workspace.path("original_subtitles.srt"), asr_speed
+                    )
+                })['srt']
+                
+                # 将原始音频上的时间轴换算到变速后的视频
+                if timestamp_scale != 1.0:
+                    original_subtitle_path = self.subtitle_processor.scale_timings(
+                        original_subtitle_path,
+                        self.workspace.path("original_subtitles_scaled.srt"),
+                        timestamp_scale
+                    )
+                
+                # 3-5. 处理字幕、翻译文本并填充回字幕
+                translated_subtitle_path = self._run_stage('translate', translate_key, lambda: {
+                    'srt': self._translate_subtitles(
+                        original_subtitle_path,
+                        self.workspace.path("translated_subtitles.srt")
+                    )
+                })['srt']
+                
+                # 6. 生成配音
+                dubbed_audio_path = self._run_stage('tts', tts_key, lambda: {
+                    'audio': self.tts_service.synthesize(
+                        translated_subtitle_path,
+                        target_language='zh-cn',
+                        voice_name=self.voice_name,
+                        output_path=self.workspace.path("dubbed_audio.wav"),
+                        temp_dir=self.workspace.subdir("tts_segments"),
+                        completed_segments=self.manifest.get_segments(tts_key),
+                        on_segment_done=lambda index, path: self.manifest.mark_segment(tts_key, index, path)
+                    )
+                })['audio']
+            logger.info("生成配音完成")
+            
+            # 保存原始字幕和翻译后的字幕
             if self.save_intermediate:
-                output_translated_srt = os.path.join(
-                    self.output_dir,
-                    f"{os.path.splitext(os.path.basename(input_path))[0]}_translated.srt"
-                )
+                output_original_srt = os.path.join(self.output_dir, f"{basename}_original.srt")
+                self._save_file(original_subtitle_path, output_original_srt)
+                logger.info(f"原始字幕已保存: {output_original_srt}")
+                
+                output_translated_srt = os.path.join(self.output_dir, f"{basename}_translated.srt")
                 self._save_file(translated_subtitle_path, output_translated_srt)
                 logger.info(f"翻译字幕已保存: {output_translated_srt}")
             
-            # 6. 生成配音
-            dubbed_audio_path = os.path.join(self.temp_dir, "dubbed_audio.wav")
-            dubbed_audio_path = self.tts_service.synthesize(
-                translated_subtitle_path,
-                target_language='zh-cn',
-                voice_name=self.voice_name,
-                output_path=dubbed_audio_path
-            )
-            logger.info("生成配音完成")
-            
-            # 7. 合成视频（使用减速后的视频）
-            final_path = self.video_composer.compose(
-                input_path,  # 使用减速后的视频路径
-                dubbed_audio_path,
-                translated_subtitle_path,
-                output_path,
-                remove_original_subs=self.remove_original_subs
-            )
+            # 7. 合成视频（速度调整、移除原字幕、烧录字幕和替换音频一次完成）
+            composed_path = self._run_stage('compose', compose_key, lambda: {
+                'video': self.video_composer.compose(
+                    input_path,
+                    dubbed_audio_path,
+                    translated_subtitle_path,
+                    self.workspace.path("composed.mp4"),
+                    remove_original_subs=self.remove_original_subs,
+                    speed=self.speed_factor
+                )
+            })['video']
+            shutil.copy2(composed_path, output_path)
+            final_path = output_path
             
             logger.info(f"处理完成: {final_path}")
+            succeeded = True
             return final_path
             
         except Exception as e:
             logger.error(f"处理失败: {str(e)}")
             raise
         finally:
-            # 清理临时文件
-            try:
-                if os.path.exists(self.temp_dir):
-                    for file in os.listdir(self.temp_dir):
-                        try:
-                            file_path = os.path.join(self.temp_dir, file)
-                            if os.path.isfile(file_path):
-                                os.remove(file_path)
-                        except Exception as e:
-                            logger.warning(f"清理临时文件失败: {file_path} - {str(e)}")
-                    try:
-                        os.rmdir(self.temp_dir)
-                    except Exception as e:
-                        logger.warning(f"清理临时目录失败: {str(e)}")
-            except Exception as e:
-                logger.warning(f"清理临时文件过程出错: {str(e)}") 
-
+            if self.write_perf_report:
+                self._save_perf_report(output_path)
+            if self.workspace is not None:
+                if succeeded and not self.keep_temp_files:
+                    self.workspace.cleanup()
+                elif not succeeded and self.workspace.exists():
+                    # 失败时保留工作区和任务清单，便于断点续跑
+                    logger.info(f"工作区已保留，可使用 --resume 从断点继续: {self.workspace.root}")
+    
+    def close(self):
+        """释放处理器持有的长期资源（识别进程池、翻译服务连接和翻译记忆）"""
+        self.subtitle_generator.close()
+        self.translation_service.close()
+    
+    def _run_stage(self, stage: str, key: str, producer) -> dict:
+        """执行处理阶段
+        
+        断点续跑时优先复用任务清单中已完成的阶段，其次查询阶段缓存，
+        都未命中时才真正执行，完成后记录到任务清单。
+        
+        Args:
+            stage: 阶段名称
+            key: 阶段缓存键
+            producer: 未命中缓存时调用，返回 {产物名称: 文件路径}
+        
+        Returns:
+            dict: {产物名称: 文件路径}
+        """
+        with self.perf.stage(stage) as record:
+            if self.resume:
+                finished = self.manifest.get_stage(stage, key)
+                if finished:
+                    logger.info(f"阶段已在上次运行中完成，跳过: {stage}")
+                    record['cached'] = True
+                    return finished
+            
+            files = None
+            if self.use_cache:
+                files = self.stage_cache.get(key)
+                if files:
+                    logger.info(f"缓存命中，跳过阶段: {stage}")
+                    record['cached'] = True
+            
+            if not files:
+                files = producer()
+                if self.use_cache:
+                    files = self.stage_cache.put(key, files, stage=stage)
+            
+            self.manifest.mark_stage(stage, key, files)
+            return files
+    
+    def _translate_subtitles(self, subtitle_path: str, output_path: str) -> str:
+        """处理字幕、翻译文本并填充回字幕文件"""
+        # 3. 处理字幕并获取文本
+        original_subs, texts = self.subtitle_processor.process(
+            subtitle_path,
+            use_batch=self.use_batch_translation
+        )
+        logger.info("处理字幕完成")
+        
+        # 4. 翻译文本
+        translated_text = self.translation_service.translate_text(
+            texts,
+            target_language='zh-cn',
+            use_batch=self.use_batch_translation
+        )
+        logger.info("翻译完成")
+        
+        # 5. 将翻译后的文本填充回字幕
+        return self.subtitle_processor.fill_subtitles(
+            original_subs,
+            translated_text,
+            output_path
+        )
+    
+    def _extract_audio(self, input_path: str, audio_key: str, speed: float):
+        """提取识别用音频
+        
+        默认由 FFmpeg 直接输出 16kHz 单声道 float32 采样到内存，不写中间文件，
+        识别时也不需要再解码一次；audio_in_memory 为 False 时提取为 WAV 文件（可缓存）。
+        
+        Returns:
+            numpy.ndarray 或 str: 音频采样或音频文件路径
+        """
+        if self.audio_in_memory:
+            with self.perf.stage('audio'):
+                samples = self.audio_extractor.extract_samples(input_path, speed=speed)
+            logger.info("提取音频完成")
+            return samples
+        
+        audio_path = self._run_stage('audio', audio_key, lambda: {
+            'audio': self.audio_extractor.extract(
+                input_path,
+                self.workspace.path("audio.wav"),
+                speed=speed
+            )
+        })['audio']
+        logger.info("提取音频完成")
+        return audio_path
+    
+    @contextmanager
+    def _open_asr_audio(self, input_path: str, audio_key: str, speed: float):
+        """打开识别用音频
+        
+        分窗识别（windowed_asr）时返回 FFmpeg 采样流，按窗口读取，内存占用与视频时长无关；
+        否则返回完整的采样数组或音频文件路径。
+        """
+        if self.windowed_asr:
+            with self.audio_extractor.stream_samples(input_path, speed=speed) as stream:
+                yield stream
+        else:
+            yield self._extract_audio(input_path, audio_key, speed)
+    
+    def _extract_embedded_subtitles(self, input_path: str, output_path: str) -> str:
+        """提取视频内嵌的源语言字幕，没有可用字幕或未启用时返回 None"""
+        if not self.use_embedded_subs:
+            return None
+        with self.perf.stage('embedded_subs'):
+            subtitle_path = self.subtitle_extractor.extract(
+                input_path,
+                output_path,
+                source_language=self.subtitle_generator.language,
+                target_language='zh-cn'
+            )
+        if subtitle_path:
+            self.perf.increment('subtitles.embedded')
+        return subtitle_path
+    
+    def _transcribe(self, input_path: str, open_audio, output_path: str, asr_speed: float = 1.0) -> str:
+        """生成原始字幕
+        
+        优先使用视频内嵌字幕（不提取音频），否则进行语音识别。
+        输出时间轴与识别用音频一致，内嵌字幕按 asr_speed 换算。
+        """
+        embedded_path = self._extract_embedded_subtitles(input_path, self.workspace.path("embedded_subtitles.srt"))
+        if embedded_path:
+            if asr_speed == 1.0:
+                shutil.copy2(embedded_path, output_path)
+                return output_path
+            return self.subtitle_processor.scale_timings(embedded_path, output_path, 1.0 / asr_speed)
+        
+        with open_audio() as audio:
+            if self.windowed_asr:
+                return self.subtitle_generator.generate_windowed(audio, output_path)
+            return self.subtitle_generator.generate(audio, output_path)
+    
+    def _run_streaming(self, input_path: str, open_audio, tts_key: str, asr_speed: float = 1.0) -> dict:
+        """流式执行识别、翻译和配音
+        
+        有可用的内嵌字幕时由字幕文件代替语音识别，不打开音频。
+        """
+        embedded_path = self._extract_embedded_subtitles(input_path, self.workspace.path("embedded_subtitles.srt"))
+        if embedded_path:
+            # 内嵌字幕使用原始时间轴
+            segment_source, timestamp_scale = SubtitleFileSource(embedded_path), 1.0 / self.speed_factor
+        else:
+            segment_source, timestamp_scale = self.subtitle_generator, asr_speed / self.speed_factor
+        pipeline = StreamingPipeline(
+            segment_source,
+            self.translation_service,
+            self.tts_service,
+            target_language='zh-cn',
+            voice_name=self.voice_name,
+            batch_size=self.stream_batch_size,
+            use_batch_translation=self.use_batch_translation,
+            timestamp_scale=timestamp_scale
+        )
+        with (nullcontext() if embedded_path else open_audio()) as audio:
+            return pipeline.run(
+                audio,
+                self.workspace.path("original_subtitles.srt"),
+                self.workspace.path("translated_subtitles.srt"),
+                self.workspace.path("dubbed_audio.wav"),
+                self.workspace.subdir("tts_segments"),
+                completed_segments=self.manifest.get_segments(tts_key),
+                on_segment_done=lambda index, path: self.manifest.mark_segment(tts_key, index, path)
+            )
+    
+    def _tts_rate_params(self) -> dict:
+        """影响配音结果的语速与音频参数"""
+        tts = self.tts_service
+        return {
+            'min_speed': tts.min_speed,
+            'max_speed': tts.max_speed,
+            'speed_adjust_factor': tts.speed_adjust_factor,
+            'max_speed_diff': tts.max_speed_diff,
+            'sample_rate': tts.sample_rate,
+            'channels': tts.channels
+        }
+    
+    def _save_perf_report(self, output_path: str):
+        """在输出文件旁保存性能报告，并在日志中输出汇总表格"""
+        try:
+            report_path = f"{os.path.splitext(os.path.abspath(output_path))[0]}_perf.json"
+            os.makedirs(os.path.dirname(report_path), exist_ok=True)
+            self.perf.save(report_path)
+            self.perf.log_summary()
+            logger.info(f"性能报告已保存: {report_path}")
+        except Exception as e:
+            logger.warning(f"保存性能报告失败: {str(e)}")
+    
     def _save_file(self, src_path: str, dst_path: str):
         """保存文件到输出目录"""
         try:
-            import shutil
             shutil.copy2(src_path, dst_path)
         except Exception as e:
             logger.warning(f"保存文件失败 {dst_path}: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,72 @@
+import os
+import shutil
+import hashlib
+from .utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class Workspace:
+    """任务工作区
+
+    每个任务使用独立的临时目录，各组件的临时文件都放在工作区内，
+    同一主机上的多个任务可以并行运行而不会互相覆盖或删除对方的文件。
+    """
+
+    def __init__(self, root: str):
+        """初始化工作区
+
+        Args:
+            root: 工作区目录
+        """
+        self.root = os.path.abspath(root)
+
+    @classmethod
+    def for_job(cls, input_path: str, output_path: str, base_dir: str = None) -> 'Workspace':
+        """为任务创建工作区
+
+        工作区名称由输入和输出路径决定：不同任务互不干扰，
+        同一任务重新运行时（例如 --resume）会回到同一个工作区。
+
+        Args:
+            input_path: 输入视频路径
+            output_path: 输出视频路径
+            base_dir: 工作区根目录（默认为当前目录下的 .temp）
+        """
+        base_dir = base_dir or os.path.join(os.getcwd(), '.temp')
+        job_source = f"{os.path.abspath(input_path)}\n{os.path.abspath(output_path)}"
+        job_id = hashlib.sha1(job_source.encode('utf-8')).hexdigest()[:12]
+        basename = os.path.splitext(os.path.basename(input_path))[0]
+        return cls(os.path.join(base_dir, f"{basename}-{job_id}"))
+
+    def create(self) -> 'Workspace':
+        """创建工作区目录"""
+        os.makedirs(self.root, exist_ok=True)
+        return self
+
+    def path(self, name: str) -> str:
+        """工作区内的文件路径"""
+        return os.path.join(self.root, name)
+
+    def subdir(self, name: str) -> str:
+        """工作区内的子目录（不存在时创建）"""
+        path = self.path(name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def exists(self) -> bool:
+        """工作区目录是否存在"""
+        return os.path.exists(self.root)
+
+    def cleanup(self):
+        """删除工作区，根目录为空时一并删除"""
+        try:
+            if os.path.exists(self.root):
+                shutil.rmtree(self.root)
+        except Exception as e:
+            logger.warning(f"清理工作区失败: {self.root} - {str(e)}")
+            return
+
+        try:
+            os.rmdir(os.path.dirname(self.root))
+        except OSError:
+            pass  # 根目录中还有其他任务的工作区